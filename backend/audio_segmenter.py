@@ -0,0 +1,391 @@
+"""
+Single-pass PCM WAV segmenter for the transcription pipeline.
+
+The normalized audio produced by the transcoding stage is 16 kHz mono
+16-bit PCM, so a segment is nothing more than a byte range of the data
+chunk. Segments are cut by memory-mapping the normalized file once and
+writing each overlapping window (header + slice) straight to disk, instead
+of re-decoding the file with one ffmpeg process per window.
+"""
+import os
+import mmap
+import struct
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Segments shorter than this are not worth a transcription call
+MIN_SEGMENT_SECONDS = 1.0
+MIN_SEGMENT_BYTES = 1000
+
+
+@dataclass
+class WavLayout:
+    """Location and format of the PCM data inside a WAV file"""
+    data_offset: int
+    data_size: int
+    sample_rate: int
+    channels: int
+    bits_per_sample: int
+
+    @property
+    def block_align(self) -> int:
+        return self.channels * self.bits_per_sample // 8
+
+    @property
+    def byte_rate(self) -> int:
+        return self.sample_rate * self.block_align
+
+    @property
+    def duration(self) -> float:
+        return self.data_size / self.byte_rate if self.byte_rate else 0.0
+
+    def byte_range(self, start_time: float, end_time: float) -> tuple:
+        """Absolute file offsets for a time window, aligned to whole sample frames"""
+        start_frame = int(round(start_time * self.sample_rate))
+        end_frame = int(round(end_time * self.sample_rate))
+        start = min(self.data_size, start_frame * self.block_align)
+        end = min(self.data_size, end_frame * self.block_align)
+        return self.data_offset + start, self.data_offset + max(start, end)
+
+# Segment codecs accepted by the transcription endpoint, 16 kHz mono input
+SEGMENT_CODECS = {
+    "wav": {"extension": ".wav", "mime_type": "audio/wav"},
+    "flac": {"extension": ".flac", "mime_type": "audio/flac"},
+    "opus": {"extension": ".ogg", "mime_type": "audio/ogg"},
+}
+
+
+def segment_encoder_args(codec: str, bitrate: str = "24k") -> List[str]:
+    """ffmpeg output arguments for re-encoding a PCM WAV segment"""
+    if codec == "flac":
+        return ["-c:a", "flac", "-compression_level", "5"]
+    if codec == "opus":
+        return ["-c:a", "libopus", "-b:a", bitrate, "-application", "voip"]
+    if codec == "wav":
+        return ["-c:a", "pcm_s16le"]
+    raise ValueError(f"Unsupported segment codec: {codec}")
+
+
+def read_wav_layout(path: str) -> WavLayout:
+    """Parse the RIFF chunks of a PCM WAV file without reading the samples"""
+    file_size = os.path.getsize(path)
+
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise ValueError(f"Not a RIFF/WAVE file: {path}")
+
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                break
+
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+
+            if chunk_id == b"fmt ":
+                fmt_data = f.read(chunk_size)
+                format_tag, channels, sample_rate, _, _, bits_per_sample = struct.unpack("<HHIIHH", fmt_data[:16])
+                if format_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_EXTENSIBLE):
+                    raise ValueError(f"Unsupported WAV format tag {format_tag:#x}, expected PCM")
+                fmt = (sample_rate, channels, bits_per_sample)
+                if chunk_size % 2:
+                    f.seek(1, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError("WAV data chunk found before fmt chunk")
+
+                data_offset = f.tell()
+                # Streamed writers leave the size as 0 or 0xFFFFFFFF
+                available = file_size - data_offset
+                data_size = chunk_size if 0 < chunk_size <= available else available
+
+                sample_rate, channels, bits_per_sample = fmt
+                return WavLayout(
+                    data_offset=data_offset,
+                    data_size=data_size,
+                    sample_rate=sample_rate,
+                    channels=channels,
+                    bits_per_sample=bits_per_sample
+                )
+            else:
+                f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+    raise ValueError(f"No PCM data chunk found in {path}")
+
+
+def wav_header(data_size: int, sample_rate: int, channels: int, bits_per_sample: int) -> bytes:
+    """Canonical 44-byte PCM WAV header"""
+    block_align = channels * bits_per_sample // 8
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, WAVE_FORMAT_PCM, channels, sample_rate,
+        sample_rate * block_align, block_align, bits_per_sample,
+        b"data", data_size
+    )
+
+
+def plan_segments(total_duration: float, segment_duration: float, overlap: float) -> List[Dict[str, Any]]:
+    """Compute overlapping segment windows.
+
+    Each window covers [original_start - overlap, original_start + segment_duration],
+    clamped to the audio, matching the geometry the pipeline checkpoints use.
+    """
+    plan = []
+    current_time = 0.0
+
+    while current_time < total_duration:
+        segment_start = max(0, current_time - overlap)
+        segment_end = min(total_duration, current_time + segment_duration)
+        segment_length = segment_end - segment_start
+
+        if segment_length < MIN_SEGMENT_SECONDS:
+            break
+
+        plan.append({
+            "start_time": segment_start,
+            "end_time": segment_end,
+            "duration": segment_length,
+            "original_start": current_time,
+            "original_end": current_time + segment_duration
+        })
+        current_time += segment_duration
+
+    return plan
+
+
+class WavWindowReader:
+    """Serve [start_s, end_s) windows of a PCM WAV from a read-only memory mapping.
+
+    Only the pages of the requested window are touched, so a window costs
+    O(window) regardless of the file's length. Pass an existing mapping
+    (e.g. from StorageManager.mmap) or a path to map.
+
+    Blocking: call via asyncio.to_thread from async code.
+    """
+
+    def __init__(self, path: str, layout: Optional[WavLayout] = None, mapped: Optional[mmap.mmap] = None):
+        self.path = path
+        self.layout = layout or read_wav_layout(path)
+        self._file = None
+        if mapped is None:
+            self._file = open(path, "rb")
+            mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._owns_mapping = True
+        else:
+            self._owns_mapping = False
+        self._mapped = mapped
+        self._view = memoryview(mapped)
+
+    @property
+    def duration(self) -> float:
+        return self.layout.duration
+
+    def pcm(self, start_time: float, end_time: float) -> memoryview:
+        """Zero-copy view of the PCM frames in the window; release it when done"""
+        start, end = self.layout.byte_range(start_time, end_time)
+        return self._view[start:end]
+
+    def header(self, data_size: int) -> bytes:
+        layout = self.layout
+        return wav_header(data_size, layout.sample_rate, layout.channels, layout.bits_per_sample)
+
+    def wav_bytes(self, start_time: float, end_time: float) -> bytes:
+        """The window as a standalone WAV file in memory"""
+        with self.pcm(start_time, end_time) as chunk:
+            return self.header(len(chunk)) + chunk
+
+    def write_wav(self, start_time: float, end_time: float, dest_path: str) -> Dict[str, Any]:
+        """Write the window as a WAV file; returns path, size and sha256"""
+        with self.pcm(start_time, end_time) as chunk:
+            header = self.header(len(chunk))
+            digest = hashlib.sha256(header)
+            digest.update(chunk)
+            with open(dest_path, "wb") as out:
+                out.write(header)
+                out.write(chunk)
+            return {"path": str(dest_path), "size": len(header) + len(chunk), "sha256": digest.hexdigest()}
+
+    def close(self):
+        self._view.release()
+        if self._owns_mapping:
+            self._mapped.close()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def language_sample_windows(total_duration: float, count: int, sample_seconds: float) -> List[tuple]:
+    """Evenly spread (start, end) windows for language sampling.
+
+    The first window starts at 0 and the last ends at total_duration; short
+    recordings yield a single window over the whole file.
+    """
+    if total_duration <= 0:
+        return []
+    if count <= 1 or total_duration <= sample_seconds:
+        return [(0.0, min(total_duration, sample_seconds))]
+
+    windows = []
+    span = total_duration - sample_seconds
+    for k in range(count):
+        start = span * k / (count - 1)
+        window = (start, start + sample_seconds)
+        if not windows or window[0] >= windows[-1][1]:
+            windows.append(window)
+    return windows
+
+
+def write_wav_segments(source_path: str, plan: List[Dict[str, Any]], output_dir: str,
+                       name_prefix: str = "segment", layout: Optional[WavLayout] = None) -> List[Dict[str, Any]]:
+    """Cut every planned window out of a PCM WAV in a single pass.
+
+    The source is memory-mapped once and each window is written as a
+    header followed by a zero-copy slice of the mapping. Windows that
+    fall outside the available audio are dropped. Returns one entry per
+    written file with the plan fields plus path, size and sha256.
+
+    Blocking: call via asyncio.to_thread from async code.
+    """
+    output = Path(output_dir)
+    written = []
+
+    with WavWindowReader(source_path, layout) as reader:
+        for window in plan:
+            start, end = reader.layout.byte_range(window["start_time"], window["end_time"])
+            if end - start + 44 <= MIN_SEGMENT_BYTES:
+                continue
+
+            index = len(written)
+            segment_path = output / f"{name_prefix}_{index:04d}.wav"
+            written.append({
+                **window,
+                "index": index,
+                **reader.write_wav(window["start_time"], window["end_time"], str(segment_path))
+            })
+
+    return written
+
+
+class PCMSegmentChunker:
+    """Cut overlapping WAV segments from a raw PCM byte stream.
+
+    Fed with decoded s16le PCM (e.g. ffmpeg stdout), it keeps only the
+    current window plus the overlap tail in memory and writes each segment
+    file as soon as its window is complete. Segment geometry matches
+    plan_segments so checkpoints are interchangeable with the two-stage
+    transcode + segment path.
+
+    Blocking writes: call feed/finish via asyncio.to_thread from async code.
+    """
+
+    def __init__(self, output_dir: str, segment_duration: float, overlap: float,
+                 sample_rate: int = 16000, channels: int = 1, bits_per_sample: int = 16,
+                 name_prefix: str = "segment"):
+        self.output_dir = Path(output_dir)
+        self.segment_duration = segment_duration
+        self.overlap = overlap
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bits_per_sample = bits_per_sample
+        self.name_prefix = name_prefix
+
+        self.block_align = channels * bits_per_sample // 8
+        self.byte_rate = sample_rate * self.block_align
+
+        self._buffer = bytearray()
+        self._buffer_start = 0  # absolute byte offset of _buffer[0]
+        self._total_bytes = 0
+        self._window = 0  # index of the next window to emit
+        self._emitted = 0
+
+    @property
+    def decoded_duration(self) -> float:
+        """Seconds of audio consumed so far"""
+        return self._total_bytes / self.byte_rate
+
+    def _offset(self, seconds: float) -> int:
+        return int(round(seconds * self.sample_rate)) * self.block_align
+
+    def _window_bounds(self, window: int) -> tuple:
+        original_start = window * self.segment_duration
+        start_time = max(0, original_start - self.overlap)
+        return original_start, start_time, original_start + self.segment_duration
+
+    def feed(self, data: bytes) -> List[Dict[str, Any]]:
+        """Consume PCM bytes and return any segments completed by them"""
+        self._buffer.extend(data)
+        self._total_bytes += len(data)
+
+        emitted = []
+        while True:
+            original_start, start_time, end_time = self._window_bounds(self._window)
+            if self._offset(end_time) > self._total_bytes:
+                break
+            emitted.append(self._emit(original_start, start_time, end_time))
+        return emitted
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Flush the trailing partial window at end of stream"""
+        emitted = []
+        end_time = self.decoded_duration
+        original_start, start_time, _ = self._window_bounds(self._window)
+
+        if original_start < end_time and end_time - start_time >= MIN_SEGMENT_SECONDS:
+            emitted.append(self._emit(original_start, start_time, end_time))
+
+        self._buffer = bytearray()
+        return emitted
+
+    def _emit(self, original_start: float, start_time: float, end_time: float) -> Dict[str, Any]:
+        start = self._offset(start_time) - self._buffer_start
+        end = min(self._offset(end_time), self._total_bytes) - self._buffer_start
+        data_size = end - start
+
+        index = self._emitted
+        segment_path = self.output_dir / f"{self.name_prefix}_{index:04d}.wav"
+        header = wav_header(data_size, self.sample_rate, self.channels, self.bits_per_sample)
+        digest = hashlib.sha256(header)
+
+        with memoryview(self._buffer) as view:
+            chunk = view[start:end]
+            digest.update(chunk)
+            with open(segment_path, "wb") as out:
+                out.write(header)
+                out.write(chunk)
+            chunk.release()
+
+        self._window += 1
+        self._emitted += 1
+
+        # Drop everything before the next window's (overlapping) start
+        _, next_start, _ = self._window_bounds(self._window)
+        keep_from = min(self._offset(next_start), self._total_bytes) - self._buffer_start
+        if keep_from > 0:
+            del self._buffer[:keep_from]
+            self._buffer_start += keep_from
+
+        return {
+            "index": index,
+            "start_time": start_time,
+            "end_time": end_time,
+            "duration": end_time - start_time,
+            "original_start": original_start,
+            "original_end": original_start + self.segment_duration,
+            "path": str(segment_path),
+            "size": data_size + len(header),
+            "sha256": digest.hexdigest()
+        }
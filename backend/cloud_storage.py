@@ -3,18 +3,128 @@ Phase 4: Production-grade cloud storage integration
 Supports multiple storage backends: local, S3, Google Cloud Storage
 """
 import os
+import json
 import uuid
 import boto3
 import asyncio
+import shutil
 import hashlib
+import mmap
+import contextlib
 from pathlib import Path
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, AsyncIterator, Callable
 from datetime import datetime, timezone, timedelta
 from abc import ABC, abstractmethod
 import logging
 
+from storage_io import run_local_io, run_remote_io, get_io_status
+from audio_segmenter import WavWindowReader
+
 logger = logging.getLogger(__name__)
 
+# Payloads above this size are hashed off the event loop
+HASH_INLINE_MAX_BYTES = 256 * 1024
+
+# Default block size for streamed reads
+STREAM_CHUNK_SIZE = int(os.getenv("STORAGE_STREAM_CHUNK_SIZE", str(1024 * 1024)))
+
+# S3 ranged GET size and multipart part size (S3 requires parts >= 5 MiB)
+S3_RANGE_SIZE = int(os.getenv("S3_RANGE_SIZE", str(8 * 1024 * 1024)))
+S3_PART_SIZE = max(int(os.getenv("S3_PART_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+
+class StorageReader(ABC):
+    """Async file-like reader over a stored object"""
+    
+    size: int = 0
+    
+    @abstractmethod
+    async def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes (all remaining if negative); b"" at the end"""
+        pass
+    
+    async def close(self):
+        pass
+    
+    async def iter_chunks(self, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Yield the rest of the object in blocks, closing the reader at the end"""
+        try:
+            while True:
+                chunk = await self.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await self.close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+class StorageWriter(ABC):
+    """Async file-like writer that commits the object on close.
+    
+    Tracks size and SHA-256 of everything written. Leaving the context with an
+    exception (or calling abort) discards the partial object.
+    """
+    
+    def __init__(self, key: str, metadata: Optional[Dict] = None,
+                 on_commit: Optional[Callable[["StorageWriter"], None]] = None):
+        self.key = key
+        self.metadata = dict(metadata or {})
+        self.size = 0
+        self.closed = False
+        self._digest = hashlib.sha256()
+        self._on_commit = on_commit
+    
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+    
+    def _consume(self, data: bytes):
+        """Account for a block (runs in the I/O pool with the write)"""
+        self._digest.update(data)
+        self.size += len(data)
+    
+    @abstractmethod
+    async def write(self, data: bytes) -> int:
+        """Append a block to the object"""
+        pass
+    
+    @abstractmethod
+    async def _commit(self):
+        """Make the written object visible under its key"""
+        pass
+    
+    @abstractmethod
+    async def _discard(self):
+        """Drop the partial object"""
+        pass
+    
+    async def close(self) -> str:
+        """Commit the object and return its key"""
+        if not self.closed:
+            self.closed = True
+            await self._commit()
+            if self._on_commit:
+                self._on_commit(self)
+        return self.key
+    
+    async def abort(self):
+        if not self.closed:
+            self.closed = True
+            await self._discard()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.close()
+        else:
+            await self.abort()
+
 class StorageBackend(ABC):
     """Abstract storage backend interface"""
     
@@ -23,11 +133,44 @@ class StorageBackend(ABC):
         """Store file and return storage key"""
         pass
     
+    async def store_local_file(self, source_path: str, key: str, metadata: Optional[Dict] = None) -> str:
+        """Store a file that already exists on local disk.
+        
+        The source file is consumed. Backends override this to avoid
+        loading the content into memory.
+        """
+        content = await run_local_io(Path(source_path).read_bytes)
+        result_key = await self.store_file(content, key, metadata)
+        await run_local_io(os.unlink, source_path)
+        return result_key
+    
     @abstractmethod
     async def get_file(self, key: str) -> bytes:
         """Retrieve file content"""
         pass
     
+    @abstractmethod
+    async def open_read(self, key: str) -> StorageReader:
+        """Open a stored object for streamed reading"""
+        pass
+    
+    @abstractmethod
+    async def open_write(self, key: str, metadata: Optional[Dict] = None,
+                         on_commit: Optional[Callable[[StorageWriter], None]] = None) -> StorageWriter:
+        """Open an object for streamed writing; it appears when the writer closes"""
+        pass
+    
+    @abstractmethod
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        """Bytes [start, end) of a stored object"""
+        pass
+    
+    async def iter_bytes(self, key: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Yield an object's content in blocks"""
+        reader = await self.open_read(key)
+        async for chunk in reader.iter_chunks(chunk_size):
+            yield chunk
+    
     @abstractmethod
     async def get_file_url(self, key: str, expires_in: int = 3600) -> str:
         """Get presigned URL for file access"""
@@ -48,37 +191,105 @@ class StorageBackend(ABC):
         """Get file metadata"""
         pass
 
+class LocalFileReader(StorageReader):
+    """Reader over a local file; each read is one hop into the I/O pool"""
+    
+    def __init__(self, f, size: int):
+        self._file = f
+        self.size = size
+    
+    async def read(self, size: int = -1) -> bytes:
+        return await run_local_io(self._file.read, size)
+    
+    async def close(self):
+        if not self._file.closed:
+            await run_local_io(self._file.close)
+
+class LocalFileWriter(StorageWriter):
+    """Writes to a .part file renamed into place (with its metadata) on close"""
+    
+    def __init__(self, backend: "LocalStorageBackend", key: str, metadata: Optional[Dict] = None,
+                 on_commit: Optional[Callable[[StorageWriter], None]] = None):
+        super().__init__(key, metadata, on_commit)
+        self._backend = backend
+        self.path = backend.storage_dir / key
+        self.partial_path = self.path.with_name(self.path.name + ".part")
+        self._file = None
+    
+    def _open_sync(self):
+        self.path.parent.mkdir(exist_ok=True, parents=True)
+        self._file = open(self.partial_path, "wb")
+    
+    def _write_sync(self, data: bytes) -> int:
+        self._consume(data)
+        return self._file.write(data)
+    
+    def _commit_sync(self):
+        self._file.close()
+        os.replace(self.partial_path, self.path)
+        if self.metadata:
+            self._backend._write_metadata(self.path, {**self.metadata, "sha256": self.sha256}, self.size)
+    
+    def _discard_sync(self):
+        self._file.close()
+        self.partial_path.unlink(missing_ok=True)
+    
+    async def write(self, data: bytes) -> int:
+        return await run_local_io(self._write_sync, data)
+    
+    async def _commit(self):
+        await run_local_io(self._commit_sync)
+    
+    async def _discard(self):
+        await run_local_io(self._discard_sync)
+
 class LocalStorageBackend(StorageBackend):
-    """Local filesystem storage backend"""
+    """Local filesystem storage backend.
+    
+    Every disk operation runs in the local storage I/O pool so that segment
+    writes and reads never block the event loop.
+    """
     
     def __init__(self, storage_dir: str = "/tmp/autome_storage"):
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(exist_ok=True, parents=True)
     
-    async def store_file(self, content: bytes, key: str, metadata: Optional[Dict] = None) -> str:
-        """Store file locally"""
+    @staticmethod
+    def _metadata_path(file_path: Path) -> Path:
+        return file_path.with_suffix(f"{file_path.suffix}.meta")
+    
+    def _write_metadata(self, file_path: Path, metadata: Dict, size: int):
+        with open(self._metadata_path(file_path), "w") as f:
+            json.dump({
+                **metadata,
+                "stored_at": datetime.now(timezone.utc).isoformat(),
+                "size": size
+            }, f)
+    
+    def _store_file_sync(self, content: bytes, key: str, metadata: Optional[Dict]) -> str:
         file_path = self.storage_dir / key
         file_path.parent.mkdir(exist_ok=True, parents=True)
         
-        # Store file
         with open(file_path, "wb") as f:
             f.write(content)
         
-        # Store metadata
         if metadata:
-            metadata_path = file_path.with_suffix(f"{file_path.suffix}.meta")
-            with open(metadata_path, "w") as f:
-                import json
-                json.dump({
-                    **metadata,
-                    "stored_at": datetime.now(timezone.utc).isoformat(),
-                    "size": len(content)
-                }, f)
+            self._write_metadata(file_path, metadata, len(content))
         
         return key
     
-    async def get_file(self, key: str) -> bytes:
-        """Retrieve file content"""
+    def _store_local_file_sync(self, source_path: str, key: str, metadata: Optional[Dict]) -> str:
+        file_path = self.storage_dir / key
+        file_path.parent.mkdir(exist_ok=True, parents=True)
+        
+        shutil.move(source_path, str(file_path))
+        
+        if metadata:
+            self._write_metadata(file_path, metadata, file_path.stat().st_size)
+        
+        return key
+    
+    def _get_file_sync(self, key: str) -> bytes:
         file_path = self.storage_dir / key
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {key}")
@@ -86,39 +297,27 @@ class LocalStorageBackend(StorageBackend):
         with open(file_path, "rb") as f:
             return f.read()
     
-    async def get_file_url(self, key: str, expires_in: int = 3600) -> str:
-        """Get file path (local files don't need presigned URLs)"""
+    def _get_file_url_sync(self, key: str) -> str:
         file_path = self.storage_dir / key
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {key}")
         return str(file_path.absolute())
     
-    async def delete_file(self, key: str) -> bool:
-        """Delete file"""
-        try:
-            file_path = self.storage_dir / key
-            if file_path.exists():
-                file_path.unlink()
-            
-            # Delete metadata if exists
-            metadata_path = file_path.with_suffix(f"{file_path.suffix}.meta")
-            if metadata_path.exists():
-                metadata_path.unlink()
-            
-            return True
-        except Exception as e:
-            logger.error(f"Failed to delete file {key}: {e}")
-            return False
-    
-    async def file_exists(self, key: str) -> bool:
-        """Check if file exists"""
+    def _delete_file_sync(self, key: str) -> bool:
         file_path = self.storage_dir / key
-        return file_path.exists()
+        if file_path.exists():
+            file_path.unlink()
+        
+        # Delete metadata if exists
+        metadata_path = self._metadata_path(file_path)
+        if metadata_path.exists():
+            metadata_path.unlink()
+        
+        return True
     
-    async def get_file_metadata(self, key: str) -> Dict[str, Any]:
-        """Get file metadata"""
+    def _get_file_metadata_sync(self, key: str) -> Dict[str, Any]:
         file_path = self.storage_dir / key
-        metadata_path = file_path.with_suffix(f"{file_path.suffix}.meta")
+        metadata_path = self._metadata_path(file_path)
         
         metadata = {}
         if file_path.exists():
@@ -131,11 +330,182 @@ class LocalStorageBackend(StorageBackend):
         
         if metadata_path.exists():
             with open(metadata_path, "r") as f:
-                import json
-                stored_metadata = json.load(f)
-                metadata.update(stored_metadata)
+                metadata.update(json.load(f))
         
         return metadata
+    
+    async def store_file(self, content: bytes, key: str, metadata: Optional[Dict] = None) -> str:
+        """Store file locally"""
+        return await run_local_io(self._store_file_sync, content, key, metadata)
+    
+    async def store_local_file(self, source_path: str, key: str, metadata: Optional[Dict] = None) -> str:
+        """Move a local file into storage (a rename when on the same filesystem)"""
+        return await run_local_io(self._store_local_file_sync, source_path, key, metadata)
+    
+    async def get_file(self, key: str) -> bytes:
+        """Retrieve file content"""
+        return await run_local_io(self._get_file_sync, key)
+    
+    def _open_read_sync(self, key: str) -> LocalFileReader:
+        file_path = self.storage_dir / key
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {key}")
+        f = open(file_path, "rb")
+        return LocalFileReader(f, os.fstat(f.fileno()).st_size)
+    
+    def local_path(self, key: str) -> Path:
+        """Filesystem path of a stored file (raises FileNotFoundError)"""
+        file_path = self.storage_dir / key
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {key}")
+        return file_path
+    
+    def _read_range_sync(self, key: str, start: int, end: int) -> bytes:
+        with open(self.local_path(key), "rb", buffering=0) as f:
+            return os.pread(f.fileno(), max(0, end - start), start)
+    
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        """Bytes [start, end) of a stored file, read with a single pread"""
+        return await run_local_io(self._read_range_sync, key, start, end)
+    
+    async def open_read(self, key: str) -> StorageReader:
+        """Open a stored file for streamed reading"""
+        return await run_local_io(self._open_read_sync, key)
+    
+    async def open_write(self, key: str, metadata: Optional[Dict] = None,
+                         on_commit: Optional[Callable[[StorageWriter], None]] = None) -> StorageWriter:
+        """Open a file for streamed writing"""
+        writer = LocalFileWriter(self, key, metadata, on_commit)
+        await run_local_io(writer._open_sync)
+        return writer
+    
+    async def get_file_url(self, key: str, expires_in: int = 3600) -> str:
+        """Get file path (local files don't need presigned URLs)"""
+        return await run_local_io(self._get_file_url_sync, key)
+    
+    async def delete_file(self, key: str) -> bool:
+        """Delete file"""
+        try:
+            return await run_local_io(self._delete_file_sync, key)
+        except Exception as e:
+            logger.error(f"Failed to delete file {key}: {e}")
+            return False
+    
+    async def file_exists(self, key: str) -> bool:
+        """Check if file exists"""
+        return await run_local_io((self.storage_dir / key).exists)
+    
+    async def get_file_metadata(self, key: str) -> Dict[str, Any]:
+        """Get file metadata"""
+        return await run_local_io(self._get_file_metadata_sync, key)
+
+class S3ObjectReader(StorageReader):
+    """Reader over an S3 object using ranged GETs of at least S3_RANGE_SIZE"""
+    
+    def __init__(self, backend: "S3StorageBackend", key: str, size: int):
+        self._backend = backend
+        self.key = key
+        self.size = size
+        self._fetched = 0
+        self._buffer = bytearray()
+    
+    async def read(self, size: int = -1) -> bytes:
+        remaining = len(self._buffer) + self.size - self._fetched
+        if size < 0 or size > remaining:
+            size = remaining
+        
+        while len(self._buffer) < size:
+            end = min(self.size, self._fetched + max(size - len(self._buffer), S3_RANGE_SIZE))
+            block = await run_remote_io(self._backend._get_range, self.key, self._fetched, end)
+            if not block:
+                break
+            self._buffer += block
+            self._fetched += len(block)
+        
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+class S3MultipartWriter(StorageWriter):
+    """Buffers up to S3_PART_SIZE and uploads parts; small objects use a single PUT"""
+    
+    def __init__(self, backend: "S3StorageBackend", key: str, metadata: Optional[Dict] = None,
+                 on_commit: Optional[Callable[[StorageWriter], None]] = None):
+        super().__init__(key, metadata, on_commit)
+        self._backend = backend
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []
+    
+    @property
+    def _client(self):
+        return self._backend.s3_client
+    
+    def _s3_metadata(self) -> Dict[str, str]:
+        metadata = {k: str(v) for k, v in self.metadata.items()}
+        metadata["stored-at"] = datetime.now(timezone.utc).isoformat()
+        return metadata
+    
+    def _upload_part_sync(self, data: bytes):
+        self._consume(data)
+        if self._upload_id is None:
+            response = self._client.create_multipart_upload(
+                Bucket=self._backend.bucket_name, Key=self.key, Metadata=self._s3_metadata()
+            )
+            self._upload_id = response["UploadId"]
+        
+        part_number = len(self._parts) + 1
+        response = self._client.upload_part(
+            Bucket=self._backend.bucket_name, Key=self.key, UploadId=self._upload_id,
+            PartNumber=part_number, Body=data
+        )
+        self._parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+    
+    def _put_sync(self, data: bytes):
+        self._consume(data)
+        metadata = self._s3_metadata()
+        metadata.update({"size": str(self.size), "sha256": self.sha256})
+        self._client.put_object(Bucket=self._backend.bucket_name, Key=self.key, Body=data, Metadata=metadata)
+    
+    async def write(self, data: bytes) -> int:
+        self._buffer += data
+        while len(self._buffer) >= S3_PART_SIZE:
+            part = bytes(self._buffer[:S3_PART_SIZE])
+            del self._buffer[:S3_PART_SIZE]
+            await run_remote_io(self._upload_part_sync, part)
+        return len(data)
+    
+    async def _commit(self):
+        data = bytes(self._buffer)
+        self._buffer = bytearray()
+        if self._upload_id is None:
+            await run_remote_io(self._put_sync, data)
+            return
+        
+        try:
+            if data:
+                await run_remote_io(self._upload_part_sync, data)
+            await run_remote_io(
+                lambda: self._client.complete_multipart_upload(
+                    Bucket=self._backend.bucket_name, Key=self.key, UploadId=self._upload_id,
+                    MultipartUpload={"Parts": self._parts}
+                )
+            )
+        except Exception:
+            await self._discard()
+            raise
+    
+    async def _discard(self):
+        self._buffer = bytearray()
+        if self._upload_id is not None:
+            try:
+                await run_remote_io(
+                    lambda: self._client.abort_multipart_upload(
+                        Bucket=self._backend.bucket_name, Key=self.key, UploadId=self._upload_id
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"Failed to abort multipart upload for {self.key}: {e}")
 
 class S3StorageBackend(StorageBackend):
     """AWS S3 storage backend"""
@@ -180,8 +550,7 @@ class S3StorageBackend(StorageBackend):
             }
             
             # Upload to S3
-            await asyncio.get_event_loop().run_in_executor(
-                None,
+            await run_remote_io(
                 lambda: self.s3_client.put_object(
                     Bucket=self.bucket_name,
                     Key=key,
@@ -195,23 +564,75 @@ class S3StorageBackend(StorageBackend):
             logger.error(f"Failed to store file in S3: {e}")
             raise e
     
+    async def store_local_file(self, source_path: str, key: str, metadata: Optional[Dict] = None) -> str:
+        """Upload a local file to S3 straight from disk (multipart for large files)"""
+        try:
+            s3_metadata = {k: str(v) for k, v in (metadata or {}).items()}
+            s3_metadata.update({
+                "stored-at": datetime.now(timezone.utc).isoformat(),
+                "size": str(os.path.getsize(source_path))
+            })
+            
+            await run_remote_io(
+                lambda: self.s3_client.upload_file(
+                    source_path,
+                    self.bucket_name,
+                    key,
+                    ExtraArgs={"Metadata": s3_metadata}
+                )
+            )
+            await run_local_io(os.unlink, source_path)
+            
+            return key
+        except Exception as e:
+            logger.error(f"Failed to upload file to S3: {e}")
+            raise e
+    
     async def get_file(self, key: str) -> bytes:
         """Retrieve file from S3"""
         try:
-            response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+            return await run_remote_io(
+                lambda: self.s3_client.get_object(Bucket=self.bucket_name, Key=key)["Body"].read()
             )
-            return response["Body"].read()
         except Exception as e:
             logger.error(f"Failed to retrieve file from S3: {e}")
             raise FileNotFoundError(f"File not found in S3: {key}")
     
+    def _get_range(self, key: str, start: int, end: int) -> bytes:
+        """Bytes [start, end) of an object"""
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key, Range=f"bytes={start}-{end - 1}")
+        return response["Body"].read()
+    
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        """Bytes [start, end) of an S3 object via a ranged GET"""
+        if end <= start:
+            return b""
+        try:
+            return await run_remote_io(self._get_range, key, start, end)
+        except Exception as e:
+            logger.error(f"Failed to read range of S3 object {key}: {e}")
+            raise FileNotFoundError(f"File not found in S3: {key}")
+    
+    async def open_read(self, key: str) -> StorageReader:
+        """Open an S3 object for streamed (ranged GET) reading"""
+        try:
+            response = await run_remote_io(
+                lambda: self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+            )
+        except Exception as e:
+            logger.error(f"Failed to open S3 object {key}: {e}")
+            raise FileNotFoundError(f"File not found in S3: {key}")
+        return S3ObjectReader(self, key, response.get("ContentLength", 0))
+    
+    async def open_write(self, key: str, metadata: Optional[Dict] = None,
+                         on_commit: Optional[Callable[[StorageWriter], None]] = None) -> StorageWriter:
+        """Open an S3 object for streamed (multipart) writing"""
+        return S3MultipartWriter(self, key, metadata, on_commit)
+    
     async def get_file_url(self, key: str, expires_in: int = 3600) -> str:
         """Generate presigned URL for S3 object"""
         try:
-            url = await asyncio.get_event_loop().run_in_executor(
-                None,
+            url = await run_remote_io(
                 lambda: self.s3_client.generate_presigned_url(
                     'get_object',
                     Params={'Bucket': self.bucket_name, 'Key': key},
@@ -226,8 +647,7 @@ class S3StorageBackend(StorageBackend):
     async def delete_file(self, key: str) -> bool:
         """Delete file from S3"""
         try:
-            await asyncio.get_event_loop().run_in_executor(
-                None,
+            await run_remote_io(
                 lambda: self.s3_client.delete_object(Bucket=self.bucket_name, Key=key)
             )
             return True
@@ -238,8 +658,7 @@ class S3StorageBackend(StorageBackend):
     async def file_exists(self, key: str) -> bool:
         """Check if file exists in S3"""
         try:
-            await asyncio.get_event_loop().run_in_executor(
-                None,
+            await run_remote_io(
                 lambda: self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
             )
             return True
@@ -249,8 +668,7 @@ class S3StorageBackend(StorageBackend):
     async def get_file_metadata(self, key: str) -> Dict[str, Any]:
         """Get S3 object metadata"""
         try:
-            response = await asyncio.get_event_loop().run_in_executor(
-                None,
+            response = await run_remote_io(
                 lambda: self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
             )
             
@@ -305,16 +723,13 @@ class StorageManager:
         if isinstance(content, str):
             content = content.encode('utf-8')
         
-        # Generate organized storage key
-        timestamp = datetime.now(timezone.utc).strftime("%Y/%m/%d")
-        file_uuid = str(uuid.uuid4())
+        storage_key = self._build_storage_key(filename, user_id, job_id)
         
-        if job_id:
-            storage_key = f"jobs/{job_id}/{file_uuid}_{filename}"
-        elif user_id:
-            storage_key = f"users/{user_id}/{timestamp}/{file_uuid}_{filename}"
+        # Hashing large payloads (normalized audio) would hold the event loop
+        if len(content) > HASH_INLINE_MAX_BYTES:
+            sha256 = await asyncio.to_thread(lambda: hashlib.sha256(content).hexdigest())
         else:
-            storage_key = f"temp/{timestamp}/{file_uuid}_{filename}"
+            sha256 = hashlib.sha256(content).hexdigest()
         
         # Enhanced metadata
         enhanced_metadata = {
@@ -323,7 +738,7 @@ class StorageManager:
             "job_id": job_id,
             "content_type": self._get_content_type(filename),
             "size": len(content),
-            "sha256": hashlib.sha256(content).hexdigest(),
+            "sha256": sha256,
             "uploaded_at": datetime.now(timezone.utc).isoformat(),
             **(metadata or {})
         }
@@ -342,6 +757,46 @@ class StorageManager:
             logger.error(f"Failed to store file {filename}: {e}")
             raise e
     
+    async def store_file_from_path(self, source_path: str, filename: str,
+                                   user_id: Optional[str] = None, job_id: Optional[str] = None,
+                                   metadata: Optional[Dict] = None, sha256: Optional[str] = None) -> str:
+        """Store a local file without reading it into memory.
+        
+        The source file is moved (local) or uploaded from disk (S3) and
+        should be treated as consumed. Pass sha256 when the caller already
+        hashed the content while writing it.
+        """
+        storage_key = self._build_storage_key(filename, user_id, job_id)
+        size = await run_local_io(os.path.getsize, source_path)
+        
+        if sha256 is None:
+            sha256 = await asyncio.to_thread(self._hash_file, source_path)
+        
+        enhanced_metadata = {
+            "filename": filename,
+            "user_id": user_id,
+            "job_id": job_id,
+            "content_type": self._get_content_type(filename),
+            "size": size,
+            "sha256": sha256,
+            "uploaded_at": datetime.now(timezone.utc).isoformat(),
+            **(metadata or {})
+        }
+        
+        try:
+            result_key = await self.backend.store_local_file(source_path, storage_key, enhanced_metadata)
+            
+            # Update usage stats
+            self.usage_stats["files_stored"] += 1
+            self.usage_stats["bytes_stored"] += size
+            
+            logger.info(f"Stored file: {filename} -> {result_key} ({size} bytes)")
+            return result_key
+            
+        except Exception as e:
+            logger.error(f"Failed to store file {filename}: {e}")
+            raise e
+    
     async def get_file(self, storage_key: str) -> bytes:
         """Retrieve file with usage tracking"""
         try:
@@ -356,6 +811,60 @@ class StorageManager:
             logger.error(f"Failed to retrieve file {storage_key}: {e}")
             raise e
     
+    async def open_read(self, storage_key: str) -> StorageReader:
+        """Open a stored file for streamed reading (raises FileNotFoundError)"""
+        reader = await self.backend.open_read(storage_key)
+        self.usage_stats["files_retrieved"] += 1
+        self.usage_stats["bytes_retrieved"] += reader.size
+        return reader
+    
+    async def open_write(self, filename: str, user_id: Optional[str] = None, job_id: Optional[str] = None,
+                         metadata: Optional[Dict] = None) -> StorageWriter:
+        """Open a new file for streamed writing; writer.key is its storage key once closed"""
+        storage_key = self._build_storage_key(filename, user_id, job_id)
+        enhanced_metadata = {
+            "filename": filename,
+            "user_id": user_id,
+            "job_id": job_id,
+            "content_type": self._get_content_type(filename),
+            "uploaded_at": datetime.now(timezone.utc).isoformat(),
+            **(metadata or {})
+        }
+        return await self.backend.open_write(storage_key, enhanced_metadata, on_commit=self._record_stream_write)
+    
+    def _record_stream_write(self, writer: StorageWriter):
+        self.usage_stats["files_stored"] += 1
+        self.usage_stats["bytes_stored"] += writer.size
+        logger.info(f"Stored file: {writer.metadata.get('filename')} -> {writer.key} ({writer.size} bytes, streamed)")
+    
+    async def iter_bytes(self, storage_key: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Yield a stored file's content in blocks with constant memory"""
+        reader = await self.open_read(storage_key)
+        async for chunk in reader.iter_chunks(chunk_size):
+            yield chunk
+    
+    async def read_range(self, storage_key: str, start: int, end: int) -> bytes:
+        """Bytes [start, end) of a stored file without fetching the rest"""
+        content = await self.backend.read_range(storage_key, start, end)
+        self.usage_stats["bytes_retrieved"] += len(content)
+        return content
+    
+    def _local_path(self, storage_key: str) -> Path:
+        if not isinstance(self.backend, LocalStorageBackend):
+            raise NotImplementedError(f"{type(self.backend).__name__} does not support memory mapping; use read_range")
+        return self.backend.local_path(storage_key)
+    
+    @contextlib.contextmanager
+    def mmap(self, storage_key: str):
+        """Read-only memory mapping of a locally stored file (blocking, local storage only)"""
+        with open(self._local_path(storage_key), "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+    
+    def open_wav_window(self, storage_key: str) -> WavWindowReader:
+        """Window reader over a locally stored PCM WAV (blocking, local storage only)"""
+        return WavWindowReader(str(self._local_path(storage_key)))
+    
     async def get_file_url(self, storage_key: str, expires_in: int = 3600) -> str:
         """Get presigned URL for file access"""
         return await self.backend.get_file_url(storage_key, expires_in)
@@ -384,9 +893,31 @@ class StorageManager:
         return {
             **self.usage_stats,
             "backend_type": type(self.backend).__name__,
+            "io_pools": get_io_status(),
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     
+    def _build_storage_key(self, filename: str, user_id: Optional[str] = None,
+                           job_id: Optional[str] = None) -> str:
+        """Generate organized storage key"""
+        timestamp = datetime.now(timezone.utc).strftime("%Y/%m/%d")
+        file_uuid = str(uuid.uuid4())
+        
+        if job_id:
+            return f"jobs/{job_id}/{file_uuid}_{filename}"
+        elif user_id:
+            return f"users/{user_id}/{timestamp}/{file_uuid}_{filename}"
+        return f"temp/{timestamp}/{file_uuid}_{filename}"
+    
+    @staticmethod
+    def _hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+        """SHA-256 of a file, read in chunks"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
     def _get_content_type(self, filename: str) -> str:
         """Determine content type from filename"""
         extension = Path(filename).suffix.lower()
@@ -0,0 +1,167 @@
+"""
+Content-addressed index of transcription results
+Completed uploads are indexed by the SHA-256 of the uploaded file. A finalized
+upload matching a completed job (e.g. a mobile retry of the same recording)
+is linked to that job's results instead of running the pipeline again.
+Segment-level reuse is keyed on the segment audio hash in stt_cache.
+"""
+import os
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+import logging
+
+from enhanced_store import (
+    database, TranscriptionJobStore, TranscriptionAssetStore, UploadSessionStore, EnhancedNotesStore
+)
+from store import NotesStore
+from models import UploadSession, TranscriptionJob, TranscriptionAsset, TranscriptionStage, TranscriptionStatus
+from monitoring import monitoring_service
+
+logger = logging.getLogger(__name__)
+
+# Index entries not used for this long expire (0 keeps them forever)
+INDEX_TTL_DAYS = int(os.getenv("CONTENT_INDEX_TTL_DAYS", "90"))
+
+# Note artifacts produced by the pipeline; anything else on the note is the user's own
+LINKED_ARTIFACTS = ("transcript", "language", "duration", "word_count", "processing_method", "formats_available")
+
+def upload_key(sha256: str, user_id: Optional[str]) -> str:
+    """Uploads are only matched within one user's own files"""
+    return f"upload:{user_id or 'anonymous'}:{sha256.lower()}"
+
+def _record_lookup(kind: str, hit: bool):
+    name = "content_dedup_hits" if hit else "content_dedup_misses"
+    monitoring_service.metrics_collector.increment_counter(name, tags={"kind": kind})
+
+class ContentIndexStore:
+    """Store for content hash -> result entries"""
+
+    collection = database["content_index"]
+
+    @staticmethod
+    async def ensure_indexes():
+        await ContentIndexStore.collection.create_index("key", unique=True)
+        if INDEX_TTL_DAYS > 0:
+            await ContentIndexStore.collection.create_index(
+                "last_used_at", expireAfterSeconds=INDEX_TTL_DAYS * 86400
+            )
+
+    @staticmethod
+    async def put(key: str, entry: Dict[str, Any]):
+        """Insert or replace the entry for a key"""
+        now = datetime.now(timezone.utc)
+        await ContentIndexStore.collection.update_one(
+            {"key": key},
+            {
+                "$set": {**entry, "last_used_at": now},
+                "$setOnInsert": {"created_at": now, "hits": 0},
+            },
+            upsert=True
+        )
+
+    @staticmethod
+    async def get(key: str) -> Optional[Dict[str, Any]]:
+        """Entry for a key, counting the hit"""
+        return await ContentIndexStore.collection.find_one_and_update(
+            {"key": key},
+            {"$set": {"last_used_at": datetime.now(timezone.utc)}, "$inc": {"hits": 1}},
+            projection={"_id": 0}
+        )
+
+    @staticmethod
+    async def remove(key: str):
+        await ContentIndexStore.collection.delete_one({"key": key})
+
+async def remember_completed_upload(job: TranscriptionJob) -> bool:
+    """Index a completed job under its upload's content hash.
+
+    Returns True if the job is now a dedup source; its asset records must then
+    be kept, since linked uploads copy them.
+    """
+    try:
+        session = await UploadSessionStore.get_session(job.upload_id)
+        if not session or not session.sha256 or job.deduplicated_from:
+            return False
+        await ContentIndexStore.put(upload_key(session.sha256, job.user_id), {
+            "kind": "upload",
+            "sha256": session.sha256.lower(),
+            "user_id": job.user_id,
+            "job_id": job.id,
+            "total_size": job.total_size,
+        })
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to index upload for job {job.id}: {e}")
+        return False
+
+async def link_duplicate_upload(session: UploadSession, sha256: str) -> Optional[TranscriptionJob]:
+    """Complete a finalized upload from an earlier identical one.
+
+    Creates an already complete job sharing the earlier job's assets and a
+    ready note carrying its transcript. Returns None when there is no usable
+    match and the upload has to go through the pipeline.
+
+    Only whole-file matches are handled here. When a different upload shares
+    audio with an earlier one, the pipeline still runs, and the segments it
+    has already transcribed are answered from stt_cache.
+    """
+    key = upload_key(sha256, session.user_id)
+    entry = await ContentIndexStore.get(key)
+    source = await TranscriptionJobStore.get_job(entry["job_id"], include_checkpoints=False) if entry else None
+
+    source_note = None
+    if source and source.status == TranscriptionStatus.COMPLETE and source.note_id \
+            and source.total_size == session.total_size and source.storage_paths.get("original"):
+        source_note = await NotesStore.get(source.note_id)
+
+    artifacts = {k: v for k, v in ((source_note or {}).get("artifacts") or {}).items() if k in LINKED_ARTIFACTS}
+    if not artifacts.get("transcript"):
+        if entry:
+            # The job or its note is gone or unusable; stop matching it
+            await ContentIndexStore.remove(key)
+        _record_lookup("upload", False)
+        return None
+
+    now = datetime.now(timezone.utc)
+    job = TranscriptionJob(
+        user_id=session.user_id,
+        upload_id=session.id,
+        filename=session.filename,
+        total_size=session.total_size,
+        mime_type=session.mime_type,
+        language=source.language,
+        enable_diarization=source.enable_diarization,
+        lane=source.lane,
+        status=TranscriptionStatus.COMPLETE,
+        current_stage=TranscriptionStage.COMPLETE,
+        progress=100.0,
+        detected_language=source.detected_language,
+        confidence_score=source.confidence_score,
+        total_duration=source.total_duration,
+        word_count=source.word_count,
+        storage_paths=dict(source.storage_paths),
+        deduplicated_from=source.id,
+        started_at=now,
+        completed_at=now
+    )
+    await TranscriptionJobStore.create_job(job)
+
+    # Asset records point at the source job's files; deletion skips shared keys
+    for asset in await TranscriptionAssetStore.get_assets_for_job(source.id):
+        await TranscriptionAssetStore.create_asset(TranscriptionAsset(
+            job_id=job.id,
+            kind=asset.kind,
+            storage_key=asset.storage_key,
+            file_size=asset.file_size,
+            mime_type=asset.mime_type
+        ))
+
+    note_id = await EnhancedNotesStore.create_from_transcription_job(job)
+    job.note_id = note_id
+    await TranscriptionJobStore.set_job_results(job.id, {"note_id": note_id})
+    await NotesStore.set_artifacts(note_id, {**artifacts, "job_id": job.id, "deduplicated_from": source.id})
+    await NotesStore.update_status(note_id, "ready")
+
+    _record_lookup("upload", True)
+    logger.info(f"♻️ Upload {session.id} matches completed job {source.id}, linked as job {job.id} without reprocessing")
+    return job
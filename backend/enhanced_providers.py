@@ -6,7 +6,6 @@ Provides Emergent LLM Key as primary with OpenAI as fallback
 from __future__ import annotations
 import asyncio
 import base64
-import httpx
 import io
 import json
 import logging
@@ -19,6 +18,8 @@ import time
 from datetime import datetime, timezone
 from pathlib import Path
 from dotenv import load_dotenv
+from http_clients import http_clients, Upstream, TransientUpstreamError, is_transient_upstream_error
+from stt_cache import stt_cache
 
 # Load environment variables
 load_dotenv()
@@ -63,6 +64,12 @@ class TranscriptionProvider:
         """
         max_retries = 3
         
+        # Same audio already transcribed (retries, reprocessing): no STT call
+        audio_sha256 = await stt_cache.fingerprint(audio_file_path)
+        cached = await stt_cache.get(audio_sha256, "whisper-1", "en", response_format="verbose_json")
+        if cached is not None:
+            return cached
+        
         for attempt in range(max_retries):
             try:
                 # Try Emergent LLM Key first
@@ -82,6 +89,7 @@ class TranscriptionProvider:
                     result = await self._transcribe_with_openai(audio_file_path, session_id, chunk_idx)
                     if result:
                         logger.info(f"✅ OpenAI transcription success for chunk {chunk_idx} (attempt {attempt + 1})")
+                        await stt_cache.set(audio_sha256, "whisper-1", "en", result, response_format="verbose_json")
                         return result
                 
                 # If both fail, wait and retry
@@ -196,7 +204,7 @@ class TranscriptionProvider:
                 }
                 
                 # Single attempt with clear error messages
-                async with httpx.AsyncClient(timeout=60) as client:
+                async with http_clients.session(Upstream.OPENAI, timeout=60) as client:
                     response = await client.post(
                         'https://api.openai.com/v1/audio/transcriptions',
                         files=files,
@@ -239,7 +247,7 @@ class TranscriptionProvider:
                     elif response.status_code == 429:
                         # Rate limit with clear message
                         logger.warning(f"🚦 OpenAI rate limit hit")
-                        raise ValueError("OpenAI is currently rate limited. Since you topped up your account, this should resolve shortly. Please try again in a few minutes.")
+                        raise TransientUpstreamError("OpenAI is currently rate limited. Since you topped up your account, this should resolve shortly. Please try again in a few minutes.")
                             
                     elif response.status_code == 401:
                         # Authentication error
@@ -265,6 +273,8 @@ class TranscriptionProvider:
                             pass
                         
                         logger.error(f"OpenAI API error {response.status_code}: {error_detail}")
+                        if response.status_code >= 500:
+                            raise TransientUpstreamError(f"OpenAI transcription failed: {error_detail}")
                         raise ValueError(f"OpenAI transcription failed: {error_detail}")
                         
         except ValueError as ve:
@@ -557,7 +567,7 @@ class AIProvider:
                 "Content-Type": "application/json"
             }
             
-            async with httpx.AsyncClient(timeout=60) as client:
+            async with http_clients.session(Upstream.OPENAI, timeout=60) as client:
                 response = await client.post(
                     "https://api.openai.com/v1/chat/completions",
                     json=payload,
@@ -736,7 +746,7 @@ async def transcribe_audio(file_path: str, session_id: str = None) -> dict:
     # Check if it's a URL or local path
     if file_path.startswith('http'):
         # Download file first
-        async with httpx.AsyncClient(timeout=60) as client:
+        async with http_clients.session(Upstream.MEDIA, timeout=60) as client:
             r = await client.get(file_path, follow_redirects=True)
             r.raise_for_status()
             fd, local_path = tempfile.mkstemp()
@@ -788,10 +798,9 @@ async def transcribe_audio(file_path: str, session_id: str = None) -> dict:
             logger.info(f"🔄 Processing {len(chunks)} audio chunks")
             transcriptions = []
             
-            # Process each chunk sequentially with enhanced reliability
+            # Process each chunk sequentially; the upstream governor paces requests
             for i, chunk_path in enumerate(chunks):
                 max_retries = 3
-                retry_delay = 5  # Start with 5 seconds
                 
                 for attempt in range(max_retries):
                     try:
@@ -815,20 +824,13 @@ async def transcribe_audio(file_path: str, session_id: str = None) -> dict:
                         logger.error(f"❌ Error processing chunk {i+1} (attempt {attempt+1}): {e}")
                         
                         if attempt < max_retries - 1:
-                            logger.info(f"🔄 Retrying chunk {i+1} in {retry_delay} seconds...")
-                            await asyncio.sleep(retry_delay)
-                            retry_delay *= 2  # Exponential backoff
+                            # The upstream governor paces the retry
+                            logger.info(f"🔄 Retrying chunk {i+1}...")
                         else:
                             # Final attempt failed
                             logger.error(f"💥 Failed to process chunk {i+1} after {max_retries} attempts")
                             transcriptions.append(f"[Part {i+1}] Error processing this segment after multiple attempts")
                 
-                # Add delay between chunks to respect rate limits and prevent overwhelming the API
-                if i < len(chunks) - 1:
-                    delay = 2 if len(chunks) > 50 else 3  # Shorter delay for very long files
-                    logger.info(f"⏳ Waiting {delay} seconds before processing next chunk...")
-                    await asyncio.sleep(delay)
-                
                 # Clean up chunk file immediately to save disk space
                 try:
                     os.unlink(chunk_path)
@@ -846,6 +848,9 @@ async def transcribe_audio(file_path: str, session_id: str = None) -> dict:
             }
             
     except Exception as e:
+        if is_transient_upstream_error(e):
+            # Surface rate limits and network failures so the caller can retry later
+            raise
         logger.error(f"❌ Enhanced transcription error: {e}")
         return {"text": "", "summary": "", "actions": [], "note": f"Transcription failed: {str(e)}"}
 
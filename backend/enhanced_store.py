@@ -3,13 +3,21 @@ Enhanced store for large-file transcription pipeline
 Extends existing NotesStore with new models
 """
 import os
+import time
+import gzip
+import json
+import asyncio
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any, List
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 from dotenv import load_dotenv
 from pathlib import Path
+from collections import OrderedDict
 import logging
 
+from cloud_storage import storage_manager
+
 from models import (
     UploadSession, TranscriptionJob, TranscriptionAsset, 
     TranscriptionStage, TranscriptionStatus
@@ -26,6 +34,46 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 database = client[os.environ['DB_NAME']]
 
+# Job fields without the (potentially large) per-stage checkpoints
+JOB_WITHOUT_CHECKPOINTS = {"stage_checkpoints": 0}
+
+# Checkpoints whose JSON exceeds this are kept in storage as gzip blobs, with
+# only a reference (and the checkpoint's scalar fields) in the job document
+CHECKPOINT_SPILL_BYTES = int(os.getenv("CHECKPOINT_SPILL_BYTES", str(128 * 1024)))
+SPILLED_BLOB = "spilled_blob"
+
+def checkpoint_json(checkpoint_data: Dict[str, Any]) -> bytes:
+    return json.dumps(checkpoint_data, default=str).encode("utf-8")
+
+def encode_checkpoint_blob(payload: bytes) -> bytes:
+    return gzip.compress(payload, compresslevel=6)
+
+def decode_checkpoint_blob(blob: bytes) -> Dict[str, Any]:
+    return json.loads(gzip.decompress(blob).decode("utf-8"))
+
+def merge_spilled_checkpoint(inline: Dict[str, Any], spilled: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine a spilled checkpoint with fields written inline after the spill.
+
+    A re-run of the transcribing stage records per-segment transcripts as
+    inline "transcripts.<index>" entries on top of the spilled list.
+    """
+    merged = dict(spilled)
+    for key, value in inline.items():
+        if key == SPILLED_BLOB:
+            continue
+        if key == "transcripts" and isinstance(value, dict):
+            earlier = spilled.get(key)
+            if isinstance(earlier, list):
+                by_index = {t["index"]: t for t in earlier if isinstance(t, dict) and "index" in t}
+            else:
+                # JSON turns int segment keys into strings
+                by_index = {int(i): t for i, t in (earlier or {}).items()}
+            by_index.update({int(i): t for i, t in value.items()})
+            merged[key] = by_index
+        else:
+            merged[key] = value
+    return merged
+
 class UploadSessionStore:
     """Store for managing resumable upload sessions"""
     
@@ -86,6 +134,14 @@ class UploadSessionStore:
         if result.deleted_count > 0:
             logger.info(f"Cleaned up {result.deleted_count} expired upload sessions")
     
+    @staticmethod
+    async def is_storage_key_shared(storage_key: str, upload_id: str) -> bool:
+        """Whether another session refers to the same stored file (deduplicated uploads)"""
+        count = await UploadSessionStore.collection.count_documents(
+            {"storage_key": storage_key, "id": {"$ne": upload_id}}, limit=1
+        )
+        return count > 0
+    
     @staticmethod
     async def delete_session(upload_id: str) -> bool:
         """Delete upload session"""
@@ -104,9 +160,10 @@ class TranscriptionJobStore:
         return job
     
     @staticmethod
-    async def get_job(job_id: str) -> Optional[TranscriptionJob]:
-        """Get job by ID"""
-        doc = await TranscriptionJobStore.collection.find_one({"id": job_id})
+    async def get_job(job_id: str, include_checkpoints: bool = True) -> Optional[TranscriptionJob]:
+        """Get job by ID; leave out stage checkpoints when only job fields are needed"""
+        projection = None if include_checkpoints else JOB_WITHOUT_CHECKPOINTS
+        doc = await TranscriptionJobStore.collection.find_one({"id": job_id}, projection)
         if doc:
             return TranscriptionJob(**doc)
         return None
@@ -154,12 +211,72 @@ class TranscriptionJobStore:
     
     @staticmethod
     async def set_stage_checkpoint(job_id: str, stage: TranscriptionStage, checkpoint_data: Dict[str, Any]):
-        """Save checkpoint data for resuming"""
+        """Save checkpoint data for resuming; large checkpoints are spilled to storage"""
+        stored = await TranscriptionJobStore._spill_checkpoint(job_id, stage, checkpoint_data)
+        
+        previous = await TranscriptionJobStore.collection.find_one_and_update(
+            {"id": job_id},
+            {
+                "$set": {
+                    f"stage_checkpoints.{stage.value}": stored,
+                    "updated_at": datetime.now(timezone.utc)
+                }
+            },
+            projection={"_id": 0, f"stage_checkpoints.{stage.value}.{SPILLED_BLOB}": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        
+        # Drop the blob this checkpoint replaced
+        old_ref = ((previous or {}).get("stage_checkpoints") or {}).get(stage.value, {}).get(SPILLED_BLOB)
+        if old_ref:
+            await TranscriptionJobStore._delete_checkpoint_blob(old_ref)
+    
+    @staticmethod
+    async def _spill_checkpoint(job_id: str, stage: TranscriptionStage, checkpoint_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Checkpoint as stored in the job document: inline if small, else a blob reference"""
+        payload = await asyncio.to_thread(checkpoint_json, checkpoint_data)
+        size = len(payload)
+        if size <= CHECKPOINT_SPILL_BYTES:
+            return checkpoint_data
+        
+        blob = await asyncio.to_thread(encode_checkpoint_blob, payload)
+        storage_key = await storage_manager.store_file(
+            blob, f"checkpoint_{stage.value}.json.gz", job_id=job_id,
+            metadata={"kind": "stage_checkpoint", "stage": stage.value, "encoding": "gzip+json"}
+        )
+        logger.info(f"📦 Spilled {stage.value} checkpoint for job {job_id}: {size} -> {len(blob)} bytes")
+        
+        # Keep scalar fields (counts, flags) inline for status views
+        stored = {k: v for k, v in checkpoint_data.items() if isinstance(v, (int, float, bool)) or (isinstance(v, str) and len(v) <= 256)}
+        stored[SPILLED_BLOB] = {"storage_key": storage_key, "size": size, "compressed_size": len(blob)}
+        return stored
+    
+    @staticmethod
+    async def _load_checkpoint(job_id: str, checkpoint: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolve a spilled checkpoint reference to its full data"""
+        ref = checkpoint.get(SPILLED_BLOB) if isinstance(checkpoint, dict) else None
+        if not ref:
+            return checkpoint
+        
+        blob = await storage_manager.get_file(ref["storage_key"])
+        spilled = await asyncio.to_thread(decode_checkpoint_blob, blob)
+        return merge_spilled_checkpoint(checkpoint, spilled)
+    
+    @staticmethod
+    async def _delete_checkpoint_blob(ref: Dict[str, Any]):
+        try:
+            await storage_manager.delete_file(ref["storage_key"])
+        except Exception as e:
+            logger.warning(f"Failed to delete checkpoint blob {ref.get('storage_key')}: {e}")
+    
+    @staticmethod
+    async def set_segment_transcript(job_id: str, index: int, transcript: Dict[str, Any]):
+        """Atomically persist one segment's transcript into the transcribing checkpoint"""
         await TranscriptionJobStore.collection.update_one(
             {"id": job_id},
             {
                 "$set": {
-                    f"stage_checkpoints.{stage.value}": checkpoint_data,
+                    f"stage_checkpoints.{TranscriptionStage.TRANSCRIBING.value}.transcripts.{index}": transcript,
                     "updated_at": datetime.now(timezone.utc)
                 }
             }
@@ -168,10 +285,28 @@ class TranscriptionJobStore:
     @staticmethod
     async def get_stage_checkpoint(job_id: str, stage: TranscriptionStage) -> Optional[Dict[str, Any]]:
         """Get checkpoint data for stage"""
-        job = await TranscriptionJobStore.get_job(job_id)
-        if job and job.stage_checkpoints:
-            return job.stage_checkpoints.get(stage.value)
-        return None
+        checkpoints = await TranscriptionJobStore.get_stage_checkpoints(job_id, [stage])
+        return checkpoints.get(stage.value)
+    
+    @staticmethod
+    async def get_stage_checkpoints(job_id: str, stages: List[TranscriptionStage]) -> Dict[str, Any]:
+        """Get checkpoints for several stages in one read, fetching only those fields"""
+        projection = {"_id": 0}
+        projection.update({f"stage_checkpoints.{stage.value}": 1 for stage in stages})
+        doc = await TranscriptionJobStore.collection.find_one({"id": job_id}, projection)
+        checkpoints = (doc or {}).get("stage_checkpoints") or {}
+        return {
+            stage.value: await TranscriptionJobStore._load_checkpoint(job_id, checkpoints[stage.value])
+            for stage in stages if checkpoints.get(stage.value) is not None
+        }
+    
+    @staticmethod
+    async def record_stage_metrics(job_id: str, stage: TranscriptionStage, metrics: Dict[str, Any]):
+        """Record throughput measurements for a stage"""
+        await TranscriptionJobStore.collection.update_one(
+            {"id": job_id},
+            {"$set": {f"stage_metrics.{stage.value}": metrics}}
+        )
     
     @staticmethod
     async def record_stage_duration(job_id: str, stage: TranscriptionStage, duration_seconds: float):
@@ -243,17 +378,148 @@ class TranscriptionJobStore:
     @staticmethod
     async def list_jobs_for_user(user_id: str, limit: int = 50) -> List[TranscriptionJob]:
         """List jobs for user"""
-        cursor = TranscriptionJobStore.collection.find({"user_id": user_id}).sort("created_at", -1).limit(limit)
+        cursor = TranscriptionJobStore.collection.find({"user_id": user_id}, JOB_WITHOUT_CHECKPOINTS).sort("created_at", -1).limit(limit)
         docs = await cursor.to_list(length=None)
         return [TranscriptionJob(**doc) for doc in docs]
     
     @staticmethod
     async def list_jobs_by_status(status: TranscriptionStatus, limit: int = 100) -> List[TranscriptionJob]:
         """List jobs by status for worker processing"""
-        cursor = TranscriptionJobStore.collection.find({"status": status.value}).sort("created_at", 1).limit(limit)
+        cursor = TranscriptionJobStore.collection.find({"status": status.value}, JOB_WITHOUT_CHECKPOINTS).sort("created_at", 1).limit(limit)
         docs = await cursor.to_list(length=None)
         return [TranscriptionJob(**doc) for doc in docs]
     
+    @staticmethod
+    def _runnable_query(stages: Optional[List[TranscriptionStage]] = None,
+                        lanes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Jobs a worker may claim: runnable status and no live lease"""
+        query = {
+            "status": {"$in": [
+                TranscriptionStatus.CREATED.value,
+                TranscriptionStatus.PENDING.value,
+                TranscriptionStatus.PROCESSING.value
+            ]},
+            "$or": [
+                {"lease_expires_at": None},
+                {"lease_expires_at": {"$lt": datetime.now(timezone.utc)}}
+            ]
+        }
+        if stages:
+            query["current_stage"] = {"$in": [stage.value for stage in stages]}
+        if lanes:
+            # Jobs created before lanes existed count as standard
+            query["lane"] = {"$in": list(lanes) + ([None] if "standard" in lanes else [])}
+        return query
+    
+    @staticmethod
+    async def list_runnable_users(stages: Optional[List[TranscriptionStage]] = None,
+                                  lanes: Optional[List[str]] = None,
+                                  limit: int = 1000) -> Dict[Optional[str], datetime]:
+        """Users with claimable jobs, mapped to their oldest waiting job's created_at"""
+        cursor = TranscriptionJobStore.collection.aggregate([
+            {"$match": TranscriptionJobStore._runnable_query(stages, lanes)},
+            {"$group": {"_id": "$user_id", "oldest": {"$min": "$created_at"}}},
+            {"$limit": limit}
+        ])
+        docs = await cursor.to_list(length=None)
+        return {doc["_id"]: doc["oldest"] for doc in docs}
+    
+    @staticmethod
+    async def get_user_tier(user_id: Optional[str]) -> str:
+        """Quota tier of a user (defaults to free).
+        
+        Reads users.tier, the field QuotaManager tiers are meant to come from.
+        Nothing writes it yet (the request quota check also assumes free), so
+        until tiers are provisioned every user is scheduled with equal weight.
+        """
+        if not user_id:
+            return "free"
+        user = await database["users"].find_one({"id": user_id}, {"tier": 1})
+        return (user or {}).get("tier") or "free"
+    
+    @staticmethod
+    async def claim_next_job(worker_id: str, lease_seconds: int,
+                             stages: Optional[List[TranscriptionStage]] = None,
+                             users: Optional[List[Optional[str]]] = None,
+                             lanes: Optional[List[str]] = None) -> Optional[TranscriptionJob]:
+        """Atomically claim the oldest runnable job that has no live lease.
+        
+        Jobs whose lease has expired (crashed or stalled worker) are
+        reclaimed by the same query. Pass stages to only claim jobs whose
+        current stage is one of them, users to restrict by owner and lanes
+        to restrict by priority lane.
+        """
+        now = datetime.now(timezone.utc)
+        query = TranscriptionJobStore._runnable_query(stages, lanes)
+        if users is not None:
+            query["user_id"] = {"$in": users}
+        
+        doc = await TranscriptionJobStore.collection.find_one_and_update(
+            query,
+            {
+                "$set": {
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds)
+                }
+            },
+            sort=[("created_at", 1)],
+            projection=JOB_WITHOUT_CHECKPOINTS,
+            return_document=ReturnDocument.AFTER
+        )
+        return TranscriptionJob(**doc) if doc else None
+    
+    @staticmethod
+    async def claim_job(job_id: str, worker_id: str, lease_seconds: int) -> Optional[TranscriptionJob]:
+        """Claim a specific job if no other worker holds a live lease on it"""
+        now = datetime.now(timezone.utc)
+        doc = await TranscriptionJobStore.collection.find_one_and_update(
+            {
+                "id": job_id,
+                "$or": [
+                    {"lease_expires_at": None},
+                    {"lease_expires_at": {"$lt": now}},
+                    {"worker_id": worker_id}
+                ]
+            },
+            {
+                "$set": {
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds)
+                }
+            },
+            projection=JOB_WITHOUT_CHECKPOINTS,
+            return_document=ReturnDocument.AFTER
+        )
+        return TranscriptionJob(**doc) if doc else None
+    
+    @staticmethod
+    async def renew_lease(job_id: str, worker_id: str, lease_seconds: int) -> bool:
+        """Extend the lease; returns False if the worker no longer owns the job"""
+        result = await TranscriptionJobStore.collection.update_one(
+            {"id": job_id, "worker_id": worker_id},
+            {"$set": {"lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)}}
+        )
+        return result.matched_count > 0
+    
+    @staticmethod
+    async def defer_job(job_id: str, worker_id: str, seconds: int):
+        """Keep a job unclaimable for a short while without assigning it to a worker"""
+        await TranscriptionJobStore.collection.update_one(
+            {"id": job_id, "worker_id": worker_id},
+            {"$set": {
+                "worker_id": None,
+                "lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=seconds)
+            }}
+        )
+    
+    @staticmethod
+    async def release_lease(job_id: str, worker_id: str):
+        """Give up the lease so any worker can pick the job's next stage"""
+        await TranscriptionJobStore.collection.update_one(
+            {"id": job_id, "worker_id": worker_id},
+            {"$set": {"worker_id": None, "lease_expires_at": None}}
+        )
+    
     @staticmethod
     async def get_jobs_ready_for_retry() -> List[TranscriptionJob]:
         """Get failed jobs that can be retried"""
@@ -266,10 +532,139 @@ class TranscriptionJobStore:
     
     @staticmethod
     async def delete_job(job_id: str):
-        """Delete job from database"""
+        """Delete job from database, along with any spilled checkpoint blobs"""
+        doc = await TranscriptionJobStore.collection.find_one({"id": job_id}, {"_id": 0, "stage_checkpoints": 1})
+        for checkpoint in ((doc or {}).get("stage_checkpoints") or {}).values():
+            if isinstance(checkpoint, dict) and checkpoint.get(SPILLED_BLOB):
+                await TranscriptionJobStore._delete_checkpoint_blob(checkpoint[SPILLED_BLOB])
+        
         result = await TranscriptionJobStore.collection.delete_one({"id": job_id})
         return result.deleted_count > 0
 
+class CheckpointCache:
+    """Per-worker cache of stage checkpoints for the jobs it is running.
+
+    Writes go through to the store; reads are served from memory after the
+    first projection read, so a stage transition costs O(checkpoint) rather
+    than re-reading the whole job. Entries are dropped when the worker
+    releases the job, since another worker may run its next stage.
+    """
+    
+    def __init__(self, max_jobs: int = 64):
+        self.max_jobs = max_jobs
+        self._jobs: OrderedDict = OrderedDict()  # job_id -> {stage: checkpoint}
+    
+    def _entry(self, job_id: str) -> Dict[str, Any]:
+        entry = self._jobs.get(job_id)
+        if entry is None:
+            entry = self._jobs[job_id] = {}
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        else:
+            self._jobs.move_to_end(job_id)
+        return entry
+    
+    async def get_many(self, job_id: str, stages: List[TranscriptionStage]) -> Dict[str, Any]:
+        """Checkpoints for the given stages (missing stages are left out)"""
+        entry = self._entry(job_id)
+        missing = [stage for stage in stages if stage.value not in entry]
+        if missing:
+            entry.update(await TranscriptionJobStore.get_stage_checkpoints(job_id, missing))
+        return {stage.value: entry[stage.value] for stage in stages if stage.value in entry}
+    
+    async def get(self, job_id: str, stage: TranscriptionStage) -> Optional[Dict[str, Any]]:
+        return (await self.get_many(job_id, [stage])).get(stage.value)
+    
+    async def set(self, job_id: str, stage: TranscriptionStage, checkpoint_data: Dict[str, Any]):
+        await TranscriptionJobStore.set_stage_checkpoint(job_id, stage, checkpoint_data)
+        self._entry(job_id)[stage.value] = checkpoint_data
+    
+    async def set_segment_transcript(self, job_id: str, index: int, transcript: Dict[str, Any]):
+        await TranscriptionJobStore.set_segment_transcript(job_id, index, transcript)
+        self._entry(job_id).pop(TranscriptionStage.TRANSCRIBING.value, None)
+    
+    def forget(self, job_id: str):
+        self._jobs.pop(job_id, None)
+
+class ProgressReporter:
+    """Coalesces per-job progress writes.
+    
+    Stage transitions and completion (100%) are written immediately. Within a
+    stage, progress is written only once it has moved by min_delta points and
+    min_interval seconds have passed since the last write; smaller updates are
+    held and flushed by a trailing write at most max_interval seconds later,
+    so pollers never see progress older than that.
+    """
+    
+    def __init__(self, min_interval: Optional[float] = None, min_delta: Optional[float] = None,
+                 max_interval: Optional[float] = None):
+        self.min_interval = min_interval if min_interval is not None else float(os.getenv("PROGRESS_MIN_INTERVAL_SECONDS", "2"))
+        self.min_delta = min_delta if min_delta is not None else float(os.getenv("PROGRESS_MIN_DELTA", "5"))
+        self.max_interval = max_interval if max_interval is not None else float(os.getenv("PROGRESS_MAX_INTERVAL_SECONDS", "15"))
+        self._last: Dict[str, tuple] = {}  # job_id -> (stage, progress, written_at)
+        self._pending: Dict[str, tuple] = {}  # job_id -> (stage, progress)
+        self._timers: Dict[str, asyncio.Task] = {}
+        self.stats = {"written": 0, "coalesced": 0}
+    
+    async def set_stage(self, job_id: str, stage: TranscriptionStage, progress: float = 0.0):
+        """Stage transition: always written, discards held progress of the previous stage"""
+        self._drop_pending(job_id)
+        await TranscriptionJobStore.update_job_stage(job_id, stage, progress)
+        self._last[job_id] = (stage, progress, time.monotonic())
+        self.stats["written"] += 1
+    
+    async def update(self, job_id: str, stage: TranscriptionStage, progress: float):
+        """Report progress within a stage; written now or coalesced"""
+        last = self._last.get(job_id)
+        now = time.monotonic()
+        
+        due = (
+            last is None
+            or last[0] != stage
+            or progress >= 100.0
+            or (abs(progress - last[1]) >= self.min_delta and now - last[2] >= self.min_interval)
+        )
+        if due:
+            await self._write(job_id, stage, progress)
+            return
+        
+        self._pending[job_id] = (stage, progress)
+        self.stats["coalesced"] += 1
+        if job_id not in self._timers:
+            delay = max(0.0, last[2] + self.max_interval - now)
+            self._timers[job_id] = asyncio.create_task(self._flush_later(job_id, delay))
+    
+    async def _write(self, job_id: str, stage: TranscriptionStage, progress: float):
+        self._drop_pending(job_id)
+        await TranscriptionJobStore.update_stage_progress(job_id, stage, progress)
+        self._last[job_id] = (stage, progress, time.monotonic())
+        self.stats["written"] += 1
+    
+    async def _flush_later(self, job_id: str, delay: float):
+        await asyncio.sleep(delay)
+        self._timers.pop(job_id, None)
+        await self.flush(job_id)
+    
+    async def flush(self, job_id: str):
+        """Write any held progress for the job now"""
+        pending = self._pending.get(job_id)
+        if pending:
+            try:
+                await self._write(job_id, *pending)
+            except Exception as e:
+                logger.warning(f"Failed to flush progress for job {job_id}: {e}")
+    
+    def _drop_pending(self, job_id: str):
+        self._pending.pop(job_id, None)
+        timer = self._timers.pop(job_id, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+    
+    def forget(self, job_id: str):
+        """Stop tracking a job this worker no longer holds; held progress is dropped"""
+        self._drop_pending(job_id)
+        self._last.pop(job_id, None)
+
 class TranscriptionAssetStore:
     """Store for managing transcription output assets"""
     
@@ -304,6 +699,14 @@ class TranscriptionAssetStore:
         """List all assets for a job (alias for get_assets_for_job)"""
         return await TranscriptionAssetStore.get_assets_for_job(job_id)
     
+    @staticmethod
+    async def is_storage_key_shared(storage_key: str, job_id: str) -> bool:
+        """Whether another job's asset refers to the same stored file (deduplicated uploads)"""
+        count = await TranscriptionAssetStore.collection.count_documents(
+            {"storage_key": storage_key, "job_id": {"$ne": job_id}}, limit=1
+        )
+        return count > 0
+    
     @staticmethod
     async def delete_assets_by_job(job_id: str) -> int:
         """Delete all assets for a job"""
@@ -0,0 +1,200 @@
+"""
+Fair-share scheduling across users for the transcription pipeline
+Weighted virtual-time queuing: every unit of work a user receives advances
+their virtual clock by cost / weight, and the user with the lowest clock is
+served next. Weights come from the user's quota tier, so a premium user gets
+proportionally more throughput but nobody is starved by another user's backlog.
+"""
+import os
+import asyncio
+import time
+import itertools
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Relative share of pipeline capacity per UserQuota.tier
+TIER_WEIGHTS = {
+    "free": 1.0,
+    "premium": 4.0,
+    "enterprise": 8.0,
+}
+
+ANONYMOUS = "__anonymous__"
+
+# Clocks of users with no waiting or charged work for this long are dropped
+IDLE_SECONDS = float(os.getenv("FAIR_SHARE_IDLE_SECONDS", "600"))
+
+# user -> (tier, cached_at), shared by every scheduler instance
+_tier_cache: Dict[str, tuple] = {}
+
+def tier_weight(tier: Optional[str]) -> float:
+    """Scheduling weight for a quota tier (unknown tiers count as free)"""
+    return TIER_WEIGHTS.get(tier or "free", TIER_WEIGHTS["free"])
+
+class FairShareScheduler:
+    """Weighted fair ordering of users competing for pipeline work"""
+
+    def __init__(self, tier_ttl: float = 300.0, idle_seconds: float = IDLE_SECONDS):
+        self.virtual_time: Dict[str, float] = {}
+        self.last_active: Dict[str, float] = {}  # user -> monotonic time last waiting or charged
+        self.tiers = _tier_cache
+        self.tier_ttl = tier_ttl
+        self.idle_seconds = idle_seconds
+
+    def _key(self, user_id: Optional[str]) -> str:
+        return user_id or ANONYMOUS
+
+    def set_tier(self, user_id: Optional[str], tier: Optional[str]):
+        self.tiers[self._key(user_id)] = (tier or "free", time.time())
+
+    def cached_tier(self, user_id: Optional[str]) -> Optional[str]:
+        """Tier if cached and fresh, else None"""
+        entry = self.tiers.get(self._key(user_id))
+        if entry and time.time() - entry[1] < self.tier_ttl:
+            return entry[0]
+        return None
+
+    def weight(self, user_id: Optional[str]) -> float:
+        entry = self.tiers.get(self._key(user_id))
+        return tier_weight(entry[0] if entry else None)
+
+    def _floor(self, keys: Optional[List[str]] = None) -> float:
+        """Lowest clock among keys that have one, else among every tracked user"""
+        clocks = [self.virtual_time[k] for k in keys or () if k in self.virtual_time]
+        if not clocks:
+            clocks = list(self.virtual_time.values())
+        return min(clocks) if clocks else 0.0
+
+    def order_users(self, candidates: Dict[Optional[str], Any]) -> List[Optional[str]]:
+        """Order waiting users by virtual time, then by how long they have waited.
+
+        candidates maps user_id -> oldest waiting job timestamp. Users seen for
+        the first time, or back after going idle, start at the lowest clock of
+        the users now waiting, so they are served promptly without getting
+        credit for time they were not waiting.
+        """
+        now = time.monotonic()
+        self.forget_idle(now)
+
+        keys = [self._key(u) for u in candidates]
+        floor = self._floor(keys)
+        for key in keys:
+            self.virtual_time.setdefault(key, floor)
+            self.last_active[key] = now
+
+        return sorted(
+            candidates,
+            key=lambda u: (self.virtual_time[self._key(u)], candidates[u])
+        )
+
+    def charge(self, user_id: Optional[str], cost: float):
+        """Advance a user's virtual clock by cost scaled down by their weight"""
+        key = self._key(user_id)
+        current = self.virtual_time.get(key, self._floor())
+        self.virtual_time[key] = current + max(0.0, cost) / self.weight(user_id)
+        self.last_active[key] = time.monotonic()
+
+    def forget_idle(self, now: Optional[float] = None):
+        """Drop clocks of users idle for idle_seconds so a user who stopped
+        submitting neither holds the floor down nor keeps the table growing"""
+        cutoff = (now if now is not None else time.monotonic()) - self.idle_seconds
+        for key, seen in list(self.last_active.items()):
+            if seen < cutoff:
+                del self.last_active[key]
+                self.virtual_time.pop(key, None)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "users": len(self.virtual_time),
+            "virtual_time": dict(self.virtual_time),
+        }
+
+class FairSemaphore:
+    """Semaphore that hands free permits to waiting users in fair-share order.
+
+    Used to share upstream call capacity (e.g. STT segment requests) across
+    jobs: each grant charges the user one unit, so a 200-segment job cannot
+    monopolise the permits while a 2-segment job waits.
+    """
+
+    def __init__(self, permits: int, scheduler: Optional[FairShareScheduler] = None):
+        self.permits = max(1, permits)
+        self.in_use = 0
+        self.scheduler = scheduler or FairShareScheduler()
+        self._queues: Dict[str, deque] = {}  # user -> FIFO of (seq, user_id, future)
+        self._seq = itertools.count()
+
+    def _next_waiter(self):
+        """Head of the queue belonging to the user with the lowest virtual time"""
+        best = None
+        for key, queue in self._queues.items():
+            rank = (self.scheduler.virtual_time.get(key, 0.0), queue[0][0])
+            if best is None or rank < best[0]:
+                best = (rank, key)
+        return best[1] if best else None
+
+    def _grant_next(self):
+        while self.in_use < self.permits:
+            key = self._next_waiter()
+            if key is None:
+                return
+
+            queue = self._queues[key]
+            _, user_id, future = queue.popleft()
+            if not queue:
+                del self._queues[key]
+            if future.done():
+                continue
+
+            self.in_use += 1
+            self.scheduler.charge(user_id, 1.0)
+            future.set_result(True)
+
+    async def acquire(self, user_id: Optional[str] = None):
+        if self.in_use < self.permits and not self._queues:
+            self.in_use += 1
+            self.scheduler.charge(user_id, 1.0)
+            return
+
+        key = self.scheduler._key(user_id)
+        self.scheduler.virtual_time.setdefault(key, self.scheduler._floor())
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append((next(self._seq), user_id, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: hand the permit on
+                self.release()
+            raise
+
+    def release(self):
+        self.in_use -= 1
+        self._grant_next()
+
+        if self.in_use == 0 and not self._queues:
+            # Idle: nobody is owed anything, start clocks afresh
+            self.scheduler.virtual_time.clear()
+            self.scheduler.last_active.clear()
+
+    @asynccontextmanager
+    async def slot(self, user_id: Optional[str] = None):
+        await self.acquire(user_id)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+# Global scheduler shared by job dispatch
+fair_scheduler = FairShareScheduler()
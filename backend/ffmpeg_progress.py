@@ -0,0 +1,191 @@
+"""
+ffmpeg progress monitoring
+ffmpeg is run with -progress, which writes key=value blocks ending in
+"progress=continue" / "progress=end". The monitor parses them against the
+probed media duration to report real progress and throughput as a real-time
+factor (media seconds processed per wall-clock second), and kills ffmpeg if
+its output position stops advancing.
+"""
+import os
+import time
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Callable, Awaitable, Dict, Any
+import logging
+
+from monitoring import monitoring_service
+
+logger = logging.getLogger(__name__)
+
+# No advance of the output position for this long means ffmpeg is stuck
+STALL_SECONDS = float(os.getenv("PIPELINE_FFMPEG_STALL_SECONDS", "120"))
+
+def progress_args(pipe: int = 1) -> list:
+    """Arguments that make ffmpeg write machine-readable progress to a pipe"""
+    return ["-progress", f"pipe:{pipe}", "-nostats"]
+
+class FFmpegStalledError(Exception):
+    """ffmpeg stopped making progress and was killed"""
+
+@dataclass
+class FFmpegProgress:
+    """One ffmpeg progress report"""
+    out_time: float = 0.0  # media seconds written so far
+    speed: Optional[float] = None  # ffmpeg's own speed estimate (e.g. 35.2x)
+    done: bool = False
+
+def parse_out_time(fields: Dict[str, str]) -> Optional[float]:
+    """Output position in seconds from a progress block.
+
+    out_time_ms is in microseconds despite its name, same as out_time_us.
+    """
+    for key in ("out_time_us", "out_time_ms"):
+        value = fields.get(key)
+        if value and value.lstrip("-").isdigit():
+            return max(0.0, int(value) / 1_000_000)
+
+    value = fields.get("out_time")
+    if value and ":" in value:
+        try:
+            hours, minutes, seconds = value.split(":")
+            return max(0.0, int(hours) * 3600 + int(minutes) * 60 + float(seconds))
+        except ValueError:
+            return None
+    return None
+
+class FFmpegProgressParser:
+    """Incremental parser for -progress output; other lines are kept as log text"""
+
+    def __init__(self, max_log_lines: int = 50):
+        self.fields: Dict[str, str] = {}
+        self.log_lines: deque = deque(maxlen=max_log_lines)
+
+    def feed_line(self, line: str) -> Optional[FFmpegProgress]:
+        """Consume one line; returns a report when a progress block completes"""
+        line = line.strip()
+        if not line:
+            return None
+
+        key, sep, value = line.partition("=")
+        if not sep or " " in key:
+            self.log_lines.append(line)
+            return None
+
+        if key != "progress":
+            self.fields[key] = value.strip()
+            return None
+
+        report = FFmpegProgress(
+            out_time=parse_out_time(self.fields) or 0.0,
+            done=value.strip() == "end"
+        )
+        speed = self.fields.get("speed", "").rstrip("x").strip()
+        try:
+            report.speed = float(speed)
+        except ValueError:
+            pass
+        self.fields = {}
+        return report
+
+    @property
+    def log_text(self) -> str:
+        return "\n".join(self.log_lines)
+
+class FFmpegProgressMonitor:
+    """Reads ffmpeg progress from a stream, reports it and watches for stalls"""
+
+    def __init__(self, process: asyncio.subprocess.Process, stream: asyncio.StreamReader,
+                 total_duration: Optional[float] = None,
+                 on_progress: Optional[Callable[[float, FFmpegProgress], Awaitable[None]]] = None,
+                 stall_seconds: float = STALL_SECONDS):
+        self.process = process
+        self.stream = stream
+        self.total_duration = total_duration or 0.0
+        self.on_progress = on_progress
+        self.stall_seconds = stall_seconds
+        self.parser = FFmpegProgressParser()
+        self.started = time.monotonic()
+        self.last_advance = self.started
+        self.finished: Optional[float] = None
+        self.out_time = 0.0
+        self.stalled = False
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def realtime_factor(self) -> Optional[float]:
+        """Media seconds processed per wall-clock second"""
+        return self.out_time / self.elapsed if self.elapsed > 0 and self.out_time > 0 else None
+
+    @property
+    def log_text(self) -> str:
+        return self.parser.log_text
+
+    async def _read(self):
+        while True:
+            line = await self.stream.readline()
+            if not line:
+                return
+
+            report = self.parser.feed_line(line.decode(errors="ignore"))
+            if report is None:
+                continue
+
+            if report.out_time > self.out_time:
+                self.out_time = report.out_time
+                self.last_advance = time.monotonic()
+
+            if self.on_progress and self.total_duration:
+                fraction = min(1.0, self.out_time / self.total_duration)
+                try:
+                    await self.on_progress(fraction, report)
+                except Exception as e:
+                    logger.warning(f"Progress callback failed: {e}")
+
+    async def _watch(self, reader: asyncio.Task):
+        interval = max(0.5, min(5.0, self.stall_seconds / 4))
+        while not reader.done():
+            await asyncio.sleep(interval)
+            if reader.done() or self.process.returncode is not None:
+                return
+            if time.monotonic() - self.last_advance > self.stall_seconds:
+                self.stalled = True
+                logger.error(f"⏸️ ffmpeg made no progress for {self.stall_seconds:.0f}s at {self.out_time:.1f}s, killing it")
+                self.process.kill()
+                return
+
+    async def run(self):
+        """Consume the stream to EOF while watching for stalls"""
+        reader = asyncio.create_task(self._read())
+        watcher = asyncio.create_task(self._watch(reader))
+        try:
+            await reader
+        finally:
+            watcher.cancel()
+            self.finished = time.monotonic()
+
+    def check(self):
+        """Raise if ffmpeg was killed for stalling"""
+        if self.stalled:
+            raise FFmpegStalledError(f"FFmpeg stalled: no progress for {self.stall_seconds:.0f}s at {self.out_time:.1f}s")
+
+    def record(self, stage: str) -> Dict[str, Any]:
+        """Report throughput to monitoring; returns the stage metrics to store"""
+        collector = monitoring_service.metrics_collector
+        tags = {"stage": stage}
+        metrics: Dict[str, Any] = {
+            "media_seconds": round(self.out_time, 3),
+            "wall_seconds": round(self.elapsed, 3),
+        }
+
+        rtf = self.realtime_factor
+        if rtf is not None:
+            metrics["realtime_factor"] = round(rtf, 2)
+            collector.record_histogram("ffmpeg_realtime_factor", rtf, tags)
+        if self.stalled:
+            metrics["stalled"] = True
+            collector.increment_counter("ffmpeg_stalls", tags=tags)
+        return metrics
@@ -0,0 +1,152 @@
+"""
+Shared HTTP clients for upstream calls
+One pooled httpx.AsyncClient per upstream (OpenAI, Google Vision, SendGrid,
+webhooks, media downloads) reused by every module, so requests ride on
+kept-alive connections instead of paying a TCP+TLS handshake each time.
+Calls to AI upstreams are paced by the shared rate governor. Clients are
+created lazily and closed by the application lifespan.
+"""
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+import logging
+
+import httpx
+
+from rate_limiting import upstream_governor
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+class Upstream:
+    """Named upstreams, each with its own connection pool"""
+    OPENAI = "openai"
+    GOOGLE = "google"
+    SENDGRID = "sendgrid"
+    WEBHOOKS = "webhooks"
+    MEDIA = "media"  # downloads of user-supplied URLs
+
+# Upstreams whose calls are paced by the shared rate governor
+GOVERNED_UPSTREAMS = {Upstream.OPENAI, Upstream.GOOGLE}
+
+class TransientUpstreamError(RuntimeError):
+    """Upstream refused or failed the call for now (rate limit, 5xx); worth retrying later"""
+
+def is_transient_upstream_error(exc: Optional[BaseException]) -> bool:
+    """True if exc, or any error it was raised while handling, is a transient upstream failure"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (TransientUpstreamError, httpx.TransportError)):
+            return True
+        if isinstance(exc, httpx.HTTPStatusError):
+            status = exc.response.status_code
+            if status == 429 or status >= 500:
+                return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+def _rate_key(upstream: str, kwargs: Dict) -> str:
+    """Governor key: the upstream plus the model named in the request body"""
+    for body in (kwargs.get("json"), kwargs.get("data")):
+        if isinstance(body, dict) and body.get("model"):
+            return f"{upstream}:{body['model']}"
+    return upstream
+
+class TimeoutBoundClient:
+    """View of a shared client that applies a per-call-site default timeout
+    and, for governed upstreams, waits for a rate governor permit"""
+
+    def __init__(self, client: httpx.AsyncClient, timeout: httpx.Timeout, upstream: Optional[str] = None):
+        self.client = client
+        self.timeout = timeout
+        self.upstream = upstream
+
+    async def request(self, method: str, url, **kwargs) -> httpx.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        if self.upstream not in GOVERNED_UPSTREAMS:
+            return await self.client.request(method, url, **kwargs)
+
+        key = _rate_key(self.upstream, kwargs)
+        await upstream_governor.acquire(key)
+        response = await self.client.request(method, url, **kwargs)
+        upstream_governor.observe(key, response.status_code, response.headers)
+        return response
+
+    async def get(self, url, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+class HTTPClientRegistry:
+    """Process-wide registry of pooled upstream clients"""
+
+    def __init__(self):
+        self.http2 = HTTP2_AVAILABLE and os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+        self.connect_timeout = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+        self.default_timeout = float(os.getenv("HTTP_DEFAULT_TIMEOUT_SECONDS", "60"))
+        # httpx limits apply per client; each client serves a single upstream host
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS_PER_CLIENT", "100")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30")),
+        )
+        # upstream -> (client, event loop it belongs to)
+        self._clients: Dict[str, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+
+    def timeout(self, seconds: Optional[float] = None) -> httpx.Timeout:
+        return httpx.Timeout(seconds or self.default_timeout, connect=self.connect_timeout)
+
+    def get(self, upstream: str) -> httpx.AsyncClient:
+        """Shared client for an upstream, created on first use"""
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(upstream)
+        if entry and entry[1] is loop and not entry[0].is_closed:
+            return entry[0]
+
+        # Connections cannot cross event loops (e.g. a fresh loop per test)
+        client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=self.limits,
+            timeout=self.timeout(),
+            follow_redirects=upstream == Upstream.MEDIA,
+        )
+        self._clients[upstream] = (client, loop)
+        logger.debug(f"🔌 Created pooled HTTP client for {upstream} (http2={self.http2})")
+        return client
+
+    @asynccontextmanager
+    async def session(self, upstream: str, timeout: Optional[float] = None):
+        """Borrow the shared client for a block of calls; the pool stays open"""
+        yield TimeoutBoundClient(self.get(upstream), self.timeout(timeout), upstream)
+
+    async def start(self):
+        """Pre-create clients for the hot upstreams"""
+        for upstream in (Upstream.OPENAI, Upstream.WEBHOOKS):
+            self.get(upstream)
+        logger.info(f"🔌 HTTP client pools ready (http2={self.http2}, limits={self.limits})")
+
+    async def aclose(self):
+        """Close every client owned by the running event loop"""
+        loop = asyncio.get_running_loop()
+        for upstream, (client, client_loop) in list(self._clients.items()):
+            if client_loop is loop:
+                await client.aclose()
+                del self._clients[upstream]
+
+# Global client registry
+http_clients = HTTPClientRegistry()
@@ -0,0 +1,110 @@
+"""
+Wake-up notifications for the transcription pipeline
+Idle workers block on a notification instead of polling MongoDB; producers
+(finalize_upload, retries) signal when a job becomes runnable. Redis pub/sub
+fans the signal out to workers in other processes when enabled.
+"""
+import os
+import asyncio
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Try to import Redis
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+class JobNotifier:
+    """In-process wake-up event with optional Redis pub/sub fan-out"""
+
+    def __init__(self, channel: str = "pipeline:jobs"):
+        self.channel = channel
+        self._event = asyncio.Event()
+        self._redis = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self.use_redis = (
+            REDIS_AVAILABLE
+            and os.getenv("REDIS_AVAILABLE", "false").lower() == "true"
+            and os.getenv("PIPELINE_NOTIFY_BACKEND", "redis").lower() == "redis"
+        )
+
+    def listen(self) -> asyncio.Event:
+        """Return the event the next notification will set.
+
+        Take it *before* checking for work so a notification that arrives
+        in between is not missed.
+        """
+        return self._event
+
+    async def wait(self, event: asyncio.Event, timeout: float) -> bool:
+        """Wait for a notification or the timeout; True if woken by a notification"""
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def wake_local(self):
+        """Wake every worker in this process"""
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    async def notify(self, job_id: Optional[str] = None):
+        """Signal that a job is ready to run"""
+        self.wake_local()
+
+        if self._redis is not None:
+            try:
+                await self._redis.publish(self.channel, job_id or "")
+            except Exception as e:
+                logger.warning(f"Failed to publish job notification: {e}")
+
+    async def start(self):
+        """Subscribe to cross-process notifications (Redis only)"""
+        if not self.use_redis or self._listener_task:
+            return
+
+        try:
+            self._redis = aioredis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))
+            await self._redis.ping()
+            self._listener_task = asyncio.create_task(self._listen_redis())
+            logger.info(f"📣 Job notifications via Redis channel {self.channel}")
+        except Exception as e:
+            logger.warning(f"Redis job notifications unavailable, using in-process only: {e}")
+            self._redis = None
+
+    async def stop(self):
+        """Stop the Redis listener"""
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def _listen_redis(self):
+        """Relay Redis messages to local waiters, reconnecting on failure"""
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.wake_local()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job notification listener error: {e}")
+                await asyncio.sleep(5)
+
+# Global notifier instance
+job_notifier = JobNotifier()
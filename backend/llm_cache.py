@@ -0,0 +1,109 @@
+"""
+Response cache for note analysis LLM calls
+Meeting minutes, action items and reports are pure functions of the prompt
+template, the model, the note content and the user's profile context, so a
+repeated export is served from the last result instead of another 60-120s
+chat completion. Single-note results live with the note artifacts (next to
+the generated text they already store); multi-note batch results live in
+cache_manager. Keys carry a content hash, so an edited transcript never
+matches an old entry.
+"""
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+import logging
+
+from cache_manager import cache_manager
+from monitoring import monitoring_service
+
+logger = logging.getLogger(__name__)
+
+# Bump a template's version whenever its prompt changes to retire old results
+PROMPT_VERSIONS = {
+    "meeting_minutes": 1,
+    "action_items": 1,
+    "professional_report": 1,
+    "batch_meeting_minutes": 1,
+    "batch_action_items": 1,
+    "batch_business_report": 1,
+}
+
+# Artifact holding the cache key each stored result was generated under
+NOTE_CACHE_FIELD = "llm_cache"
+
+# Note content that analysis prompts are built from
+CONTENT_ARTIFACTS = ("transcript", "text", "ai_conversations")
+
+def content_hash(*parts: Any) -> str:
+    """Stable SHA-256 over prompt inputs (strings, lists, dicts)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, default=str)
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+def invalidate_on_content_change(old_artifacts: Dict[str, Any], new_artifacts: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop cached analysis markers when an update changes the note content"""
+    if NOTE_CACHE_FIELD not in new_artifacts:
+        return new_artifacts
+    if all(old_artifacts.get(f) == new_artifacts.get(f) for f in CONTENT_ARTIFACTS):
+        return new_artifacts
+    return {k: v for k, v in new_artifacts.items() if k != NOTE_CACHE_FIELD}
+
+class LLMResponseCache:
+    """Lookup and storage of analysis results by prompt inputs"""
+
+    def __init__(self):
+        self.enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.batch_ttl = int(os.getenv("LLM_CACHE_BATCH_TTL_SECONDS", str(7 * 86400)))
+
+    @staticmethod
+    def key(kind: str, model: str, content_sha256: str, profile: Optional[Dict[str, Any]] = None) -> str:
+        """Cache key from template version, model, content hash and profile context hash"""
+        return cache_manager._generate_key(
+            "llm", f"{kind}:{content_sha256}",
+            version=PROMPT_VERSIONS.get(kind, 1), model=model, profile=content_hash(profile or {})
+        )
+
+    @staticmethod
+    def _record(kind: str, hit: bool):
+        monitoring_service.metrics_collector.increment_counter(
+            "llm_cache_lookups", tags={"kind": kind, "result": "hit" if hit else "miss"}
+        )
+
+    def from_note(self, artifacts: Dict[str, Any], kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """The note's stored result for kind if it was generated under this key"""
+        if not self.enabled:
+            return None
+        entry = (artifacts.get(NOTE_CACHE_FIELD) or {}).get(kind)
+        hit = bool(entry) and entry.get("key") == key and bool(artifacts.get(kind))
+        self._record(kind, hit)
+        if not hit:
+            return None
+        return {"content": artifacts[kind], "generated_at": entry.get("generated_at")}
+
+    @staticmethod
+    def note_artifacts(artifacts: Dict[str, Any], kind: str, key: str, content: str) -> Dict[str, Any]:
+        """Artifacts with a freshly generated result stored under kind and its key recorded"""
+        markers = dict(artifacts.get(NOTE_CACHE_FIELD) or {})
+        markers[kind] = {"key": key, "generated_at": datetime.now(timezone.utc).isoformat()}
+        return {**artifacts, kind: content, NOTE_CACHE_FIELD: markers}
+
+    async def get(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """Batch result from cache_manager"""
+        if not self.enabled or not cache_manager.enabled:
+            return None
+        value = await cache_manager.backend.get(key)
+        self._record(kind, value is not None)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        if self.enabled and cache_manager.enabled:
+            await cache_manager.backend.set(key, value, self.batch_ttl)
+
+# Global LLM response cache
+llm_cache = LLMResponseCache()
@@ -1,6 +1,7 @@
 """
 Enhanced data models for large-file audio transcription pipeline
 """
+import os
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
@@ -43,6 +44,7 @@ class TranscriptionStage(str, Enum):
 class TranscriptionStatus(str, Enum):
     """Overall job status"""
     CREATED = "created"
+    PENDING = "pending"  # Runnable, waiting for a concurrency slot
     PROCESSING = "processing"
     COMPLETE = "complete"
     FAILED = "failed"
@@ -68,6 +70,7 @@ class TranscriptionJob(BaseModel):
     enable_multi_language: bool = False  # Multi-language detection
     output_formats: List[str] = Field(default_factory=lambda: ["txt", "json", "srt", "vtt", "docx"])
     processing_priority: str = "normal"  # normal, high, low
+    lane: str = "standard"  # Priority lane: interactive, standard, bulk (set from duration)
     
     # Pipeline state
     status: TranscriptionStatus = TranscriptionStatus.CREATED
@@ -78,6 +81,7 @@ class TranscriptionJob(BaseModel):
     stage_progress: Dict[str, float] = Field(default_factory=dict)  # Per-stage progress
     stage_durations: Dict[str, float] = Field(default_factory=dict)  # Duration in seconds
     stage_checkpoints: Dict[str, Any] = Field(default_factory=dict)  # Resume data
+    stage_metrics: Dict[str, Dict[str, Any]] = Field(default_factory=dict)  # Throughput (e.g. ffmpeg real-time factor)
     
     # Results
     detected_language: Optional[str] = None
@@ -97,8 +101,13 @@ class TranscriptionJob(BaseModel):
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     
+    # Worker lease (set while a pipeline worker owns the job)
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    
     # Storage references
     storage_paths: Dict[str, str] = Field(default_factory=dict)  # normalized_audio, segments, etc.
+    deduplicated_from: Optional[str] = None  # Completed job whose results this identical upload reuses
 
 class TranscriptionAsset(BaseModel):
     """Output files generated from transcription"""
@@ -191,6 +200,15 @@ class PipelineConfig(BaseModel):
     max_concurrent_jobs: int = 10
     max_concurrent_segments: int = 5
     
+    # Decode and segment in one streaming pass instead of writing a normalized WAV first
+    fused_transcode_segment: bool = Field(
+        default_factory=lambda: os.getenv("PIPELINE_FUSED_TRANSCODE", "false").lower() == "true"
+    )
+    
+    # Segment encoding sent to STT: "wav" (PCM), "flac" or "opus" (OGG)
+    segment_codec: str = Field(default_factory=lambda: os.getenv("PIPELINE_SEGMENT_CODEC", "wav").lower())
+    segment_bitrate: str = "24k"  # opus only
+    
     # Allowed file types - Universal audio/video format support
     allowed_mime_types: List[str] = [
         # Standard audio formats
@@ -236,6 +254,10 @@ class PipelineConfig(BaseModel):
     enable_ai_diarization_by_default: bool = True
     max_speakers: int = 10
     language_detection_segments: int = 3  # Number of segments to use for language detection
+    # Length of each language sample cut from the normalized PCM
+    language_sample_seconds: float = Field(
+        default_factory=lambda: float(os.getenv("PIPELINE_LANGUAGE_SAMPLE_SECONDS", "20"))
+    )
     ai_diarization_confidence_threshold: float = 0.7
     
     # Storage configuration
@@ -364,6 +364,56 @@ class ApplicationMonitor:
                 timestamp=datetime.now(timezone.utc)
             )
 
+class EventLoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task.
+    
+    Lag well above zero means something is running blocking work on the loop
+    (file I/O, boto3, hashing) and every request and pipeline stage waits.
+    """
+    
+    def __init__(self, metrics_collector: MetricsCollector):
+        self.metrics_collector = metrics_collector
+        self.interval = float(os.getenv("EVENT_LOOP_LAG_INTERVAL_MS", "500")) / 1000
+        self.warn_ms = float(os.getenv("EVENT_LOOP_LAG_WARN_MS", "250"))
+        self.task = None
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+    
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+    
+    def record(self, lag_ms: float):
+        lag_ms = max(lag_ms, 0.0)
+        self.last_lag_ms = lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        self.metrics_collector.record_histogram("event_loop_lag_ms", lag_ms, unit="ms")
+        self.metrics_collector.set_gauge("event_loop_lag_ms_current", lag_ms, unit="ms")
+        if lag_ms >= self.warn_ms:
+            logger.warning(f"🐢 Event loop lag {lag_ms:.0f}ms - blocking work on the loop")
+    
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.record((time.perf_counter() - started - self.interval) * 1000)
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "current_ms": round(self.last_lag_ms, 2),
+            "max_ms": round(self.max_lag_ms, 2),
+            **self.metrics_collector.get_histogram_stats("event_loop_lag_ms")
+        }
+
 class MonitoringService:
     """Main monitoring service"""
     
@@ -371,6 +421,7 @@ class MonitoringService:
         self.metrics_collector = MetricsCollector()
         self.system_monitor = SystemMonitor()
         self.app_monitor = ApplicationMonitor(self.metrics_collector)
+        self.loop_lag_monitor = EventLoopLagMonitor(self.metrics_collector)
         self.monitoring_active = False
         self.monitoring_task = None
         
@@ -381,11 +432,13 @@ class MonitoringService:
         
         self.monitoring_active = True
         self.monitoring_task = asyncio.create_task(self._monitoring_loop(interval_seconds))
+        self.loop_lag_monitor.start()
         logger.info("Monitoring service started")
     
     async def stop_monitoring(self):
         """Stop background monitoring"""
         self.monitoring_active = False
+        await self.loop_lag_monitor.stop()
         if self.monitoring_task:
             self.monitoring_task.cancel()
             try:
@@ -440,6 +493,7 @@ class MonitoringService:
             },
             "api_stats": self.metrics_collector.get_histogram_stats("api_response_time"),
             "job_stats": self.metrics_collector.get_histogram_stats("job_duration"),
+            "event_loop_lag": self.loop_lag_monitor.get_status(),
             "cache_stats": await self._get_cache_stats(),
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
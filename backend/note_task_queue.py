@@ -0,0 +1,321 @@
+"""
+Durable task queue for note processing (memo transcription and OCR)
+Uploads enqueue a task document in MongoDB instead of running the work in the
+API process. A consumer claims tasks under a renewable lease, so work left by a
+crashed or restarted consumer is picked up again once the lease expires. The
+consumer runs as its own process (note_worker.py) or, for local development,
+embedded in the API process.
+"""
+import os
+import uuid
+import time
+import socket
+import asyncio
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Optional, Set
+import logging
+
+from pymongo import ReturnDocument
+
+from store import database, NotesStore
+from job_notifier import JobNotifier
+
+logger = logging.getLogger(__name__)
+
+class NoteTaskKind:
+    """Kinds of note processing work"""
+    TRANSCRIPTION = "transcription"
+    OCR = "ocr"
+
+class NoteTaskStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+# Lower runs first: OCR is always short, interactive work
+TASK_PRIORITY = {
+    NoteTaskKind.OCR: 0,
+    NoteTaskKind.TRANSCRIPTION: 1,
+}
+
+MAX_ATTEMPTS = int(os.getenv("NOTE_TASK_MAX_ATTEMPTS", "3"))
+RETRY_BACKOFF_SECONDS = int(os.getenv("NOTE_TASK_RETRY_BACKOFF_SECONDS", "30"))
+
+class NoteTaskStore:
+    """Store for queued note processing tasks"""
+
+    collection = database["note_tasks"]
+
+    @staticmethod
+    async def ensure_indexes():
+        await NoteTaskStore.collection.create_index([("status", 1), ("priority", 1), ("created_at", 1)])
+        await NoteTaskStore.collection.create_index("note_id")
+
+    @staticmethod
+    async def enqueue(kind: str, note_id: str) -> str:
+        """Queue a note for processing and return the task ID"""
+        now = datetime.now(timezone.utc)
+        task_id = str(uuid.uuid4())
+        await NoteTaskStore.collection.insert_one({
+            "id": task_id,
+            "kind": kind,
+            "note_id": note_id,
+            "status": NoteTaskStatus.QUEUED,
+            "priority": TASK_PRIORITY.get(kind, 1),
+            "attempts": 0,
+            "max_attempts": MAX_ATTEMPTS,
+            "worker_id": None,
+            "lease_expires_at": None,
+            "available_at": now,
+            "last_error": None,
+            "created_at": now,
+            "updated_at": now,
+        })
+        return task_id
+
+    @staticmethod
+    async def claim_next(worker_id: str, lease_seconds: int) -> Optional[Dict[str, Any]]:
+        """Atomically claim the next due task, or one whose consumer's lease expired"""
+        now = datetime.now(timezone.utc)
+        return await NoteTaskStore.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": NoteTaskStatus.QUEUED, "available_at": {"$lte": now}},
+                    {"status": NoteTaskStatus.RUNNING, "lease_expires_at": {"$lt": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": NoteTaskStatus.RUNNING,
+                    "worker_id": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("priority", 1), ("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    async def renew_lease(task_id: str, worker_id: str, lease_seconds: int) -> bool:
+        """Extend the lease; returns False if the consumer no longer owns the task"""
+        result = await NoteTaskStore.collection.update_one(
+            {"id": task_id, "worker_id": worker_id, "status": NoteTaskStatus.RUNNING},
+            {"$set": {"lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)}}
+        )
+        return result.matched_count > 0
+
+    @staticmethod
+    async def complete(task_id: str, worker_id: str):
+        await NoteTaskStore.collection.update_one(
+            {"id": task_id, "worker_id": worker_id},
+            {"$set": {
+                "status": NoteTaskStatus.DONE,
+                "worker_id": None,
+                "lease_expires_at": None,
+                "updated_at": datetime.now(timezone.utc),
+            }}
+        )
+
+    @staticmethod
+    async def fail(task: Dict[str, Any], worker_id: str, error: str) -> bool:
+        """Record a failed attempt; requeue with backoff or give up. Returns True if requeued"""
+        now = datetime.now(timezone.utc)
+        attempts = task.get("attempts", 1)
+        retry = attempts < task.get("max_attempts", MAX_ATTEMPTS)
+
+        update = {
+            "worker_id": None,
+            "lease_expires_at": None,
+            "last_error": error[:1000],
+            "updated_at": now,
+        }
+        if retry:
+            update["status"] = NoteTaskStatus.QUEUED
+            update["available_at"] = now + timedelta(seconds=RETRY_BACKOFF_SECONDS * attempts)
+        else:
+            update["status"] = NoteTaskStatus.FAILED
+
+        await NoteTaskStore.collection.update_one({"id": task["id"], "worker_id": worker_id}, {"$set": update})
+        return retry
+
+    @staticmethod
+    async def get_queue_stats() -> Dict[str, int]:
+        """Task counts by status"""
+        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        stats = {}
+        async for doc in NoteTaskStore.collection.aggregate(pipeline):
+            stats[doc["_id"]] = doc["count"]
+        return stats
+
+def _task_handlers():
+    # Imported lazily: tasks pulls in the STT/OCR providers
+    from tasks import enqueue_transcription, enqueue_ocr
+    return {
+        NoteTaskKind.TRANSCRIPTION: enqueue_transcription,
+        NoteTaskKind.OCR: enqueue_ocr,
+    }
+
+class NoteTaskConsumer:
+    """Claims note tasks and runs them with bounded concurrency"""
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:notes:{uuid.uuid4().hex[:8]}"
+        self.concurrency = max(1, int(os.getenv("NOTE_TASK_CONCURRENCY", "8")))
+        self.lease_seconds = int(os.getenv("NOTE_TASK_LEASE_SECONDS", "120"))
+        self.idle_poll_seconds = int(os.getenv("NOTE_TASK_IDLE_POLL_SECONDS", "30"))
+        self.active: Set[asyncio.Task] = set()
+        self.running = False
+        self._handlers = None
+
+    async def _heartbeat(self, task_id: str, handling: asyncio.Task, lease_lost: asyncio.Event):
+        """Renew the task lease at a third of its length.
+
+        If the lease is lost (it expired and another consumer may have claimed
+        the task), the handler is cancelled so two consumers never process and
+        write the same note.
+        """
+        interval = max(1, self.lease_seconds // 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await NoteTaskStore.renew_lease(task_id, self.worker_id, self.lease_seconds):
+                    logger.warning(f"⚠️ Lost lease on note task {task_id}")
+                    lease_lost.set()
+                    handling.cancel()
+                    return
+            except Exception as e:
+                logger.warning(f"Failed to renew lease for note task {task_id}: {e}")
+
+    async def run_task(self, task: Dict[str, Any]):
+        """Run one claimed task to completion, keeping its lease alive"""
+        if self._handlers is None:
+            self._handlers = _task_handlers()
+
+        task_id, note_id, kind = task["id"], task["note_id"], task["kind"]
+        handler = self._handlers.get(kind)
+        lease_lost = asyncio.Event()
+        heartbeat = None
+        start = time.time()
+
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown note task kind: {kind}")
+
+            # Lane wait is measured from when the task became due, not when it was claimed
+            queued_at = task.get("available_at") or task.get("created_at")
+            handling = asyncio.create_task(handler(note_id, queued_at=queued_at))
+            heartbeat = asyncio.create_task(self._heartbeat(task_id, handling, lease_lost))
+            await handling
+            await NoteTaskStore.complete(task_id, self.worker_id)
+            logger.info(f"✅ Note task {kind} for {note_id} done in {time.time() - start:.1f}s")
+
+        except asyncio.CancelledError:
+            if not lease_lost.is_set():
+                raise
+            # Another consumer may own the task now; stop without touching its state
+            logger.warning(f"🛑 Note task {kind} for {note_id} abandoned after losing its lease")
+
+        except Exception as e:
+            # Handlers record their own user-facing failures; this catches crashes
+            if await NoteTaskStore.fail(task, self.worker_id, str(e)):
+                logger.warning(f"🔄 Note task {kind} for {note_id} failed (attempt {task.get('attempts')}), requeued: {e}")
+            else:
+                logger.error(f"❌ Note task {kind} for {note_id} failed permanently: {e}")
+                await NotesStore.update_status(note_id, "failed")
+                await NotesStore.set_artifacts(note_id, {"error": "Processing failed. Please try again."})
+        finally:
+            if heartbeat:
+                heartbeat.cancel()
+                try:
+                    await heartbeat
+                except asyncio.CancelledError:
+                    pass
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """Claim the next task, failing any that have exhausted their attempts"""
+        while True:
+            task = await NoteTaskStore.claim_next(self.worker_id, self.lease_seconds)
+            if not task:
+                return None
+            if task["attempts"] <= task.get("max_attempts", MAX_ATTEMPTS):
+                return task
+
+            # Its consumer died mid-task on every attempt
+            logger.error(f"❌ Note task {task['id']} abandoned after {task['attempts'] - 1} attempts")
+            await NoteTaskStore.fail(task, self.worker_id, "Consumer lease expired")
+            await NotesStore.update_status(task["note_id"], "failed")
+            await NotesStore.set_artifacts(task["note_id"], {"error": "Processing failed. Please try again."})
+
+    def _launch(self, task: Dict[str, Any]):
+        running = asyncio.create_task(self.run_task(task))
+        self.active.add(running)
+
+        def _done(t: asyncio.Task):
+            self.active.discard(t)
+            note_task_notifier.wake_local()
+
+        running.add_done_callback(_done)
+
+    async def run(self):
+        """Consume tasks until stopped; in-flight tasks finish before returning"""
+        self.running = True
+        logger.info(f"🚀 Note task consumer {self.worker_id} started (concurrency {self.concurrency})")
+
+        try:
+            await NoteTaskStore.ensure_indexes()
+        except Exception as e:
+            logger.warning(f"Could not ensure note task indexes: {e}")
+
+        try:
+            while self.running:
+                try:
+                    wakeup = note_task_notifier.listen()
+                    claimed = False
+
+                    while self.running and len(self.active) < self.concurrency:
+                        task = await self._claim()
+                        if not task:
+                            break
+                        self._launch(task)
+                        claimed = True
+
+                    if not claimed:
+                        await note_task_notifier.wait(wakeup, self.idle_poll_seconds)
+
+                except Exception as e:
+                    logger.error(f"Note task consumer error: {str(e)}")
+                    await asyncio.sleep(10)
+        finally:
+            if self.active:
+                await asyncio.gather(*self.active, return_exceptions=True)
+            logger.info(f"🛑 Note task consumer {self.worker_id} stopped")
+
+    def stop(self):
+        self.running = False
+        note_task_notifier.wake_local()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "running": self.running,
+            "active": len(self.active),
+            "concurrency": self.concurrency,
+        }
+
+async def enqueue_note_task(kind: str, note_id: str) -> str:
+    """Durably queue note processing and wake a consumer"""
+    task_id = await NoteTaskStore.enqueue(kind, note_id)
+    await note_task_notifier.notify(task_id)
+    logger.info(f"📥 Queued {kind} task {task_id} for note {note_id}")
+    return task_id
+
+def embedded_consumer_enabled() -> bool:
+    """Run the consumer inside the API process (local stand-in for note_worker.py)"""
+    return os.getenv("NOTE_TASK_CONSUMER", "embedded").lower() == "embedded"
+
+# Global notifier and consumer
+note_task_notifier = JobNotifier(channel="notes:tasks")
+note_task_consumer = NoteTaskConsumer()
@@ -0,0 +1,30 @@
+"""
+Standalone consumer process for queued note processing
+Run alongside the API with NOTE_TASK_CONSUMER=external:
+
+    python note_worker.py
+"""
+import asyncio
+import signal
+import logging
+
+from note_task_queue import note_task_consumer, note_task_notifier
+from http_clients import http_clients
+
+logger = logging.getLogger(__name__)
+
+async def run_note_worker():
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, note_task_consumer.stop)
+
+    await note_task_notifier.start()
+    try:
+        await note_task_consumer.run()
+    finally:
+        await note_task_notifier.stop()
+        await http_clients.aclose()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    asyncio.run(run_note_worker())
@@ -7,7 +7,9 @@ import json
 import asyncio
 import time
 import hashlib
+import socket
 import subprocess
+import uuid
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone
@@ -15,13 +17,25 @@ import logging
 from tempfile import NamedTemporaryFile, TemporaryDirectory
 
 from models import TranscriptionJob, TranscriptionStage, TranscriptionStatus, TranscriptionAsset, PipelineConfig
-from enhanced_store import TranscriptionJobStore, TranscriptionAssetStore
+from enhanced_store import TranscriptionJobStore, TranscriptionAssetStore, CheckpointCache, ProgressReporter
 from providers import stt_transcribe
 from cloud_storage import storage_manager, get_file_path, get_file_path_sync, store_file_content_async
 from cache_manager import cache_manager
 from monitoring import record_job_started, record_job_completed, record_job_failed
 from webhooks import notify_job_created, notify_job_progress, notify_job_completed, notify_job_failed
-from rate_limiting import acquire_job_slot, release_job_slot
+from rate_limiting import acquire_job_slot, release_job_slot, upstream_governor
+from job_notifier import job_notifier
+from stage_scheduler import resource_limits
+from fair_scheduler import fair_scheduler
+from priority_lanes import JobLane, LANE_ORDER, lane_for_duration, pipeline_lanes, record_lane_wait
+from http_clients import http_clients, Upstream
+from ffmpeg_progress import FFmpegProgressMonitor, progress_args
+from content_index import ContentIndexStore, remember_completed_upload
+from stt_cache import stt_cache
+from audio_segmenter import (
+    plan_segments, write_wav_segments, language_sample_windows, PCMSegmentChunker, SEGMENT_CODECS,
+    segment_encoder_args
+)
 import httpx
 
 logger = logging.getLogger(__name__)
@@ -29,53 +43,173 @@ logger = logging.getLogger(__name__)
 class PipelineWorker:
     """Main pipeline worker for processing transcription jobs"""
     
-    def __init__(self):
+    def __init__(self, worker_id: Optional[str] = None):
         self.config = PipelineConfig()
         self.running = False
         
+        # Lease identity: unique across processes and machines
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = int(os.getenv("PIPELINE_LEASE_SECONDS", "120"))
+        
+        # Idle workers wait for a job notification; polling is only a safety net
+        self.idle_poll_seconds = float(os.getenv("PIPELINE_IDLE_POLL_SECONDS", "60"))
+        
+        # Back-off for jobs whose user is at their concurrent job limit
+        self.slot_retry_seconds = int(os.getenv("PIPELINE_SLOT_RETRY_SECONDS", "5"))
+        
+        # Checkpoints of the jobs this worker currently holds
+        self.checkpoints = CheckpointCache()
+        
+        # Coalesces progress writes per job
+        self.progress = ProgressReporter()
+        
+        if self.config.segment_codec not in SEGMENT_CODECS:
+            logger.warning(f"Unknown segment codec '{self.config.segment_codec}', using wav")
+            self.config.segment_codec = "wav"
+        
     async def start(self):
         """Start the worker process"""
         self.running = True
         logger.info("🚀 Pipeline worker started")
         
+        try:
+            await ContentIndexStore.ensure_indexes()
+            await stt_cache.ensure_indexes()
+        except Exception as e:
+            logger.warning(f"Could not ensure content and STT cache indexes: {e}")
+        
         while self.running:
             try:
-                # Get next job to process
-                jobs = await TranscriptionJobStore.list_jobs_by_status(TranscriptionStatus.CREATED, limit=1)
-                if not jobs:
-                    jobs = await TranscriptionJobStore.list_jobs_by_status(TranscriptionStatus.PROCESSING, limit=5)
+                wakeup = job_notifier.listen()
                 
-                if jobs:
-                    for job in jobs:
-                        try:
-                            await self.process_job(job)
-                        except Exception as e:
-                            logger.error(f"Failed to process job {job.id}: {str(e)}")
-                            await self.handle_job_error(job.id, "PROCESSING_ERROR", str(e))
+                # Atomically claim the next job (or one whose lease expired)
+                job = await self.claim_next()
+                
+                if job:
+                    await self.process_claimed_job(job, admitted=True)
                 else:
-                    # No jobs to process, wait
-                    await asyncio.sleep(10)
+                    # No jobs to process, wait for a notification
+                    await job_notifier.wait(wakeup, self.idle_poll_seconds)
                     
             except Exception as e:
                 logger.error(f"Worker error: {str(e)}")
                 await asyncio.sleep(30)
     
+    async def claim_next(self, stages: Optional[List[TranscriptionStage]] = None) -> Optional[TranscriptionJob]:
+        """Claim the next job by priority lane, then fair share across users.
+        
+        Lanes are tried highest priority first, skipping any lane whose
+        concurrency budget is used up. Within a lane, users with runnable
+        work are ordered by weighted virtual time (see fair_scheduler) and
+        the oldest job of the first user that can be claimed wins. Claims
+        can race with other workers, so later users are tried too.
+        """
+        for lane in LANE_ORDER:
+            if not pipeline_lanes.has_capacity(lane):
+                continue
+            
+            candidates = await TranscriptionJobStore.list_runnable_users(stages, lanes=[lane.value])
+            if not candidates:
+                continue
+            
+            for user_id in candidates:
+                if fair_scheduler.cached_tier(user_id) is None:
+                    fair_scheduler.set_tier(user_id, await TranscriptionJobStore.get_user_tier(user_id))
+            
+            for user_id in fair_scheduler.order_users(candidates):
+                job = await TranscriptionJobStore.claim_next_job(
+                    self.worker_id, self.lease_seconds, stages=stages, users=[user_id], lanes=[lane.value]
+                )
+                if job:
+                    # Nominal charge at dispatch; the stage's run time is charged when it ends
+                    fair_scheduler.charge(user_id, 1.0)
+                    pipeline_lanes.admit(lane)
+                    return job
+        
+        return None
+    
+    async def process_claimed_job(self, job: TranscriptionJob, admitted: bool = False):
+        """Run one pipeline step for a leased job, renewing the lease until it finishes
+        
+        admitted: the job was already counted against its lane budget by claim_next.
+        """
+        lease_lost = asyncio.Event()
+        started = time.time()
+        lane = JobLane(job.lane) if job.lane in JobLane._value2member_map_ else JobLane.STANDARD
+        
+        # Queue wait: time since the job last became runnable (its last stage transition)
+        if job.updated_at:
+            became_runnable = job.updated_at if job.updated_at.tzinfo else job.updated_at.replace(tzinfo=timezone.utc)
+            record_lane_wait(lane, (datetime.now(timezone.utc) - became_runnable).total_seconds())
+        
+        if not admitted:
+            pipeline_lanes.admit(lane)
+        
+        processing = asyncio.create_task(self.process_job(job))
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, processing, lease_lost))
+        
+        try:
+            await processing
+        except asyncio.CancelledError:
+            if not lease_lost.is_set():
+                raise
+            # Another worker may own the job now; stop without touching its state
+            logger.warning(f"🛑 Worker {self.worker_id} abandoned job {job.id} after losing its lease")
+        except Exception as e:
+            logger.error(f"Failed to process job {job.id}: {str(e)}")
+            await self.handle_job_error(job.id, "PROCESSING_ERROR", str(e))
+        finally:
+            pipeline_lanes.leave(lane)
+            fair_scheduler.charge(job.user_id, time.time() - started)
+            heartbeat.cancel()
+            try:
+                await heartbeat
+            except asyncio.CancelledError:
+                pass
+            self.checkpoints.forget(job.id)
+            self.progress.forget(job.id)
+            await TranscriptionJobStore.release_lease(job.id, self.worker_id)
+    
+    async def _heartbeat(self, job_id: str, processing: asyncio.Task, lease_lost: asyncio.Event):
+        """Renew the job lease at a third of its length.
+        
+        If the lease is lost (it expired and another worker may have claimed
+        the job), the processing task is cancelled so two workers never write
+        the same job's checkpoints.
+        """
+        interval = max(1, self.lease_seconds // 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await TranscriptionJobStore.renew_lease(job_id, self.worker_id, self.lease_seconds):
+                    logger.warning(f"⚠️ Worker {self.worker_id} lost lease on job {job_id}")
+                    lease_lost.set()
+                    processing.cancel()
+                    return
+            except Exception as e:
+                logger.error(f"Lease renewal failed for job {job_id}: {str(e)}")
+    
     def stop(self):
         """Stop the worker process"""
         self.running = False
+        job_notifier.wake_local()
         logger.info("🛑 Pipeline worker stopped")
     
     async def process_job(self, job: TranscriptionJob):
         """Process a transcription job through the pipeline with Phase 4 enhancements"""
         job_start_time = time.time()
+        user_id = job.user_id
+        slot_acquired = False
         
         try:
-            # Phase 4: Check rate limits and acquire job slot
-            user_id = job.user_id
-            if user_id and not await acquire_job_slot(user_id):
-                logger.warning(f"Job {job.id} blocked by concurrent job limit for user {user_id}")
-                await TranscriptionJobStore.set_job_results(job.id, {"status": TranscriptionStatus.PENDING.value})
-                return
+            # Phase 4: Check rate limits and acquire job slot (held while this stage runs)
+            if user_id:
+                if not await acquire_job_slot(user_id):
+                    logger.warning(f"Job {job.id} blocked by concurrent job limit for user {user_id}")
+                    # Stay runnable; back off briefly so other users' work is claimed meanwhile
+                    await TranscriptionJobStore.defer_job(job.id, self.worker_id, self.slot_retry_seconds)
+                    return
+                slot_acquired = True
             
             logger.info(f"🎬 Processing job {job.id} in stage: {job.current_stage}")
             
@@ -111,17 +245,13 @@ class PipelineWorker:
                 record_job_completed(job.id, job_duration)
                 
                 if user_id:
-                    job_data = await TranscriptionJobStore.get_job(job.id)
+                    job_data = await TranscriptionJobStore.get_job(job.id, include_checkpoints=False)
                     await notify_job_completed(job.id, user_id, {
                         "duration": job_duration,
                         "total_duration": job_data.total_duration,
                         "output_formats": job_data.output_formats if hasattr(job_data, 'output_formats') else ["txt", "json", "srt", "vtt", "docx"]
                     })
                 
-                # Release job slot
-                if user_id:
-                    await release_job_slot(user_id)
-                
                 return
             else:
                 logger.warning(f"Job {job.id} in unknown stage: {job.current_stage}")
@@ -133,17 +263,17 @@ class PipelineWorker:
             job_duration = time.time() - job_start_time
             record_job_failed(job.id, job_duration)
             
-            if 'user_id' in locals() and user_id:
+            if user_id:
                 await notify_job_failed(job.id, user_id, {
                     "error": str(e),
                     "duration": job_duration,
-                    "stage": job.current_stage.value if 'job' in locals() else "unknown"
+                    "stage": job.current_stage.value
                 })
-                
-                # Release job slot on error
-                await release_job_slot(user_id)
             
             await self.handle_job_error(job.id, "STAGE_ERROR", str(e))
+        finally:
+            if slot_acquired:
+                await release_job_slot(user_id)
     
     async def stage_validate(self, job: TranscriptionJob):
         """Stage 1: Validate uploaded file"""
@@ -151,7 +281,7 @@ class PipelineWorker:
         logger.info(f"🔍 Job {job.id}: Validating file")
         
         start_time = time.time()
-        await TranscriptionJobStore.update_job_stage(job.id, stage, 10.0)
+        await self.progress.set_stage(job.id, stage, 10.0)
         
         try:
             # Get file path from upload session
@@ -169,7 +299,7 @@ class PipelineWorker:
             if actual_size != job.total_size:
                 raise Exception(f"File size mismatch. Expected: {job.total_size}, actual: {actual_size}")
             
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 30.0)
+            await self.progress.update(job.id, stage, 30.0)
             
             # Probe audio file with ffprobe
             try:
@@ -195,20 +325,21 @@ class PipelineWorker:
                 if duration > max_duration:
                     raise Exception(f"Audio too long: {duration/3600:.1f}h > {self.config.max_duration_hours}h")
                 
-                await TranscriptionJobStore.update_stage_progress(job.id, stage, 60.0)
+                await self.progress.update(job.id, stage, 60.0)
                 
                 # Find audio stream
                 audio_streams = [s for s in probe_data.get("streams", []) if s.get("codec_type") == "audio"]
                 if not audio_streams:
                     raise Exception("No audio stream found")
                 
-                # Store file info in job
+                # Store file info in job; the duration decides the priority lane
                 await TranscriptionJobStore.set_job_results(job.id, {
                     "total_duration": duration,
+                    "lane": lane_for_duration(duration).value,
                     "storage_paths": {"original": session.storage_key}
                 })
                 
-                await TranscriptionJobStore.update_stage_progress(job.id, stage, 100.0)
+                await self.progress.update(job.id, stage, 100.0)
                 
             except subprocess.TimeoutExpired:
                 raise Exception("Audio probe timeout - file may be corrupted")
@@ -220,7 +351,7 @@ class PipelineWorker:
             await TranscriptionJobStore.record_stage_duration(job.id, stage, duration_seconds)
             
             # Move to next stage
-            await TranscriptionJobStore.update_job_stage(job.id, TranscriptionStage.TRANSCODING, 0.0)
+            await self.progress.set_stage(job.id, TranscriptionStage.TRANSCODING, 0.0)
             logger.info(f"✅ Job {job.id}: Validation complete ({duration:.1f}s audio)")
             
         except Exception as e:
@@ -228,15 +359,18 @@ class PipelineWorker:
     
     async def stage_transcode(self, job: TranscriptionJob):
         """Stage 2: Transcode to normalized format"""
+        if self.config.fused_transcode_segment:
+            return await self.stage_transcode_and_segment(job)
+        
         stage = TranscriptionStage.TRANSCODING
         logger.info(f"🔄 Job {job.id}: Transcoding audio")
         
         start_time = time.time()
-        await TranscriptionJobStore.update_job_stage(job.id, stage, 10.0)
+        await self.progress.set_stage(job.id, stage, 10.0)
         
         try:
             # Get original file path from upload session
-            job_data = await TranscriptionJobStore.get_job(job.id)
+            job_data = await TranscriptionJobStore.get_job(job.id, include_checkpoints=False)
             from enhanced_store import UploadSessionStore
             session = await UploadSessionStore.get_session(job_data.upload_id)
             if not session or not session.storage_key:
@@ -248,13 +382,14 @@ class PipelineWorker:
             with TemporaryDirectory() as temp_dir:
                 normalized_path = Path(temp_dir) / "normalized.wav"
                 
-                # FFmpeg command for normalization
+                # FFmpeg command for normalization, reporting progress on stdout
                 cmd = [
-                    "ffmpeg", "-i", original_path,
+                    "ffmpeg", "-v", "error", "-i", original_path,
                     "-ar", "16000",  # 16kHz sample rate
                     "-ac", "1",      # Mono
                     "-acodec", "pcm_s16le",  # 16-bit PCM
                     "-af", "volume=1.0",  # Normalize volume
+                    *progress_args(pipe=1),
                     "-y", str(normalized_path)
                 ]
                 
@@ -265,33 +400,37 @@ class PipelineWorker:
                     stdout=asyncio.subprocess.PIPE,
                     stderr=asyncio.subprocess.PIPE
                 )
+                stderr_task = asyncio.create_task(process.stderr.read())
+                monitor = FFmpegProgressMonitor(
+                    process, process.stdout, job_data.total_duration,
+                    on_progress=lambda fraction, _: self.progress.update(job.id, stage, 10.0 + fraction * 80.0)
+                )
                 
-                # Monitor progress (FFmpeg doesn't provide reliable progress, so we estimate)
-                for progress in range(20, 90, 10):
-                    await TranscriptionJobStore.update_stage_progress(job.id, stage, float(progress))
-                    await asyncio.sleep(1)
-                    
-                    # Check if process completed
-                    if process.returncode is not None:
-                        break
-                
-                stdout, stderr = await process.communicate()
+                try:
+                    await monitor.run()
+                    await process.wait()
+                    stderr = await stderr_task
+                finally:
+                    if process.returncode is None:
+                        process.kill()
+                        await process.wait()
                 
+                await self._record_ffmpeg_metrics(job.id, stage, monitor)
+                monitor.check()
                 if process.returncode != 0:
-                    raise Exception(f"FFmpeg failed: {stderr.decode()}")
+                    raise Exception(f"FFmpeg failed: {stderr.decode(errors='ignore')}")
                 
                 if not normalized_path.exists():
                     raise Exception("Normalized audio file not created")
                 
-                await TranscriptionJobStore.update_stage_progress(job.id, stage, 90.0)
+                await self.progress.update(job.id, stage, 90.0)
                 
-                # Store normalized file
-                with open(normalized_path, "rb") as f:
-                    normalized_key = await storage_manager.store_file(
-                        f.read(), 
-                        f"job_{job.id}_normalized.wav",
-                        job_id=job.id
-                    )
+                # Move the normalized file into storage instead of reading it into memory
+                normalized_key = await storage_manager.store_file_from_path(
+                    str(normalized_path),
+                    f"job_{job.id}_normalized.wav",
+                    job_id=job.id
+                )
                 
                 # Update job with normalized file path
                 storage_paths = getattr(job_data, 'storage_paths', {}) or {}
@@ -301,30 +440,158 @@ class PipelineWorker:
                     "storage_paths": storage_paths
                 })
                 
-                await TranscriptionJobStore.update_stage_progress(job.id, stage, 100.0)
+                await self.progress.update(job.id, stage, 100.0)
             
             # Record stage completion
             duration_seconds = time.time() - start_time
             await TranscriptionJobStore.record_stage_duration(job.id, stage, duration_seconds)
             
             # Move to next stage
-            await TranscriptionJobStore.update_job_stage(job.id, TranscriptionStage.SEGMENTING, 0.0)
+            await self.progress.set_stage(job.id, TranscriptionStage.SEGMENTING, 0.0)
             logger.info(f"✅ Job {job.id}: Transcoding complete")
             
         except Exception as e:
             await self.handle_job_error(job.id, "TRANSCODING_FAILED", str(e))
     
+    async def _record_ffmpeg_metrics(self, job_id: str, stage: TranscriptionStage, monitor: FFmpegProgressMonitor):
+        """Store ffmpeg throughput for the stage and report it to monitoring"""
+        metrics = monitor.record(stage.value)
+        if metrics.get("realtime_factor"):
+            logger.info(f"⏱️ Job {job_id}: {stage.value} ran at {metrics['realtime_factor']}x real time")
+        try:
+            await TranscriptionJobStore.record_stage_metrics(job_id, stage, metrics)
+        except Exception as e:
+            logger.warning(f"Failed to record {stage.value} metrics for job {job_id}: {e}")
+    
+    async def stage_transcode_and_segment(self, job: TranscriptionJob):
+        """Stages 2+3 fused: stream decoded PCM from ffmpeg straight into segments
+        
+        No normalized WAV is written; ffmpeg's s16le stdout is cut into
+        overlapping segment files as it arrives. The SEGMENTING checkpoint is
+        identical to the two-stage path, so later stages are unaffected.
+        """
+        stage = TranscriptionStage.TRANSCODING
+        logger.info(f"🔄 Job {job.id}: Transcoding and segmenting audio (streaming)")
+        
+        start_time = time.time()
+        await self.progress.set_stage(job.id, stage, 10.0)
+        
+        try:
+            job_data = await TranscriptionJobStore.get_job(job.id, include_checkpoints=False)
+            from enhanced_store import UploadSessionStore
+            session = await UploadSessionStore.get_session(job_data.upload_id)
+            if not session or not session.storage_key:
+                raise Exception("Upload session not found or file not available")
+            
+            original_path = get_file_path_sync(session.storage_key)
+            total_duration = job_data.total_duration or 0
+            
+            # PCM goes to stdout, so progress reports share stderr with errors
+            cmd = [
+                "ffmpeg", "-v", "error", "-i", original_path,
+                "-ar", "16000",  # 16kHz sample rate
+                "-ac", "1",      # Mono
+                "-af", "volume=1.0",  # Normalize volume
+                *progress_args(pipe=2),
+                "-f", "s16le", "-acodec", "pcm_s16le",  # Raw 16-bit PCM
+                "pipe:1"
+            ]
+            
+            logger.info(f"Transcoding with: {' '.join(cmd)}")
+            
+            segments = []
+            
+            with TemporaryDirectory() as temp_dir:
+                chunker = PCMSegmentChunker(
+                    temp_dir,
+                    self.config.segment_duration,
+                    self.config.segment_overlap,
+                    name_prefix=f"job_{job.id}_segment"
+                )
+                
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                # Read stderr concurrently so ffmpeg never blocks on a full pipe
+                monitor = FFmpegProgressMonitor(
+                    process, process.stderr, total_duration,
+                    on_progress=lambda fraction, _: self.progress.update(job.id, stage, 10.0 + fraction * 80.0)
+                )
+                monitor_task = asyncio.create_task(monitor.run())
+                
+                async def store_segments(emitted: List[Dict[str, Any]]):
+                    for segment in emitted:
+                        segments.append(await self._store_segment(job.id, segment))
+                
+                try:
+                    while True:
+                        data = await process.stdout.read(1024 * 1024)
+                        if not data:
+                            break
+                        await store_segments(await asyncio.to_thread(chunker.feed, data))
+                    
+                    await process.wait()
+                    await monitor_task
+                finally:
+                    if process.returncode is None:
+                        process.kill()
+                        await process.wait()
+                    if not monitor_task.done():
+                        monitor_task.cancel()
+                
+                await self._record_ffmpeg_metrics(job.id, stage, monitor)
+                monitor.check()
+                if process.returncode != 0:
+                    raise Exception(f"FFmpeg failed: {monitor.log_text}")
+                
+                await store_segments(await asyncio.to_thread(chunker.finish))
+            
+            if not segments:
+                raise Exception("No valid segments created")
+            
+            logger.info(f"Created {len(segments)} segments for job {job.id} ({chunker.decoded_duration:.1f}s decoded)")
+            
+            storage_paths = getattr(job_data, 'storage_paths', {}) or {}
+            storage_paths["original"] = session.storage_key
+            await TranscriptionJobStore.set_job_results(job.id, {
+                "storage_paths": storage_paths
+            })
+            
+            # Same checkpoint shape as stage_segment
+            checkpoint_data = {
+                "segments": segments,
+                "total_segments": len(segments),
+                "codec": self.config.segment_codec
+            }
+            await self.checkpoints.set(job.id, TranscriptionStage.SEGMENTING, checkpoint_data)
+            
+            await self.progress.update(job.id, stage, 100.0)
+            
+            # Record stage completion (reported under both stages)
+            duration_seconds = time.time() - start_time
+            await TranscriptionJobStore.record_stage_duration(job.id, stage, duration_seconds)
+            await TranscriptionJobStore.record_stage_duration(job.id, TranscriptionStage.SEGMENTING, 0.0)
+            
+            # Skip straight past segmenting
+            await self.progress.set_stage(job.id, TranscriptionStage.DETECTING_LANGUAGE, 0.0)
+            logger.info(f"✅ Job {job.id}: Transcoding and segmentation complete ({len(segments)} segments)")
+            
+        except Exception as e:
+            await self.handle_job_error(job.id, "TRANSCODING_FAILED", str(e))
+    
     async def stage_segment(self, job: TranscriptionJob):
         """Stage 3: Segment audio into chunks for processing"""
         stage = TranscriptionStage.SEGMENTING
         logger.info(f"✂️  Job {job.id}: Segmenting audio")
         
         start_time = time.time()
-        await TranscriptionJobStore.update_job_stage(job.id, stage, 10.0)
+        await self.progress.set_stage(job.id, stage, 10.0)
         
         try:
             # Get normalized audio file from job results
-            job_data = await TranscriptionJobStore.get_job(job.id)
+            job_data = await TranscriptionJobStore.get_job(job.id, include_checkpoints=False)
             storage_paths = getattr(job_data, 'storage_paths', {}) or {}
             
             if "normalized" not in storage_paths:
@@ -337,66 +604,20 @@ class PipelineWorker:
             overlap = self.config.segment_overlap  # 1 second default
             total_duration = job_data.total_duration
             
+            plan = plan_segments(total_duration, segment_duration, overlap)
             segments = []
-            segment_paths = []
             
-            # Create segments
+            # Cut all segments in one memory-mapped pass, off the event loop
             with TemporaryDirectory() as temp_dir:
-                segment_count = 0
-                current_time = 0.0
+                written = await asyncio.to_thread(
+                    write_wav_segments, normalized_path, plan, temp_dir, f"job_{job.id}_segment"
+                )
                 
-                while current_time < total_duration:
-                    # Calculate segment timing
-                    segment_start = max(0, current_time - overlap)
-                    segment_end = min(total_duration, current_time + segment_duration)
-                    segment_length = segment_end - segment_start
-                    
-                    if segment_length < 1.0:  # Skip very short segments
-                        break
-                    
-                    segment_file = Path(temp_dir) / f"segment_{segment_count:04d}.wav"
-                    
-                    # Extract segment with FFmpeg
-                    cmd = [
-                        "ffmpeg", "-i", normalized_path,
-                        "-ss", str(segment_start),
-                        "-t", str(segment_length),
-                        "-y", str(segment_file)
-                    ]
-                    
-                    result = subprocess.run(cmd, capture_output=True, timeout=30)
-                    if result.returncode != 0:
-                        logger.warning(f"Failed to create segment {segment_count}: {result.stderr.decode()}")
-                        current_time += segment_duration
-                        continue
-                    
-                    if segment_file.exists() and segment_file.stat().st_size > 1000:  # Valid segment
-                        # Store segment
-                        with open(segment_file, "rb") as f:
-                            segment_key = await storage_manager.store_file(
-                                f.read(),
-                                f"job_{job.id}_segment_{segment_count:04d}.wav",
-                                job_id=job.id
-                            )
-                        
-                        segments.append({
-                            "index": segment_count,
-                            "start_time": segment_start,
-                            "end_time": segment_end,
-                            "duration": segment_length,
-                            "storage_key": segment_key,
-                            "original_start": current_time,
-                            "original_end": current_time + segment_duration
-                        })
-                        
-                        segment_paths.append(segment_key)
-                        segment_count += 1
-                        
-                        # Update progress
-                        progress = min(90.0, (current_time / total_duration) * 80.0 + 10.0)
-                        await TranscriptionJobStore.update_stage_progress(job.id, stage, progress)
-                    
-                    current_time += segment_duration
+                await self.progress.update(job.id, stage, 50.0)
+                
+                for segment in written:
+                    # Move the segment file straight into storage
+                    segments.append(await self._store_segment(job.id, segment))
                 
                 if not segments:
                     raise Exception("No valid segments created")
@@ -406,33 +627,85 @@ class PipelineWorker:
                 # Store segment metadata as checkpoint
                 checkpoint_data = {
                     "segments": segments,
-                    "total_segments": len(segments)
+                    "total_segments": len(segments),
+                    "codec": self.config.segment_codec
                 }
-                await TranscriptionJobStore.set_stage_checkpoint(job.id, stage, checkpoint_data)
+                await self.checkpoints.set(job.id, stage, checkpoint_data)
                 
-                await TranscriptionJobStore.update_stage_progress(job.id, stage, 100.0)
+                await self.progress.update(job.id, stage, 100.0)
             
             # Record stage completion
             duration_seconds = time.time() - start_time
             await TranscriptionJobStore.record_stage_duration(job.id, stage, duration_seconds)
             
             # Move to next stage
-            await TranscriptionJobStore.update_job_stage(job.id, TranscriptionStage.DETECTING_LANGUAGE, 0.0)
+            await self.progress.set_stage(job.id, TranscriptionStage.DETECTING_LANGUAGE, 0.0)
             logger.info(f"✅ Job {job.id}: Segmentation complete ({len(segments)} segments)")
             
         except Exception as e:
             await self.handle_job_error(job.id, "SEGMENTATION_FAILED", str(e))
     
+    async def _store_segment(self, job_id: str, segment: Dict[str, Any]) -> Dict[str, Any]:
+        """Encode a cut WAV segment with the configured codec and move it into storage.
+        
+        Returns the segment's checkpoint entry.
+        """
+        codec = self.config.segment_codec
+        source_path = segment["path"]
+        sha256 = segment["sha256"]
+        
+        if codec != "wav":
+            encoded_path = str(Path(source_path).with_suffix(SEGMENT_CODECS[codec]["extension"]))
+            cmd = [
+                "ffmpeg", "-v", "error", "-i", source_path,
+                *segment_encoder_args(codec, self.config.segment_bitrate),
+                "-y", encoded_path
+            ]
+            
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+            
+            if process.returncode == 0:
+                os.unlink(source_path)
+                source_path = encoded_path
+                sha256 = None  # Recomputed from the encoded file
+            else:
+                # Keep the PCM segment rather than fail the stage
+                logger.warning(f"Segment {segment['index']} {codec} encode failed, keeping WAV: {stderr.decode(errors='ignore')[-300:]}")
+        
+        extension = Path(source_path).suffix
+        segment_key = await storage_manager.store_file_from_path(
+            source_path,
+            f"job_{job_id}_segment_{segment['index']:04d}{extension}",
+            job_id=job_id,
+            sha256=sha256
+        )
+        
+        return {
+            "index": segment["index"],
+            "start_time": segment["start_time"],
+            "end_time": segment["end_time"],
+            "duration": segment["duration"],
+            "storage_key": segment_key,
+            "audio_sha256": segment["sha256"],  # PCM hash, independent of the segment codec
+            "original_start": segment["original_start"],
+            "original_end": segment["original_end"]
+        }
+    
     async def stage_detect_language(self, job: TranscriptionJob):
         """Stage 4: Enhanced language detection (Phase 3)"""
         stage = TranscriptionStage.DETECTING_LANGUAGE
         logger.info(f"🌍 Job {job.id}: Enhanced language detection")
         
         start_time = time.time()
-        await TranscriptionJobStore.update_job_stage(job.id, stage, 10.0)
+        await self.progress.set_stage(job.id, stage, 10.0)
         
         try:
-            job_data = await TranscriptionJobStore.get_job(job.id)
+            job_data = await TranscriptionJobStore.get_job(job.id, include_checkpoints=False)
             
             # If language already specified, validate and enhance
             if job_data.language:
@@ -441,98 +714,83 @@ class PipelineWorker:
                 logger.info(f"Language pre-specified: {detected_language}")
             else:
                 # Enhanced language detection using multiple segments
-                checkpoint = await TranscriptionJobStore.get_stage_checkpoint(job.id, TranscriptionStage.SEGMENTING)
+                checkpoint = await self.checkpoints.get(job.id, TranscriptionStage.SEGMENTING)
                 if not checkpoint or not checkpoint.get("segments"):
                     raise Exception("Segment data not found")
                 
                 segments = checkpoint["segments"]
                 
-                # Phase 3: Use multiple segments for better accuracy
-                detection_segments = []
-                total_detection_time = 0
-                
-                # Sample segments from beginning, middle, and end
-                segment_indices = []
-                if len(segments) >= 3:
-                    segment_indices = [0, len(segments)//2, len(segments)-1]
-                elif len(segments) >= 2:
-                    segment_indices = [0, len(segments)-1]
-                else:
-                    segment_indices = [0]
-                
-                for idx in segment_indices:
-                    if idx < len(segments) and total_detection_time < 300:  # 5 minutes max
-                        segment = segments[idx]
-                        detection_segments.append(segment)
-                        total_detection_time += segment["duration"]
-                
-                await TranscriptionJobStore.update_stage_progress(job.id, stage, 30.0)
-                
-                api_key = os.getenv("WHISPER_API_KEY") or os.getenv("OPENAI_API_KEY")
-                if not api_key:
-                    detected_language = "en"
-                    confidence = 0.5
-                    logger.warning("No API key for language detection, defaulting to English")
-                else:
-                    # Detect language from multiple segments for better accuracy
-                    language_votes = {}
-                    detection_results = []
+                sample_dir = TemporaryDirectory()
+                try:
+                    sample_paths = await self._language_sample_paths(job_data, segments, sample_dir.name)
                     
-                    for i, segment in enumerate(detection_segments):
-                        try:
-                            segment_path = get_file_path_sync(segment["storage_key"])
-                            
-                            # Validate chunk size before API call (20MB ceiling)
-                            chunk_size_mb = os.path.getsize(segment_path) / (1024 * 1024)
-                            if chunk_size_mb > 20:
-                                raise Exception(f"Chunk too large: {chunk_size_mb:.1f}MB > 20MB limit. Re-segment required.")
-                            
-                            with open(segment_path, "rb") as audio_file:
-                                files = {"file": audio_file}
-                                form = {"model": "gpt-4o-mini-transcribe", "response_format": "json"}  # Changed from verbose_json to json
-                                
-                                async with httpx.AsyncClient(timeout=60) as client:
-                                    response = await client.post(
-                                        "https://api.openai.com/v1/audio/transcriptions",
-                                        data=form,
-                                        files=files,
-                                        headers={"Authorization": f"Bearer {api_key}"}
-                                    )
-                                    response.raise_for_status()
-                                    
-                                    result = response.json()
-                                    lang = result.get("language", "en")
-                                    
-                                    # Vote for this language
-                                    language_votes[lang] = language_votes.get(lang, 0) + 1
-                                    detection_results.append({
-                                        "segment": i,
-                                        "language": lang,
-                                        "text_sample": result.get("text", "")[:100]
-                                    })
-                                    
-                                    await TranscriptionJobStore.update_stage_progress(
-                                        job.id, stage, 40.0 + (i * 20.0)
-                                    )
-                                    
-                        except Exception as e:
-                            logger.warning(f"Language detection failed for segment {i}: {e}")
-                            continue
+                    await self.progress.update(job.id, stage, 30.0)
                     
-                    # Determine most voted language
-                    if language_votes:
-                        detected_language = max(language_votes, key=language_votes.get)
-                        total_votes = sum(language_votes.values())
-                        confidence = language_votes[detected_language] / total_votes
-                        
-                        logger.info(f"Language detection results: {language_votes}")
-                        logger.info(f"Detected language: {detected_language} (confidence: {confidence:.2f})")
-                    else:
+                    api_key = os.getenv("WHISPER_API_KEY") or os.getenv("OPENAI_API_KEY")
+                    if not api_key:
                         detected_language = "en"
-                        confidence = 0.3
+                        confidence = 0.5
+                        logger.warning("No API key for language detection, defaulting to English")
+                    else:
+                        # Detect language from multiple segments for better accuracy
+                        language_votes = {}
                         detection_results = []
+                        
+                        for i, segment_path in enumerate(sample_paths):
+                            try:
+                                # Validate chunk size before API call (20MB ceiling)
+                                chunk_size_mb = os.path.getsize(segment_path) / (1024 * 1024)
+                                if chunk_size_mb > 20:
+                                    raise Exception(f"Chunk too large: {chunk_size_mb:.1f}MB > 20MB limit. Re-segment required.")
+                                
+                                with open(segment_path, "rb") as audio_file:
+                                    files = {"file": audio_file}
+                                    form = {"model": "gpt-4o-mini-transcribe", "response_format": "json"}  # Changed from verbose_json to json
+                                    
+                                    async with resource_limits.stt.slot(job_data.user_id), http_clients.session(Upstream.OPENAI, timeout=60) as client:
+                                        response = await client.post(
+                                            "https://api.openai.com/v1/audio/transcriptions",
+                                            data=form,
+                                            files=files,
+                                            headers={"Authorization": f"Bearer {api_key}"}
+                                        )
+                                        response.raise_for_status()
+                                        
+                                        result = response.json()
+                                        lang = result.get("language", "en")
+                                        
+                                        # Vote for this language
+                                        language_votes[lang] = language_votes.get(lang, 0) + 1
+                                        detection_results.append({
+                                            "segment": i,
+                                            "language": lang,
+                                            "text_sample": result.get("text", "")[:100]
+                                        })
+                                        
+                                        await self.progress.update(
+                                            job.id, stage, 40.0 + (i * 20.0)
+                                        )
+                            
+                            except Exception as e:
+                                logger.warning(f"Language detection failed for segment {i}: {e}")
+                                continue
+                        
+                        # Determine most voted language
+                        if language_votes:
+                            detected_language = max(language_votes, key=language_votes.get)
+                            total_votes = sum(language_votes.values())
+                            confidence = language_votes[detected_language] / total_votes
+                            
+                            logger.info(f"Language detection results: {language_votes}")
+                            logger.info(f"Detected language: {detected_language} (confidence: {confidence:.2f})")
+                        else:
+                            detected_language = "en"
+                            confidence = 0.3
+                            detection_results = []
+                finally:
+                    sample_dir.cleanup()
                 
-                await TranscriptionJobStore.update_stage_progress(job.id, stage, 90.0)
+                await self.progress.update(job.id, stage, 90.0)
             
             # Store enhanced language detection results
             language_results = {
@@ -545,180 +803,134 @@ class PipelineWorker:
             
             await TranscriptionJobStore.set_job_results(job.id, language_results)
             
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 100.0)
+            await self.progress.update(job.id, stage, 100.0)
             
             # Record stage completion
             duration_seconds = time.time() - start_time
             await TranscriptionJobStore.record_stage_duration(job.id, stage, duration_seconds)
             
             # Move to next stage
-            await TranscriptionJobStore.update_job_stage(job.id, TranscriptionStage.TRANSCRIBING, 0.0)
+            await self.progress.set_stage(job.id, TranscriptionStage.TRANSCRIBING, 0.0)
             logger.info(f"✅ Job {job.id}: Enhanced language detection complete - {detected_language} (conf: {confidence:.2f})")
             
         except Exception as e:
             await self.handle_job_error(job.id, "LANGUAGE_DETECTION_FAILED", str(e))
     
+    async def _language_sample_paths(self, job_data: TranscriptionJob, segments: List[Dict[str, Any]],
+                                     sample_dir: str) -> List[str]:
+        """Audio files to send for language detection.
+        
+        With a normalized WAV, short windows spread across the recording are
+        cut straight from its PCM, costing O(window) rather than whole
+        segments. The fused path has no normalized file and samples segments
+        from the beginning, middle and end.
+        """
+        count = max(1, self.config.language_detection_segments)
+        normalized_key = (getattr(job_data, 'storage_paths', {}) or {}).get("normalized")
+        
+        if normalized_key:
+            def cut_samples() -> List[str]:
+                with storage_manager.open_wav_window(normalized_key) as reader:
+                    windows = language_sample_windows(reader.duration, count, self.config.language_sample_seconds)
+                    return [
+                        reader.write_wav(start, end, os.path.join(sample_dir, f"language_sample_{k}.wav"))["path"]
+                        for k, (start, end) in enumerate(windows)
+                    ]
+            
+            try:
+                return await asyncio.to_thread(cut_samples)
+            except Exception as e:
+                logger.warning(f"Could not cut language samples from normalized audio, using segments: {e}")
+        
+        if count == 1 or len(segments) == 1:
+            indices = [0]
+        else:
+            indices = sorted({round(k * (len(segments) - 1) / (count - 1)) for k in range(count)})
+        
+        paths = []
+        total_detection_time = 0
+        for idx in indices:
+            if total_detection_time >= 300:  # 5 minutes max
+                break
+            try:
+                paths.append(get_file_path_sync(segments[idx]["storage_key"]))
+            except FileNotFoundError as e:
+                logger.warning(f"Language sample segment {idx} unavailable: {e}")
+                continue
+            total_detection_time += segments[idx]["duration"]
+        return paths
+    
     async def stage_transcribe(self, job: TranscriptionJob):
-        """Stage 5: Transcribe audio segments"""
+        """Stage 5: Transcribe audio segments with bounded concurrency"""
         stage = TranscriptionStage.TRANSCRIBING
         logger.info(f"🎤 Job {job.id}: Transcribing audio segments")
         
         start_time = time.time()
-        await TranscriptionJobStore.update_job_stage(job.id, stage, 5.0)
+        await self.progress.set_stage(job.id, stage, 5.0)
         
         try:
-            job_data = await TranscriptionJobStore.get_job(job.id)
+            job_data = await TranscriptionJobStore.get_job(job.id, include_checkpoints=False)
             
             # Get segments for transcription
-            checkpoint = await TranscriptionJobStore.get_stage_checkpoint(job.id, TranscriptionStage.SEGMENTING)
+            checkpoint = await self.checkpoints.get(job.id, TranscriptionStage.SEGMENTING)
             if not checkpoint or not checkpoint.get("segments"):
                 raise Exception("Segment data not found")
             
             segments = checkpoint["segments"]
             total_segments = len(segments)
             
-            transcripts = []
             api_key = os.getenv("WHISPER_API_KEY") or os.getenv("OPENAI_API_KEY")
             
             if not api_key:
                 raise Exception("No OpenAI API key available for transcription")
             
-            logger.info(f"Transcribing {total_segments} segments for job {job.id}")
+            language = job_data.detected_language or "en"
+            normalized_key = (getattr(job_data, 'storage_paths', {}) or {}).get("normalized")
+            concurrency = max(1, self.config.max_concurrent_segments)
+            
+            # Results are slotted by position so output stays in index order
+            # regardless of the order in which segments finish
+            transcripts: List[Optional[Dict[str, Any]]] = [None] * total_segments
+            
+            # Resume: reuse segments already persisted by a previous run
+            previous = await self.checkpoints.get(job.id, stage) or {}
+            for i, saved in self._iter_saved_transcripts(previous.get("transcripts")):
+                if i < total_segments and saved.get("start_time") == segments[i]["original_start"] \
+                        and saved.get("end_time") == segments[i]["original_end"] \
+                        and saved.get("text") != "[Transcription failed]":
+                    transcripts[i] = saved
+            
+            completed = sum(1 for t in transcripts if t is not None)
+            if completed:
+                logger.info(f"♻️ Job {job.id}: Resuming transcription, {completed}/{total_segments} segments already done")
+            logger.info(f"Transcribing {total_segments - completed} segments for job {job.id} ({concurrency} concurrent)")
+            
+            semaphore = asyncio.Semaphore(concurrency)
+            
+            async def transcribe_one(i: int, segment: Dict[str, Any]):
+                nonlocal completed
+                async with semaphore:
+                    transcripts[i] = await self._transcribe_segment(
+                        job.id, i, segment, language, api_key, user_id=job_data.user_id, normalized_key=normalized_key
+                    )
+                
+                # Persist each successful segment as soon as it lands; failed
+                # segments are left out so a resumed run retries them
+                if transcripts[i]["text"] != "[Transcription failed]":
+                    await self.checkpoints.set_segment_transcript(job.id, i, transcripts[i])
+                
+                completed += 1
+                logger.info(f"Transcribed segment {completed}/{total_segments} for job {job.id}")
+                
+                # Update progress as segments finish
+                progress = 10.0 + (completed / total_segments) * 80.0
+                await self.progress.update(job.id, stage, progress)
             
-            for i, segment in enumerate(segments):
-                try:
-                    segment_path = get_file_path_sync(segment["storage_key"])
-                    
-                    # Validate chunk size before API call (20MB ceiling)
-                    chunk_size_mb = os.path.getsize(segment_path) / (1024 * 1024)
-                    if chunk_size_mb > 20:
-                        raise Exception(f"Chunk too large: {chunk_size_mb:.1f}MB > 20MB limit. Re-segment required.")
-                    
-                    # Transcribe segment using OpenAI Whisper
-                    with open(segment_path, "rb") as audio_file:
-                        files = {"file": audio_file}
-                        form = {
-                            "model": "gpt-4o-mini-transcribe",  # Updated to correct model
-                            "language": job_data.detected_language or "en",
-                            "response_format": "json",  # Changed from verbose_json to json
-                            "temperature": "0"
-                        }
-                        
-                        # Use existing retry logic from providers.py
-                        max_retries = 3
-                        retry_delay = 5
-                        
-                        for attempt in range(max_retries):
-                            try:
-                                async with httpx.AsyncClient(timeout=60) as client:
-                                    response = await client.post(
-                                        "https://api.openai.com/v1/audio/transcriptions",
-                                        data=form,
-                                        files=files,
-                                        headers={"Authorization": f"Bearer {api_key}"}
-                                    )
-                                    response.raise_for_status()
-                                    
-                                    result = response.json()
-                                    transcript_text = result.get("text", "")
-                                    
-                                    # Store segment transcript with timing info
-                                    transcripts.append({
-                                        "index": i,
-                                        "start_time": segment["original_start"],
-                                        "end_time": segment["original_end"],
-                                        "text": transcript_text,
-                                        "confidence": 1.0,  # Whisper doesn't provide confidence
-                                        "segments": result.get("segments", [])
-                                    })
-                                    
-                                    logger.info(f"Transcribed segment {i+1}/{total_segments} for job {job.id}")
-                                    break
-                                    
-                            except httpx.HTTPStatusError as e:
-                                error_details = "Unknown error"
-                                try:
-                                    error_response = e.response.json()
-                                    error_details = error_response.get("error", {}).get("message", str(error_response))
-                                except:
-                                    error_details = e.response.text[:200]
-                                
-                                if e.response.status_code == 429 and attempt < max_retries - 1:
-                                    # Rate limited, wait with exponential backoff
-                                    wait_time = retry_delay * (2 ** attempt)
-                                    logger.warning(f"Rate limited, waiting {wait_time}s before retry {attempt + 1}")
-                                    await asyncio.sleep(wait_time)
-                                    continue
-                                elif e.response.status_code == 400 and attempt == 0:
-                                    # 400 error on first attempt - try WAV fallback
-                                    logger.warning(f"400 error, attempting WAV re-encode fallback: {error_details}")
-                                    
-                                    # Re-encode to clean WAV
-                                    wav_path = segment_path.replace(".wav", "_clean.wav")
-                                    cmd = [
-                                        "ffmpeg", "-i", segment_path, 
-                                        "-ac", "1", "-ar", "16000", "-c:a", "pcm_s16le", 
-                                        wav_path, "-y"
-                                    ]
-                                    
-                                    try:
-                                        result = subprocess.run(cmd, capture_output=True, text=True)
-                                        if result.returncode == 0:
-                                            # Retry with clean WAV
-                                            with open(wav_path, "rb") as clean_audio_file:
-                                                files = {"file": (f"segment_{i:04d}_clean.wav", clean_audio_file, "audio/wav")}
-                                                
-                                                async with httpx.AsyncClient(timeout=60) as client:
-                                                    response = await client.post(
-                                                        "https://api.openai.com/v1/audio/transcriptions",
-                                                        data=form,
-                                                        files=files,
-                                                        headers={"Authorization": f"Bearer {api_key}"}
-                                                    )
-                                                    response.raise_for_status()
-                                                    
-                                                    result = response.json()
-                                                    transcript_text = result.get("text", "")
-                                            
-                                            # Clean up temp WAV
-                                            os.unlink(wav_path)
-                                            logger.info(f"WAV fallback successful for segment {i+1}")
-                                            break
-                                        else:
-                                            logger.error(f"WAV re-encode failed: {result.stderr}")
-                                            raise Exception(f"Transcription API error: {e.response.status_code} - {error_details}")
-                                    except Exception as wav_error:
-                                        logger.error(f"WAV fallback failed: {wav_error}")
-                                        raise Exception(f"Transcription API error: {e.response.status_code} - {error_details}")
-                                else:
-                                    logger.error(f"OpenAI API Error {e.response.status_code}: {error_details}")
-                                    raise Exception(f"Transcription API error: {e.response.status_code} - {error_details}")
-                            except Exception as e:
-                                if attempt < max_retries - 1:
-                                    await asyncio.sleep(retry_delay)
-                                    continue
-                                else:
-                                    raise e
-                    
-                    # Update progress
-                    progress = 10.0 + ((i + 1) / total_segments) * 80.0
-                    await TranscriptionJobStore.update_stage_progress(job.id, stage, progress)
-                    
-                    # Add delay between requests to avoid rate limits
-                    if i < total_segments - 1:
-                        await asyncio.sleep(2)
-                        
-                except Exception as e:
-                    logger.error(f"Failed to transcribe segment {i}: {str(e)}")
-                    # Continue with other segments, mark this as empty
-                    transcripts.append({
-                        "index": i,
-                        "start_time": segment["original_start"],
-                        "end_time": segment["original_end"],
-                        "text": "[Transcription failed]",
-                        "confidence": 0.0,
-                        "segments": []
-                    })
+            await asyncio.gather(*(
+                transcribe_one(i, segment)
+                for i, segment in enumerate(segments)
+                if transcripts[i] is None
+            ))
             
             if not any(t["text"] for t in transcripts if t["text"] != "[Transcription failed]"):
                 raise Exception("All segment transcriptions failed")
@@ -728,37 +940,221 @@ class PipelineWorker:
                 "transcripts": transcripts,
                 "total_segments_transcribed": len([t for t in transcripts if t["text"] != "[Transcription failed]"])
             }
-            await TranscriptionJobStore.set_stage_checkpoint(job.id, stage, checkpoint_data)
+            await self.checkpoints.set(job.id, stage, checkpoint_data)
             
-            # Ensure checkpoint is committed before continuing
-            await asyncio.sleep(1)
-            
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 100.0)
+            await self.progress.update(job.id, stage, 100.0)
             
             # Record stage completion
             duration_seconds = time.time() - start_time
             await TranscriptionJobStore.record_stage_duration(job.id, stage, duration_seconds)
             
             # Move to next stage
-            await TranscriptionJobStore.update_job_stage(job.id, TranscriptionStage.MERGING, 0.0)
+            await self.progress.set_stage(job.id, TranscriptionStage.MERGING, 0.0)
             logger.info(f"✅ Job {job.id}: Transcription complete ({len(transcripts)} segments)")
             
         except Exception as e:
             await self.handle_job_error(job.id, "TRANSCRIPTION_FAILED", str(e))
     
+    @staticmethod
+    def _iter_saved_transcripts(saved: Any):
+        """Yield (index, transcript) pairs from a transcribing checkpoint.
+        
+        Incremental writes leave transcripts as a dict keyed by segment index;
+        the final checkpoint stores an ordered list.
+        """
+        if isinstance(saved, dict):
+            for key, transcript in saved.items():
+                if isinstance(transcript, dict) and str(key).isdigit():
+                    yield int(key), transcript
+        elif isinstance(saved, list):
+            for transcript in saved:
+                if isinstance(transcript, dict) and isinstance(transcript.get("index"), int):
+                    yield transcript["index"], transcript
+    
+    async def _transcribe_segment(self, job_id: str, i: int, segment: Dict[str, Any],
+                                  language: str, api_key: str, user_id: Optional[str] = None,
+                                  normalized_key: Optional[str] = None) -> Dict[str, Any]:
+        """Transcribe a single segment with its own retry budget.
+        
+        Failures are contained to the segment: the returned entry is marked
+        "[Transcription failed]" so the other segments keep going.
+        normalized_key lets the WAV fallback cut the window from the job's PCM.
+        """
+        transcript = {
+            "index": i,
+            "start_time": segment["original_start"],
+            "end_time": segment["original_end"],
+            "text": "[Transcription failed]",
+            "confidence": 0.0,
+            "segments": []
+        }
+        
+        form = {
+            "model": "gpt-4o-mini-transcribe",  # Updated to correct model
+            "language": language,
+            "response_format": "json",  # Changed from verbose_json to json
+            "temperature": "0"
+        }
+        
+        try:
+            segment_path = get_file_path_sync(segment["storage_key"])
+            
+            # Keyed on the segment's PCM hash, so the result is reused whatever
+            # codec or WAV re-encode was sent; older checkpoints hash the file
+            audio_sha256 = segment.get("audio_sha256") or await stt_cache.fingerprint(segment_path)
+            cached = await stt_cache.get(audio_sha256, form["model"], language, temperature=form["temperature"])
+            if cached is not None:
+                transcript.update({
+                    "text": cached.get("text", ""),
+                    "confidence": 1.0,
+                    "segments": cached.get("segments", [])
+                })
+                return transcript
+            
+            # Validate chunk size before API call (20MB ceiling)
+            chunk_size_mb = os.path.getsize(segment_path) / (1024 * 1024)
+            if chunk_size_mb > 20:
+                raise Exception(f"Chunk too large: {chunk_size_mb:.1f}MB > 20MB limit. Re-segment required.")
+            
+            max_retries = 3
+            retry_delay = 5
+            
+            for attempt in range(max_retries):
+                try:
+                    result = await self._post_transcription(segment_path, form, api_key, user_id=user_id)
+                    break
+                    
+                except httpx.HTTPStatusError as e:
+                    error_details = "Unknown error"
+                    try:
+                        error_response = e.response.json()
+                        error_details = error_response.get("error", {}).get("message", str(error_response))
+                    except:
+                        error_details = e.response.text[:200]
+                    
+                    if e.response.status_code == 429 and attempt < max_retries - 1:
+                        # Rate limited: the shared governor holds the retry until the upstream allows it
+                        logger.warning(f"Rate limited on segment {i}, retry {attempt + 1} paced by upstream governor")
+                        await upstream_governor.backoff(e.response.headers, retry_delay * (2 ** attempt))
+                        continue
+                    elif e.response.status_code == 400 and attempt == 0:
+                        # 400 error on first attempt - try WAV fallback
+                        logger.warning(f"400 error, attempting WAV re-encode fallback: {error_details}")
+                        try:
+                            result = await self._transcribe_wav_fallback(
+                                segment_path, i, form, api_key, user_id=user_id,
+                                normalized_key=normalized_key, segment=segment
+                            )
+                            logger.info(f"WAV fallback successful for segment {i+1}")
+                            break
+                        except Exception as wav_error:
+                            logger.error(f"WAV fallback failed: {wav_error}")
+                            raise Exception(f"Transcription API error: {e.response.status_code} - {error_details}")
+                    else:
+                        logger.error(f"OpenAI API Error {e.response.status_code}: {error_details}")
+                        raise Exception(f"Transcription API error: {e.response.status_code} - {error_details}")
+                except Exception:
+                    if attempt < max_retries - 1:
+                        await asyncio.sleep(retry_delay)
+                        continue
+                    raise
+            
+            transcript.update({
+                "text": result.get("text", ""),
+                "confidence": 1.0,  # Whisper doesn't provide confidence
+                "segments": result.get("segments", [])
+            })
+            await stt_cache.set(audio_sha256, form["model"], language, {
+                "text": transcript["text"],
+                "segments": transcript["segments"]
+            }, temperature=form["temperature"])
+            
+        except Exception as e:
+            logger.error(f"Failed to transcribe segment {i} for job {job_id}: {str(e)}")
+        
+        return transcript
+    
+    async def _post_transcription(self, audio_path: str, form: Dict[str, str], api_key: str,
+                                  upload_name: Optional[str] = None, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """POST one audio file to the transcription endpoint and return the JSON body"""
+        with open(audio_path, "rb") as audio_file:
+            files = {"file": (upload_name, audio_file, "audio/wav") if upload_name else audio_file}
+            
+            async with resource_limits.stt.slot(user_id), http_clients.session(Upstream.OPENAI, timeout=60) as client:
+                response = await client.post(
+                    "https://api.openai.com/v1/audio/transcriptions",
+                    data=form,
+                    files=files,
+                    headers={"Authorization": f"Bearer {api_key}"}
+                )
+                response.raise_for_status()
+                return response.json()
+    
+    async def _transcribe_wav_fallback(self, segment_path: str, i: int, form: Dict[str, str],
+                                       api_key: str, user_id: Optional[str] = None,
+                                       normalized_key: Optional[str] = None,
+                                       segment: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Re-encode a segment to clean 16kHz PCM WAV and retry the transcription once
+        
+        Also the fallback for compressed (FLAC/Opus) segments the endpoint rejects.
+        When the job has a normalized WAV the window is sliced from its PCM
+        instead of decoding the segment with ffmpeg.
+        """
+        source = Path(segment_path)
+        wav_path = str(source.with_name(f"{source.stem}_clean.wav"))
+        
+        sliced = False
+        if normalized_key and segment and "start_time" in segment and "end_time" in segment:
+            def slice_window():
+                with storage_manager.open_wav_window(normalized_key) as reader:
+                    reader.write_wav(segment["start_time"], segment["end_time"], wav_path)
+            
+            try:
+                await asyncio.to_thread(slice_window)
+                sliced = True
+            except Exception as e:
+                logger.warning(f"PCM window unavailable for segment {i}, decoding with ffmpeg: {e}")
+        
+        if not sliced:
+            cmd = [
+                "ffmpeg", "-i", segment_path,
+                "-ac", "1", "-ar", "16000", "-c:a", "pcm_s16le",
+                wav_path, "-y"
+            ]
+            
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+            if process.returncode != 0:
+                raise Exception(f"WAV re-encode failed: {stderr.decode(errors='ignore')[-500:]}")
+        
+        try:
+            return await self._post_transcription(
+                wav_path, form, api_key, upload_name=f"segment_{i:04d}_clean.wav", user_id=user_id
+            )
+        finally:
+            # Clean up temp WAV
+            try:
+                os.unlink(wav_path)
+            except OSError:
+                pass
+    
     async def stage_merge(self, job: TranscriptionJob):
         """Stage 6: Merge segment transcriptions"""
         stage = TranscriptionStage.MERGING
         logger.info(f"🔗 Job {job.id}: Merging transcripts")
         
         start_time = time.time()
-        await TranscriptionJobStore.update_job_stage(job.id, stage, 20.0)
+        await self.progress.set_stage(job.id, stage, 20.0)
         
         try:
             # Get transcription results with retry logic
             checkpoint = None
             for attempt in range(3):  # Try 3 times
-                checkpoint = await TranscriptionJobStore.get_stage_checkpoint(job.id, TranscriptionStage.TRANSCRIBING)
+                checkpoint = await self.checkpoints.get(job.id, TranscriptionStage.TRANSCRIBING)
                 if checkpoint and checkpoint.get("transcripts"):
                     break
                 if attempt < 2:  # Wait before retrying
@@ -773,7 +1169,7 @@ class PipelineWorker:
             # Sort by index to ensure correct order
             transcripts.sort(key=lambda x: x["index"])
             
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 40.0)
+            await self.progress.update(job.id, stage, 40.0)
             
             # Merge into final transcript
             final_text = []
@@ -786,7 +1182,7 @@ class PipelineWorker:
             
             merged_transcript = "\n\n".join(final_text)
             
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 70.0)
+            await self.progress.update(job.id, stage, 70.0)
             
             # Store merged results
             merge_results = {
@@ -796,21 +1192,21 @@ class PipelineWorker:
                 "failed_segments": len([t for t in transcripts if t["text"] == "[Transcription failed]"])
             }
             
-            await TranscriptionJobStore.set_stage_checkpoint(job.id, stage, merge_results)
+            await self.checkpoints.set(job.id, stage, merge_results)
             
             # Update job with results
             await TranscriptionJobStore.set_job_results(job.id, {
                 "word_count": total_words
             })
             
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 100.0)
+            await self.progress.update(job.id, stage, 100.0)
             
             # Record stage completion
             duration_seconds = time.time() - start_time
             await TranscriptionJobStore.record_stage_duration(job.id, stage, duration_seconds)
             
             # Move to next stage
-            await TranscriptionJobStore.update_job_stage(job.id, TranscriptionStage.DIARIZING, 0.0)
+            await self.progress.set_stage(job.id, TranscriptionStage.DIARIZING, 0.0)
             logger.info(f"✅ Job {job.id}: Merge complete ({total_words} words)")
             
         except Exception as e:
@@ -822,26 +1218,27 @@ class PipelineWorker:
         logger.info(f"👥 Job {job.id}: Enhanced speaker diarization")
         
         start_time = time.time()
-        await TranscriptionJobStore.update_job_stage(job.id, stage, 10.0)
+        await self.progress.set_stage(job.id, stage, 10.0)
         
         try:
-            job_data = await TranscriptionJobStore.get_job(job.id)
+            job_data = await TranscriptionJobStore.get_job(job.id, include_checkpoints=False)
             
             if not job_data.enable_diarization:
                 logger.info(f"Diarization disabled for job {job.id}, skipping")
-                await TranscriptionJobStore.update_stage_progress(job.id, stage, 100.0)
+                await self.progress.update(job.id, stage, 100.0)
                 
                 # Record stage completion
                 duration_seconds = time.time() - start_time
                 await TranscriptionJobStore.record_stage_duration(job.id, stage, duration_seconds)
                 
                 # Move to next stage
-                await TranscriptionJobStore.update_job_stage(job.id, TranscriptionStage.GENERATING_OUTPUTS, 0.0)
+                await self.progress.set_stage(job.id, TranscriptionStage.GENERATING_OUTPUTS, 0.0)
                 return
             
             # Get transcription and merge results
-            transcription_checkpoint = await TranscriptionJobStore.get_stage_checkpoint(job.id, TranscriptionStage.TRANSCRIBING)
-            merge_checkpoint = await TranscriptionJobStore.get_stage_checkpoint(job.id, TranscriptionStage.MERGING)
+            checkpoints = await self.checkpoints.get_many(job.id, [TranscriptionStage.TRANSCRIBING, TranscriptionStage.MERGING])
+            transcription_checkpoint = checkpoints.get(TranscriptionStage.TRANSCRIBING.value)
+            merge_checkpoint = checkpoints.get(TranscriptionStage.MERGING.value)
             
             if not transcription_checkpoint or not merge_checkpoint:
                 raise Exception("Transcription or merge data not found")
@@ -849,7 +1246,7 @@ class PipelineWorker:
             segments = transcription_checkpoint.get("transcripts", [])
             final_transcript = merge_checkpoint.get("final_transcript", "")
             
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 30.0)
+            await self.progress.update(job.id, stage, 30.0)
             
             # Phase 3: Enhanced speaker diarization using OpenAI for speaker detection
             logger.info(f"Performing advanced speaker diarization for {len(segments)} segments")
@@ -861,7 +1258,7 @@ class PipelineWorker:
                 try:
                     diarized_result = await self._perform_ai_diarization(final_transcript, segments, api_key)
                     
-                    await TranscriptionJobStore.update_stage_progress(job.id, stage, 80.0)
+                    await self.progress.update(job.id, stage, 80.0)
                     
                     diarization_results = {
                         "diarized_transcript": diarized_result["diarized_transcript"],
@@ -879,16 +1276,16 @@ class PipelineWorker:
                 # Simple diarization for short content or when no API key
                 diarization_results = await self._perform_simple_diarization(final_transcript, segments, job_data.total_duration)
             
-            await TranscriptionJobStore.set_stage_checkpoint(job.id, stage, diarization_results)
+            await self.checkpoints.set(job.id, stage, diarization_results)
             
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 100.0)
+            await self.progress.update(job.id, stage, 100.0)
             
             # Record stage completion
             duration_seconds = time.time() - start_time
             await TranscriptionJobStore.record_stage_duration(job.id, stage, duration_seconds)
             
             # Move to next stage
-            await TranscriptionJobStore.update_job_stage(job.id, TranscriptionStage.GENERATING_OUTPUTS, 0.0)
+            await self.progress.set_stage(job.id, TranscriptionStage.GENERATING_OUTPUTS, 0.0)
             logger.info(f"✅ Job {job.id}: Enhanced diarization complete ({diarization_results['speaker_count']} speakers)")
             
         except Exception as e:
@@ -900,12 +1297,15 @@ class PipelineWorker:
         logger.info(f"📄 Job {job.id}: Generating output formats")
         
         start_time = time.time()
-        await TranscriptionJobStore.update_job_stage(job.id, stage, 10.0)
+        await self.progress.set_stage(job.id, stage, 10.0)
         
         try:
-            # Get final transcript data
-            merge_checkpoint = await TranscriptionJobStore.get_stage_checkpoint(job.id, TranscriptionStage.MERGING)
-            diarization_checkpoint = await TranscriptionJobStore.get_stage_checkpoint(job.id, TranscriptionStage.DIARIZING)
+            # Get final transcript data (one read for all three checkpoints)
+            checkpoints = await self.checkpoints.get_many(job.id, [
+                TranscriptionStage.MERGING, TranscriptionStage.DIARIZING, TranscriptionStage.TRANSCRIBING
+            ])
+            merge_checkpoint = checkpoints.get(TranscriptionStage.MERGING.value)
+            diarization_checkpoint = checkpoints.get(TranscriptionStage.DIARIZING.value)
             
             if not merge_checkpoint:
                 raise Exception("Merge data not found")
@@ -914,13 +1314,13 @@ class PipelineWorker:
             diarized_transcript = diarization_checkpoint.get("diarized_transcript", final_transcript) if diarization_checkpoint else final_transcript
             
             # Get detailed segments for JSON/SRT/VTT generation
-            transcription_checkpoint = await TranscriptionJobStore.get_stage_checkpoint(job.id, TranscriptionStage.TRANSCRIBING)
+            transcription_checkpoint = checkpoints.get(TranscriptionStage.TRANSCRIBING.value)
             segments = transcription_checkpoint.get("transcripts", []) if transcription_checkpoint else []
             
             assets_created = []
             
             # Generate TXT format
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 20.0)
+            await self.progress.update(job.id, stage, 20.0)
             txt_content = diarized_transcript
             txt_key = await storage_manager.store_file(
                 txt_content.encode('utf-8'),
@@ -939,7 +1339,7 @@ class PipelineWorker:
             assets_created.append("txt")
             
             # Generate JSON format
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 40.0)
+            await self.progress.update(job.id, stage, 40.0)
             json_data = {
                 "transcript": final_transcript,
                 "diarized_transcript": diarized_transcript,
@@ -971,7 +1371,7 @@ class PipelineWorker:
             assets_created.append("json")
             
             # Generate SRT format
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 60.0)
+            await self.progress.update(job.id, stage, 60.0)
             srt_content = self._generate_srt(segments)
             srt_key = await storage_manager.store_file(
                 srt_content.encode('utf-8'),
@@ -990,7 +1390,7 @@ class PipelineWorker:
             assets_created.append("srt")
             
             # Generate VTT format
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 80.0)
+            await self.progress.update(job.id, stage, 80.0)
             vtt_content = self._generate_vtt(segments)
             vtt_key = await storage_manager.store_file(
                 vtt_content.encode('utf-8'),
@@ -1009,7 +1409,7 @@ class PipelineWorker:
             assets_created.append("vtt")
             
             # Generate DOCX format (Phase 3 enhancement)
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 90.0)
+            await self.progress.update(job.id, stage, 90.0)
             docx_content = await self._generate_docx(job.id, diarized_transcript, segments, json_data)
             docx_key = await storage_manager.store_file(
                 docx_content,
@@ -1027,21 +1427,21 @@ class PipelineWorker:
             await TranscriptionAssetStore.create_asset(docx_asset)
             assets_created.append("docx")
             
-            await TranscriptionJobStore.update_stage_progress(job.id, stage, 100.0)
+            await self.progress.update(job.id, stage, 100.0)
             
             # Store output results
             output_results = {
                 "assets_created": assets_created,
                 "output_formats": ["txt", "json", "srt", "vtt", "docx"]
             }
-            await TranscriptionJobStore.set_stage_checkpoint(job.id, stage, output_results)
+            await self.checkpoints.set(job.id, stage, output_results)
             
             # Record stage completion
             duration_seconds = time.time() - start_time
             await TranscriptionJobStore.record_stage_duration(job.id, stage, duration_seconds)
             
             # Move to final stage
-            await TranscriptionJobStore.update_job_stage(job.id, TranscriptionStage.COMPLETE, 0.0)
+            await self.progress.set_stage(job.id, TranscriptionStage.COMPLETE, 0.0)
             logger.info(f"✅ Job {job.id}: Output generation complete ({len(assets_created)} formats)")
             
             # 🔥 CRITICAL: Update main notes system with transcription results
@@ -1056,8 +1456,9 @@ class PipelineWorker:
             logger.info(f"🔄 Starting main note update for job {job.id}")
             
             # Get the final transcription results
-            merge_checkpoint = await TranscriptionJobStore.get_stage_checkpoint(job.id, TranscriptionStage.MERGING)
-            diarization_checkpoint = await TranscriptionJobStore.get_stage_checkpoint(job.id, TranscriptionStage.DIARIZING)
+            checkpoints = await self.checkpoints.get_many(job.id, [TranscriptionStage.MERGING, TranscriptionStage.DIARIZING])
+            merge_checkpoint = checkpoints.get(TranscriptionStage.MERGING.value)
+            diarization_checkpoint = checkpoints.get(TranscriptionStage.DIARIZING.value)
             
             if not merge_checkpoint:
                 logger.warning(f"❌ No merge checkpoint found for job {job.id}, cannot update main note")
@@ -1118,12 +1519,19 @@ class PipelineWorker:
             
             logger.info(f"✅ Successfully updated main note {note_id} with transcription results from job {job.id}")
             
+            # Identical re-uploads are linked to these results from now on
+            indexed = await remember_completed_upload(job)
+            
             # 🔥 MEMORY OPTIMIZATION: Clean up large file system data after successful transfer
             try:
-                # Delete transcription assets from large file system to avoid duplication
+                # Delete transcription assets from large file system to avoid duplication,
+                # unless linked re-uploads will copy them from this job
                 from enhanced_store import TranscriptionAssetStore
-                await TranscriptionAssetStore.delete_assets_for_job(job.id)
-                logger.info(f"🗑️  Cleaned up large file assets for job {job.id} to avoid duplication")
+                if indexed:
+                    logger.info(f"📌 Keeping assets of job {job.id}: it is the dedup source for its upload")
+                else:
+                    await TranscriptionAssetStore.delete_assets_by_job(job.id)
+                    logger.info(f"🗑️  Cleaned up large file assets for job {job.id} to avoid duplication")
                 
                 # Mark large file job as archived instead of deleting completely
                 await TranscriptionJobStore.update_job_status(job.id, TranscriptionStatus.COMPLETE)
@@ -1210,7 +1618,7 @@ class PipelineWorker:
         """
         
         try:
-            async with httpx.AsyncClient(timeout=60) as client:
+            async with resource_limits.llm, http_clients.session(Upstream.OPENAI, timeout=60) as client:
                 response = await client.post(
                     "https://api.openai.com/v1/chat/completions",
                     json={
@@ -1452,8 +1860,10 @@ def stop_worker():
 
 async def process_single_job(job_id: str):
     """Process a specific job (for manual processing)"""
-    job = await TranscriptionJobStore.get_job(job_id)
+    job = await TranscriptionJobStore.claim_job(job_id, worker.worker_id, worker.lease_seconds)
     if job:
-        await worker.process_job(job)
+        await worker.process_claimed_job(job)
+    elif await TranscriptionJobStore.get_job(job_id):
+        logger.info(f"Job {job_id} is leased by another worker, skipping")
     else:
         raise Exception(f"Job {job_id} not found")
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Priority lanes for transcription work
+Jobs are classed by audio length into interactive (short memos), standard and
+bulk (long-form) lanes. Each lane has its own concurrency budget so a backlog
+of long recordings cannot delay short ones, and queue wait is measured per
+lane against a latency SLO.
+"""
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import Dict, Optional, List
+import logging
+
+from monitoring import monitoring_service
+
+logger = logging.getLogger(__name__)
+
+class JobLane(str, Enum):
+    """Priority lane, highest priority first"""
+    INTERACTIVE = "interactive"
+    STANDARD = "standard"
+    BULK = "bulk"
+
+LANE_ORDER: List[JobLane] = [JobLane.INTERACTIVE, JobLane.STANDARD, JobLane.BULK]
+
+# Lane boundaries by audio duration
+INTERACTIVE_MAX_SECONDS = float(os.getenv("LANE_INTERACTIVE_MAX_SECONDS", "300"))  # 5 minutes
+BULK_MIN_SECONDS = float(os.getenv("LANE_BULK_MIN_SECONDS", "3600"))  # 1 hour
+
+# Queue-wait SLO per lane in seconds (None = best effort)
+LANE_SLO_SECONDS: Dict[JobLane, Optional[float]] = {
+    JobLane.INTERACTIVE: float(os.getenv("LANE_INTERACTIVE_SLO_SECONDS", "30")),
+    JobLane.STANDARD: float(os.getenv("LANE_STANDARD_SLO_SECONDS", "300")),
+    JobLane.BULK: None,
+}
+
+def lane_for_duration(duration_seconds: Optional[float]) -> JobLane:
+    """Lane for a job of the given audio length (unknown length is standard)"""
+    if not duration_seconds or duration_seconds <= 0:
+        return JobLane.STANDARD
+    if duration_seconds < INTERACTIVE_MAX_SECONDS:
+        return JobLane.INTERACTIVE
+    if duration_seconds >= BULK_MIN_SECONDS:
+        return JobLane.BULK
+    return JobLane.STANDARD
+
+def record_lane_wait(lane: JobLane, wait_seconds: float, source: str = "pipeline"):
+    """Record queue wait for a lane and count SLO breaches"""
+    tags = {"lane": lane.value, "source": source}
+    collector = monitoring_service.metrics_collector
+    collector.record_histogram("lane_queue_wait_seconds", wait_seconds, tags, unit="seconds")
+
+    slo = LANE_SLO_SECONDS.get(lane)
+    if slo is not None and wait_seconds > slo:
+        collector.increment_counter("lane_slo_breaches", tags=tags)
+        logger.warning(f"⏱️ {lane.value} lane SLO breached ({source}): waited {wait_seconds:.1f}s > {slo:.0f}s")
+
+class LaneBudgets:
+    """Per-lane concurrency budgets"""
+
+    def __init__(self, prefix: str = "LANE"):
+        defaults = {JobLane.INTERACTIVE: 4, JobLane.STANDARD: 4, JobLane.BULK: 2}
+        self.budgets: Dict[JobLane, int] = {
+            lane: max(1, int(os.getenv(f"{prefix}_{lane.value.upper()}_CONCURRENCY", str(default))))
+            for lane, default in defaults.items()
+        }
+        self.active: Dict[JobLane, int] = {lane: 0 for lane in JobLane}
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _cond(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def has_capacity(self, lane: JobLane) -> bool:
+        return self.active[lane] < self.budgets[lane]
+
+    def admit(self, lane: JobLane):
+        """Count work admitted to a lane without waiting (caller checked capacity)"""
+        self.active[lane] += 1
+
+    def leave(self, lane: JobLane):
+        """Release work previously admitted or slotted"""
+        self.active[lane] = max(0, self.active[lane] - 1)
+        if self._condition is not None:
+            asyncio.ensure_future(self._notify())
+
+    async def _notify(self):
+        async with self._cond():
+            self._cond().notify_all()
+
+    @asynccontextmanager
+    async def slot(self, lane: JobLane):
+        """Wait for a free slot in the lane, then hold it"""
+        async with self._cond():
+            await self._cond().wait_for(lambda: self.has_capacity(lane))
+            self.active[lane] += 1
+        try:
+            yield
+        finally:
+            self.active[lane] -= 1
+            await self._notify()
+
+    def get_status(self) -> Dict[str, Dict[str, int]]:
+        return {
+            lane.value: {"active": self.active[lane], "budget": self.budgets[lane]}
+            for lane in LANE_ORDER
+        }
+
+# Budgets for pipeline stages and for note (memo/OCR) processing
+pipeline_lanes = LaneBudgets("PIPELINE_LANE")
+note_lanes = LaneBudgets("NOTE_LANE")
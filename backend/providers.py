@@ -6,6 +6,9 @@ import math
 import time
 import uuid
 from pathlib import Path
+from http_clients import http_clients, Upstream, TransientUpstreamError
+from rate_limiting import upstream_governor
+from stt_cache import stt_cache
 
 logger = logging.getLogger(__name__)
 
@@ -24,11 +27,20 @@ async def get_audio_duration(file_path: str) -> float:
             'ffprobe', '-v', 'quiet', '-print_format', 'json', 
             '-show_format', file_path
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        # Async subprocess so the probe never blocks the event loop
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=30)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
         
-        if result.returncode == 0:
+        if process.returncode == 0:
             import json
-            data = json.loads(result.stdout)
+            data = json.loads(stdout)
             duration = float(data['format']['duration'])
             return duration
         else:
@@ -90,7 +102,10 @@ async def split_audio_file(file_path: str, chunk_duration: int = CHUNK_DURATION_
 
 async def transcribe_audio_chunk(chunk_path: str, api_key: str, language: str = "en", max_retries: int = 5) -> str:
     """Transcribe a single audio chunk with enhanced retry logic for OpenAI rate limiting"""
-    import random
+    audio_sha256 = await stt_cache.fingerprint(chunk_path)
+    cached = await stt_cache.get(audio_sha256, "whisper-1", language)
+    if cached is not None:
+        return cached.get("text", "")
     
     for attempt in range(max_retries):
         try:
@@ -102,7 +117,7 @@ async def transcribe_audio_chunk(chunk_path: str, api_key: str, language: str =
                     "language": language  # Explicitly specify language
                 }
                 
-                async with httpx.AsyncClient(timeout=600) as client:  # 10 minute timeout per chunk
+                async with http_clients.session(Upstream.OPENAI, timeout=600) as client:  # 10 minute timeout per chunk
                     r = await client.post(
                         f'{os.getenv("WHISPER_API_BASE","https://api.openai.com/v1")}/audio/transcriptions',
                         data=form,
@@ -114,24 +129,16 @@ async def transcribe_audio_chunk(chunk_path: str, api_key: str, language: str =
                     text_result = data.get("text", "")
                     if text_result:
                         logger.info(f"✅ Successfully transcribed chunk: {os.path.basename(chunk_path)}")
+                        await stt_cache.set(audio_sha256, "whisper-1", language, {"text": text_result})
                     return text_result
                     
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 429:  # Rate limit error
-                # Get retry-after header if available
-                retry_after = e.response.headers.get('retry-after')
-                if retry_after:
-                    wait_time = int(retry_after)
-                    logger.warning(f"🚦 OpenAI rate limit (retry-after: {wait_time}s) for {os.path.basename(chunk_path)} (attempt {attempt + 1}/{max_retries})")
-                else:
-                    # Enhanced exponential backoff with jitter for rate limits
-                    base_wait = (2 ** attempt) * 15  # 15s, 30s, 60s, 120s, 240s
-                    jitter = random.uniform(0.1, 0.3) * base_wait  # Add 10-30% jitter
-                    wait_time = base_wait + jitter
-                    logger.warning(f"🚦 OpenAI rate limit hit for {os.path.basename(chunk_path)}, backing off {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})")
-                
-                if attempt < max_retries - 1:  # Don't sleep on the last attempt
-                    await asyncio.sleep(wait_time)
+                # The shared upstream governor has already applied retry-after and
+                # slowed every caller, so the next attempt waits for its permit
+                if attempt < max_retries - 1:
+                    logger.warning(f"🚦 OpenAI rate limit for {os.path.basename(chunk_path)}, retry paced by upstream governor (attempt {attempt + 1}/{max_retries})")
+                    await upstream_governor.backoff(e.response.headers, (2 ** attempt) * 15)  # 15s, 30s, 60s...
                     continue
                 else:
                     logger.error(f"❌ OpenAI rate limit exceeded after {max_retries} attempts for {os.path.basename(chunk_path)}")
@@ -165,7 +172,7 @@ async def _download(url: str) -> str:
         return url
     
     # Otherwise download from URL
-    async with httpx.AsyncClient(timeout=60) as client:
+    async with http_clients.session(Upstream.MEDIA, timeout=60) as client:
         r = await client.get(url, follow_redirects=True)
         r.raise_for_status()
         fd, path = tempfile.mkstemp()
@@ -193,6 +200,12 @@ async def stt_transcribe(file_url: str):
                 # Small file - process with retry logic for rate limits
                 logger.info("File size OK, processing directly with rate limit handling")
                 
+                # Retries and reprocessing of the same recording cost no STT call
+                audio_sha256 = await stt_cache.fingerprint(local)
+                cached = await stt_cache.get(audio_sha256, "whisper-1", "en")
+                if cached is not None:
+                    return {"text": cached.get("text", ""), "summary": "", "actions": []}
+                
                 max_retries = 3
                 for attempt in range(max_retries):
                     try:
@@ -200,7 +213,7 @@ async def stt_transcribe(file_url: str):
                             files = {"file": audio_file}
                             form = {"model": "whisper-1", "response_format": "json", "language": "en"}
                             
-                            async with httpx.AsyncClient(timeout=600) as client:  # 10 minute timeout
+                            async with http_clients.session(Upstream.OPENAI, timeout=600) as client:  # 10 minute timeout
                                 r = await client.post(
                                     f'{os.getenv("WHISPER_API_BASE","https://api.openai.com/v1")}/audio/transcriptions',
                                     data=form,
@@ -210,13 +223,14 @@ async def stt_transcribe(file_url: str):
                                 r.raise_for_status()
                                 data = r.json()
                                 text = data.get("text", "")
+                                if text:
+                                    await stt_cache.set(audio_sha256, "whisper-1", "en", {"text": text})
                                 return {"text": text, "summary": "", "actions": []}
                                 
                     except httpx.HTTPStatusError as e:
-                        if e.response.status_code == 429:  # Rate limit error
-                            wait_time = (2 ** attempt) * 5  # Exponential backoff: 5s, 10s, 20s
-                            logger.warning(f"Rate limit hit for small file, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                            await asyncio.sleep(wait_time)
+                        if e.response.status_code == 429:  # Rate limit error - retry paced by upstream governor
+                            logger.warning(f"Rate limit hit for small file, retrying (attempt {attempt + 1}/{max_retries})")
+                            await upstream_governor.backoff(e.response.headers, (2 ** attempt) * 5)  # 5s, 10s, 20s
                             continue
                         elif e.response.status_code == 500:  # Server error - retry
                             wait_time = (2 ** attempt) * 3  # Exponential backoff: 3s, 6s, 12s
@@ -245,7 +259,7 @@ async def stt_transcribe(file_url: str):
                 logger.info(f"Processing {len(chunks)} audio chunks")
                 transcriptions = []
                 
-                # Process each chunk sequentially with delays to avoid rate limits
+                # Process each chunk sequentially; the upstream governor paces requests
                 for i, chunk_path in enumerate(chunks):
                     try:
                         logger.info(f"Transcribing chunk {i+1}/{len(chunks)}")
@@ -260,11 +274,6 @@ async def stt_transcribe(file_url: str):
                         else:
                             logger.warning(f"Empty transcription for chunk {i+1}")
                         
-                        # Add delay between chunks to respect rate limits (except for last chunk)
-                        if i < len(chunks) - 1:
-                            logger.info(f"Waiting 3 seconds before processing next chunk...")
-                            await asyncio.sleep(3)
-                        
                     except Exception as e:
                         logger.error(f"Error processing chunk {i+1}: {e}")
                         transcriptions.append(f"[Part {i+1}] Error processing this segment")
@@ -414,12 +423,11 @@ async def ocr_read(file_url: str):
             }
             
             # Optimized retry logic for OCR with faster backoff
-            import random
             max_retries = 3  # Reduced retries for faster processing
             
             for attempt in range(max_retries):
                 try:
-                    async with httpx.AsyncClient(timeout=60) as client:  # Reduced timeout
+                    async with http_clients.session(Upstream.OPENAI, timeout=60) as client:  # Reduced timeout
                         r = await client.post(
                             "https://api.openai.com/v1/chat/completions",
                             json=payload,
@@ -444,26 +452,14 @@ async def ocr_read(file_url: str):
                             if r.status_code == 400:
                                 raise ValueError("Image format not supported or image too large. Please try a smaller PNG or JPG image.")
                             elif r.status_code == 429:
-                                # Get retry-after header if available
-                                retry_after = r.headers.get('retry-after')
-                                if retry_after:
-                                    wait_time = min(int(retry_after), 30)  # Cap at 30 seconds
-                                    logger.warning(f"🚦 OpenAI OCR rate limit (retry-after: {wait_time}s) (attempt {attempt + 1}/{max_retries})")
-                                else:
-                                    # Faster exponential backoff for OCR - OCR is typically quicker than transcription
-                                    base_wait = (2 ** attempt) * 5  # 5s, 10s, 20s (much faster than transcription)
-                                    jitter = random.uniform(0.1, 0.2) * base_wait  # Less jitter
-                                    wait_time = min(base_wait + jitter, 30)  # Cap at 30 seconds
-                                    logger.warning(f"🚦 OpenAI OCR rate limit (fast backoff: {wait_time:.1f}s) (attempt {attempt + 1}/{max_retries})")
-                                
+                                # The upstream governor honours retry-after and paces the retry
                                 if attempt < max_retries - 1:
-                                    # Always notify user about OCR delays since they're shorter
-                                    logger.info(f"⏳ OCR processing delayed due to rate limits, retrying in {wait_time:.0f} seconds")
-                                    await asyncio.sleep(wait_time)
+                                    logger.info(f"⏳ OCR processing delayed due to rate limits, retry paced by upstream governor (attempt {attempt + 1}/{max_retries})")
+                                    await upstream_governor.backoff(r.headers, (2 ** attempt) * 5)  # 5s, 10s
                                     continue
                                 else:
                                     logger.error(f"❌ OpenAI OCR rate limit exceeded after {max_retries} attempts")
-                                    raise ValueError("OCR service is currently busy. Please try again in a moment.")
+                                    raise TransientUpstreamError("OCR service is currently busy. Please try again in a moment.")
                             elif r.status_code == 500:
                                 # Server error - retry with shorter backoff
                                 wait_time = (2 ** attempt) * 2  # 2s, 4s, 8s (faster than before)
@@ -472,7 +468,7 @@ async def ocr_read(file_url: str):
                                     await asyncio.sleep(wait_time)
                                     continue
                                 else:
-                                    raise ValueError("OCR service temporarily unavailable due to server issues. Please try again later.")
+                                    raise TransientUpstreamError("OCR service temporarily unavailable due to server issues. Please try again later.")
                             else:
                                 raise ValueError(f"OCR processing temporarily unavailable (Error {r.status_code}). Please try again.")
                                 
@@ -484,8 +480,8 @@ async def ocr_read(file_url: str):
                         continue
                     else:
                         raise ValueError("OCR processing timed out. Please try with a smaller or clearer image.")
-                except ValueError:
-                    # Re-raise ValueError as-is (these are our custom validation errors)
+                except (ValueError, TransientUpstreamError):
+                    # Re-raise as-is (validation errors, or retries already exhausted)
                     raise
                 except Exception as e:
                     logger.error(f"OCR request failed (attempt {attempt + 1}): {str(e)}")
@@ -509,7 +505,7 @@ async def ocr_read(file_url: str):
                 }]
             }
             
-            async with httpx.AsyncClient(timeout=120) as client:
+            async with http_clients.session(Upstream.GOOGLE, timeout=120) as client:
                 r = await client.post(
                     f"https://vision.googleapis.com/v1/images:annotate?key={api_key}",
                     json=payload
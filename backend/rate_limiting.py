@@ -1,8 +1,10 @@
 """
 Phase 4: API rate limiting and quota management system
-Implements token bucket, sliding window, and user quota systems
+Implements token bucket, sliding window, and user quota systems, plus an
+adaptive governor that paces calls to upstream AI providers
 """
 import os
+import re
 import time
 import asyncio
 from datetime import datetime, timezone, timedelta
@@ -11,6 +13,7 @@ from dataclasses import dataclass
 from enum import Enum
 import logging
 from collections import defaultdict, deque
+from email.utils import parsedate_to_datetime
 
 logger = logging.getLogger(__name__)
 
@@ -428,9 +431,173 @@ class QuotaManager:
             }
         }
 
+def parse_rate_limit_duration(value: Optional[str]) -> Optional[float]:
+    """Parse retry-after / x-ratelimit-reset-* values into seconds.
+
+    Accepts plain seconds ("20"), Go-style durations ("1s", "6m0s", "20ms")
+    and HTTP dates.
+    """
+    if not value:
+        return None
+    value = value.strip()
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if parts:
+        scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+        return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """How long a 429 response asks callers to wait, if it says"""
+    if headers.get("retry-after-ms"):
+        return float(headers["retry-after-ms"]) / 1000
+    retry_after = parse_rate_limit_duration(headers.get("retry-after"))
+    if retry_after is None:
+        retry_after = parse_rate_limit_duration(headers.get("x-ratelimit-reset-requests"))
+    return retry_after
+
+class AdaptiveRateGovernor:
+    """AIMD pacing of requests to one upstream model.
+
+    Callers are spaced 60/rpm seconds apart. A 429 halves the rate and blocks
+    every caller until retry-after; each success adds back a little, up to the
+    ceiling learned from x-ratelimit-limit-requests. When the remaining
+    request or token budget runs low, the rate is slowed to spread what is
+    left over the reset window instead of running into the limit.
+    """
+
+    def __init__(self, name: str, rpm: float, min_rpm: float = 6.0,
+                 increase_rpm: float = 10.0, decrease_factor: float = 0.5,
+                 safety_margin: float = 0.9, default_backoff_seconds: float = 5.0):
+        self.name = name
+        self.max_rpm = rpm
+        self.rpm = rpm
+        self.min_rpm = min_rpm
+        self.increase_rpm = increase_rpm
+        self.decrease_factor = decrease_factor
+        self.safety_margin = safety_margin
+        self.default_backoff_seconds = default_backoff_seconds
+        self.low_budget_fraction = 0.1
+
+        self._next_at = 0.0  # monotonic time of the next free send slot
+        self.blocked_until = 0.0
+        self.throttled = 0
+
+    @property
+    def interval(self) -> float:
+        return 60.0 / self.rpm
+
+    async def acquire(self):
+        """Wait for this caller's send slot"""
+        while True:
+            now = time.monotonic()
+            start = max(now, self._next_at, self.blocked_until)
+            self._next_at = start + self.interval
+            if start <= now:
+                return
+
+            await asyncio.sleep(start - now)
+            if self.blocked_until <= time.monotonic():
+                return
+
+    def _block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def observe(self, status_code: int, headers) -> None:
+        """Adapt the rate from an upstream response"""
+        if status_code == 429:
+            self.throttled += 1
+            self.rpm = max(self.min_rpm, self.rpm * self.decrease_factor)
+            retry_after = retry_after_seconds(headers)
+            self._block(retry_after if retry_after is not None else self.default_backoff_seconds)
+            logger.warning(f"🚦 {self.name} throttled: rate cut to {self.rpm:.0f} rpm, paused {self.blocked_until - time.monotonic():.1f}s")
+            return
+
+        if status_code >= 400:
+            return
+
+        limit = _header_float(headers, "x-ratelimit-limit-requests")
+        if limit:
+            self.max_rpm = max(self.min_rpm, limit * self.safety_margin)
+
+        self.rpm = min(self.max_rpm, self.rpm + self.increase_rpm)
+
+        # Spread a nearly spent budget over the rest of its window
+        for kind in ("requests", "tokens"):
+            remaining = _header_float(headers, f"x-ratelimit-remaining-{kind}")
+            limit = _header_float(headers, f"x-ratelimit-limit-{kind}")
+            reset = parse_rate_limit_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if remaining is None or not limit or reset is None:
+                continue
+            if remaining <= 0:
+                self._block(reset)
+            elif remaining < limit * self.low_budget_fraction and kind == "requests":
+                self.rpm = max(self.min_rpm, min(self.rpm, remaining / max(reset, 1.0) * 60.0))
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "rpm": round(self.rpm, 1),
+            "max_rpm": round(self.max_rpm, 1),
+            "blocked_for": max(0.0, round(self.blocked_until - time.monotonic(), 1)),
+            "throttled": self.throttled,
+        }
+
+def _header_float(headers, name: str) -> Optional[float]:
+    try:
+        value = headers.get(name)
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class UpstreamRateGovernor:
+    """Shared AIMD governors keyed by upstream model"""
+
+    def __init__(self):
+        self.enabled = os.getenv("UPSTREAM_GOVERNOR_ENABLED", "true").lower() == "true"
+        self.default_rpm = float(os.getenv("UPSTREAM_DEFAULT_RPM", "500"))
+        self.governors: Dict[str, AdaptiveRateGovernor] = {}
+
+    def get(self, key: str) -> AdaptiveRateGovernor:
+        governor = self.governors.get(key)
+        if governor is None:
+            env_key = re.sub(r"[^A-Z0-9]", "_", key.upper())
+            rpm = float(os.getenv(f"UPSTREAM_RPM_{env_key}", str(self.default_rpm)))
+            governor = self.governors[key] = AdaptiveRateGovernor(key, rpm)
+        return governor
+
+    async def acquire(self, key: str):
+        if self.enabled:
+            await self.get(key).acquire()
+
+    def observe(self, key: str, status_code: int, headers):
+        if self.enabled:
+            self.get(key).observe(status_code, headers)
+
+    async def backoff(self, headers, fallback_seconds: float):
+        """Wait before retrying a 429. With the governor on, observe() has
+        already paused the next permit; without it, sleep here instead"""
+        if self.enabled:
+            return
+        retry_after = retry_after_seconds(headers)
+        await asyncio.sleep(retry_after if retry_after is not None else fallback_seconds)
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        return {key: governor.get_status() for key, governor in self.governors.items()}
+
 # Global instances
 rate_limiter = RateLimiter()
 quota_manager = QuotaManager()
+upstream_governor = UpstreamRateGovernor()
 
 # Middleware functions
 async def check_rate_limit(user_id: str, endpoint: str) -> Tuple[bool, Dict[str, Any]]:
@@ -14,14 +14,15 @@ import secrets
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import uuid
-import httpx
 import time
 from datetime import datetime, timedelta, timezone
 from openai import OpenAI
 
 from store import NotesStore, TemplateStore
-from storage import store_file
-from tasks import enqueue_transcription, enqueue_ocr, enqueue_email, enqueue_git_sync, enqueue_iisb_processing
+from storage import store_upload_stream
+from http_clients import http_clients, Upstream
+from tasks import enqueue_email, enqueue_git_sync, enqueue_iisb_processing
+from note_task_queue import enqueue_note_task, NoteTaskKind
 from auth import (
     AuthService, User, UserCreate, UserLogin, UserResponse, UserProfileUpdate, 
     Token, get_current_user, get_current_user_optional
@@ -37,6 +38,7 @@ from webhooks import webhook_router
 # Phase 4: Production imports
 from cloud_storage import storage_manager
 from cache_manager import cache_manager
+from llm_cache import llm_cache, content_hash, invalidate_on_content_change
 from monitoring import monitoring_service, monitor_endpoint
 from rate_limiting import rate_limiter, quota_manager, check_rate_limit, check_user_quota
 from webhooks import webhook_manager
@@ -503,7 +505,6 @@ async def continue_to_iisb_analysis(
 @api_router.post("/notes/{note_id}/upload")
 async def upload_media(
     note_id: str,
-    background_tasks: BackgroundTasks,
     current_user: Optional[dict] = Depends(get_current_user_optional),
     file: UploadFile = File(...)
 ):
@@ -516,25 +517,24 @@ async def upload_media(
     if current_user and note.get("user_id") != current_user["id"]:
         raise HTTPException(status_code=403, detail="Not authorized to access this note")
     
-    # Store the file
-    file_content = await file.read()
-    media_key = store_file(file_content, file.filename)
+    # Stream the file to storage without buffering it in memory
+    media_key, size, sha256 = await store_upload_stream(file, file.filename)
+    logger.info(f"📥 Stored upload {file.filename} for note {note_id}: {size} bytes, sha256 {sha256[:12]}")
     
     # Update note with media key
     await NotesStore.update_media_key(note_id, media_key)
     
     # Queue processing based on note kind
     if note["kind"] == "audio":
-        background_tasks.add_task(enqueue_transcription, note_id)
+        await enqueue_note_task(NoteTaskKind.TRANSCRIPTION, note_id)
     elif note["kind"] == "photo":
-        background_tasks.add_task(enqueue_ocr, note_id)
+        await enqueue_note_task(NoteTaskKind.OCR, note_id)
 
     
     return {"message": "File uploaded successfully", "status": "processing"}
 
 @api_router.post("/upload-file")
 async def upload_file_for_scan(
-    background_tasks: BackgroundTasks,
     current_user: Optional[dict] = Depends(get_current_user_optional),
     file: UploadFile = File(...),
     title: str = Form("Uploaded Document")
@@ -570,18 +570,18 @@ async def upload_file_for_scan(
     user_id = current_user["id"] if current_user else None
     note_id = await NotesStore.create(title, note_kind, user_id)
     
-    # Store the file
-    file_content = await file.read()
-    media_key = store_file(file_content, file.filename)
+    # Stream the file to storage without buffering it in memory
+    media_key, size, sha256 = await store_upload_stream(file, file.filename)
+    logger.info(f"📥 Stored upload {file.filename} for note {note_id}: {size} bytes, sha256 {sha256[:12]}")
     
     # Update note with media key
     await NotesStore.update_media_key(note_id, media_key)
     
     # Queue appropriate processing
     if note_kind == "audio":
-        background_tasks.add_task(enqueue_transcription, note_id)
+        await enqueue_note_task(NoteTaskKind.TRANSCRIPTION, note_id)
     else:
-        background_tasks.add_task(enqueue_ocr, note_id)
+        await enqueue_note_task(NoteTaskKind.OCR, note_id)
     
     return {
         "id": note_id,
@@ -763,7 +763,9 @@ async def update_note(
         
         # Update the note
         if "artifacts" in update_data:
-            await NotesStore.set_artifacts(note_id, update_data["artifacts"])
+            # Analysis generated from the old transcript must not be served again
+            artifacts = invalidate_on_content_change(note.get("artifacts", {}), update_data["artifacts"])
+            await NotesStore.set_artifacts(note_id, artifacts)
             logger.info(f"Updated artifacts for note {note_id}")
         
         if "title" in update_data:
@@ -781,7 +783,6 @@ async def update_note(
 @api_router.post("/notes/{note_id}/retry-processing")
 async def retry_note_processing(
     note_id: str,
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """Retry processing for a stuck or failed note"""
@@ -824,8 +825,7 @@ async def retry_note_processing(
                 )
                 
                 # Re-enqueue transcription job
-                from tasks import enqueue_transcription
-                background_tasks.add_task(enqueue_transcription, note_id)
+                await enqueue_note_task(NoteTaskKind.TRANSCRIPTION, note_id)
                 retry_actions.append("transcription")
                 
         elif note_kind == "photo":
@@ -838,8 +838,7 @@ async def retry_note_processing(
                 )
                 
                 # Re-enqueue OCR job
-                from tasks import enqueue_ocr
-                background_tasks.add_task(enqueue_ocr, note_id)
+                await enqueue_note_task(NoteTaskKind.OCR, note_id)
                 retry_actions.append("OCR")
                 
         elif note_kind == "text":
@@ -1560,7 +1559,7 @@ async def batch_report_ai_chat(
         if not api_key:
             raise HTTPException(status_code=500, detail="AI service not configured")
         
-        async with httpx.AsyncClient(timeout=45) as client:
+        async with http_clients.session(Upstream.OPENAI, timeout=45) as client:
             openai_response = await client.post(
                 "https://api.openai.com/v1/chat/completions",
                 json={
@@ -1649,7 +1648,7 @@ async def ai_chat_with_note(
         Provide a comprehensive, profession-specific response that directly addresses their question.
         """
         
-        async with httpx.AsyncClient(timeout=45) as client:
+        async with http_clients.session(Upstream.OPENAI, timeout=45) as client:
             response = await client.post(
                 "https://api.openai.com/v1/chat/completions",
                 json={
@@ -1735,6 +1734,19 @@ async def generate_meeting_minutes(
         # Get user profile for professional context
         user_profile = current_user.get("profile", {}) if current_user else {}
         
+        # Repeated requests for unchanged content are served from the note
+        cache_key = llm_cache.key("meeting_minutes", "gpt-4o-mini", content_hash(combined_content),
+                                  {**user_profile, "expeditors": bool(is_expeditors_user)})
+        cached = llm_cache.from_note(artifacts, "meeting_minutes", cache_key)
+        if cached:
+            return {
+                "meeting_minutes": cached["content"],
+                "note_title": note["title"],
+                "generated_at": cached["generated_at"],
+                "note_id": note_id,
+                "is_expeditors": is_expeditors_user
+            }
+        
         # Generate professional context-aware meeting minutes prompt
         meeting_minutes_prompt = ai_context_processor.generate_dynamic_prompt(
             content=combined_content,
@@ -1798,7 +1810,7 @@ async def generate_meeting_minutes(
         - Focus on business outcomes and strategic initiatives
         """
         
-        async with httpx.AsyncClient(timeout=60) as client:
+        async with http_clients.session(Upstream.OPENAI, timeout=60) as client:
             response = await client.post(
                 "https://api.openai.com/v1/chat/completions",
                 json={
@@ -1817,7 +1829,7 @@ async def generate_meeting_minutes(
             meeting_minutes = ai_analysis["choices"][0]["message"]["content"]
             
             # Store the meeting minutes in artifacts
-            updated_artifacts = {**artifacts, "meeting_minutes": meeting_minutes}
+            updated_artifacts = llm_cache.note_artifacts(artifacts, "meeting_minutes", cache_key, meeting_minutes)
             await NotesStore.set_artifacts(note_id, updated_artifacts)
             
             return {
@@ -1857,6 +1869,17 @@ async def generate_action_items(
         if not api_key:
             raise HTTPException(status_code=503, detail="AI service configuration error")
         
+        # Repeated requests for an unchanged transcript are served from the note
+        cache_key = llm_cache.key("action_items", "gpt-4o-mini", content_hash(transcript))
+        cached = llm_cache.from_note(artifacts, "action_items", cache_key)
+        if cached:
+            return {
+                "action_items": cached["content"],
+                "note_title": note["title"],
+                "generated_at": cached["generated_at"],
+                "note_id": note_id
+            }
+        
         # Generate action items in clean, structured format
         prompt = f"""
         Based on the following meeting transcript, extract and create comprehensive action items in a professional format.
@@ -1893,7 +1916,7 @@ async def generate_action_items(
         Provide clean, readable text that can be easily copied into documents.
         """
         
-        async with httpx.AsyncClient(timeout=60) as client:
+        async with http_clients.session(Upstream.OPENAI, timeout=60) as client:
             response = await client.post(
                 "https://api.openai.com/v1/chat/completions",
                 json={
@@ -1912,7 +1935,7 @@ async def generate_action_items(
             action_items_table = ai_analysis["choices"][0]["message"]["content"]
             
             # Store the action items in artifacts
-            updated_artifacts = {**artifacts, "action_items": action_items_table}
+            updated_artifacts = llm_cache.note_artifacts(artifacts, "action_items", cache_key, action_items_table)
             await NotesStore.set_artifacts(note_id, updated_artifacts)
             
             return {
@@ -2613,6 +2636,21 @@ async def generate_professional_report(
     try:
         # Check if user is from Expeditors
         is_expeditors_user = current_user and current_user.get("email", "").endswith("@expeditors.com")
+        user_context = current_user.get("profile", {}) if current_user else {}
+        
+        # Repeated requests for unchanged content are served from the note
+        cache_key = llm_cache.key("professional_report", "gpt-4o-mini", content_hash(content, note.get("title", "")),
+                                  {**user_context, "expeditors": bool(is_expeditors_user)})
+        cached = llm_cache.from_note(artifacts, "professional_report", cache_key)
+        if cached:
+            await NotesStore.update_status(note_id, "completed")
+            return {
+                "report": cached["content"],
+                "note_title": note["title"],
+                "generated_at": cached["generated_at"],
+                "note_id": note_id,
+                "is_expeditors": is_expeditors_user
+            }
         
         # Add logo header for Expeditors users
         logo_header = ""
@@ -2652,8 +2690,6 @@ async def generate_professional_report(
         """
         
         # Use enhanced AI provider with dual-provider support
-        user_context = current_user.get("profile", {}) if current_user else {}
-        
         analysis_result = await generate_ai_analysis(
             content=prompt,
             analysis_type="professional_report",
@@ -2667,7 +2703,7 @@ async def generate_professional_report(
             report_content = logo_header + report_content
         
         # Store the report in artifacts
-        updated_artifacts = {**artifacts, "professional_report": report_content}
+        updated_artifacts = llm_cache.note_artifacts(artifacts, "professional_report", cache_key, report_content)
         await NotesStore.set_artifacts(note_id, updated_artifacts)
         
         # Mark note as completed since report was generated
@@ -3214,19 +3250,26 @@ async def generate_comprehensive_batch_report(
         Use professional business language. Structure content logically with clear section divisions. Write in narrative form with detailed explanations. NO bullet points in main content. Focus on business outcomes and strategic initiatives.
         """
         
-        async with httpx.AsyncClient(timeout=120) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [{"role": "user", "content": meeting_minutes_prompt}],
-                    "max_tokens": 2500,
-                    "temperature": 0.2
-                },
-                headers={"Authorization": f"Bearer {api_key}"}
-            )
-            response.raise_for_status()
-            meeting_minutes_result = response.json()["choices"][0]["message"]["content"]
+        # Unchanged batches are served from cache_manager
+        minutes_key = llm_cache.key("batch_meeting_minutes", "gpt-4o-mini", content_hash(combined_transcript, report_date))
+        cached = await llm_cache.get("batch_meeting_minutes", minutes_key)
+        if cached:
+            meeting_minutes_result = cached["content"]
+        else:
+            async with http_clients.session(Upstream.OPENAI, timeout=120) as client:
+                response = await client.post(
+                    "https://api.openai.com/v1/chat/completions",
+                    json={
+                        "model": "gpt-4o-mini",
+                        "messages": [{"role": "user", "content": meeting_minutes_prompt}],
+                        "max_tokens": 2500,
+                        "temperature": 0.2
+                    },
+                    headers={"Authorization": f"Bearer {api_key}"}
+                )
+                response.raise_for_status()
+                meeting_minutes_result = response.json()["choices"][0]["message"]["content"]
+            await llm_cache.set(minutes_key, {"content": meeting_minutes_result})
         
         # Generate consolidated action items table
         action_items_prompt = f"""
@@ -3254,19 +3297,25 @@ async def generate_comprehensive_batch_report(
         - Maximum 20 action items to keep focused
         """
         
-        async with httpx.AsyncClient(timeout=120) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [{"role": "user", "content": action_items_prompt}],
-                    "max_tokens": 2000,
-                    "temperature": 0.2
-                },
-                headers={"Authorization": f"Bearer {api_key}"}
-            )
-            response.raise_for_status()
-            action_items_result = response.json()["choices"][0]["message"]["content"]
+        action_items_key = llm_cache.key("batch_action_items", "gpt-4o-mini", content_hash(combined_transcript))
+        cached = await llm_cache.get("batch_action_items", action_items_key)
+        if cached:
+            action_items_result = cached["content"]
+        else:
+            async with http_clients.session(Upstream.OPENAI, timeout=120) as client:
+                response = await client.post(
+                    "https://api.openai.com/v1/chat/completions",
+                    json={
+                        "model": "gpt-4o-mini",
+                        "messages": [{"role": "user", "content": action_items_prompt}],
+                        "max_tokens": 2000,
+                        "temperature": 0.2
+                    },
+                    headers={"Authorization": f"Bearer {api_key}"}
+                )
+                response.raise_for_status()
+                action_items_result = response.json()["choices"][0]["message"]["content"]
+            await llm_cache.set(action_items_key, {"content": action_items_result})
         
         # Combine everything into comprehensive report
         if format == "ai":
@@ -3462,32 +3511,41 @@ async def generate_batch_comprehensive_report(
         Remember: Use ONLY plain text formatting. NO markdown symbols whatsoever.
         """
         
-        # Generate AI analysis using same method as individual reports
-        client = OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=4000,
-            temperature=0.7
-        )
+        # Unchanged batches are served from cache_manager
+        cache_key = llm_cache.key("batch_business_report", "gpt-4o-mini", content_hash(full_content),
+                                  {"expeditors": bool(is_expeditors_user)})
+        cached = await llm_cache.get("batch_business_report", cache_key)
+        if cached:
+            report_content = cached["content"]
+        else:
+            # Generate AI analysis using same method as individual reports
+            client = OpenAI(api_key=api_key)
+            response = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=4000,
+                temperature=0.7
+            )
         
-        report_content = response.choices[0].message.content
+            report_content = response.choices[0].message.content
         
-        # Clean any remaining markdown symbols from the AI response
-        import re
-        report_content = re.sub(r'\*\*\*', '', report_content)  # Remove triple asterisks
-        report_content = re.sub(r'\*\*', '', report_content)    # Remove double asterisks
-        report_content = re.sub(r'\*', '', report_content)      # Remove single asterisks
-        report_content = re.sub(r'###', '', report_content)     # Remove triple hashes
-        report_content = re.sub(r'##', '', report_content)      # Remove double hashes
-        report_content = re.sub(r'#', '', report_content)       # Remove single hashes
-        report_content = re.sub(r'__', '', report_content)      # Remove double underscores
-        report_content = re.sub(r'_', '', report_content)       # Remove single underscores
-        report_content = re.sub(r'`', '', report_content)       # Remove backticks
-        
-        # Clean up any extra whitespace that might result from symbol removal
-        report_content = re.sub(r'\n\s*\n\s*\n', '\n\n', report_content)  # Replace multiple newlines with double newlines
-        report_content = report_content.strip()
+            # Clean any remaining markdown symbols from the AI response
+            import re
+            report_content = re.sub(r'\*\*\*', '', report_content)  # Remove triple asterisks
+            report_content = re.sub(r'\*\*', '', report_content)    # Remove double asterisks
+            report_content = re.sub(r'\*', '', report_content)      # Remove single asterisks
+            report_content = re.sub(r'###', '', report_content)     # Remove triple hashes
+            report_content = re.sub(r'##', '', report_content)      # Remove double hashes
+            report_content = re.sub(r'#', '', report_content)       # Remove single hashes
+            report_content = re.sub(r'__', '', report_content)      # Remove double underscores
+            report_content = re.sub(r'_', '', report_content)       # Remove single underscores
+            report_content = re.sub(r'`', '', report_content)       # Remove backticks
+        
+            # Clean up any extra whitespace that might result from symbol removal
+            report_content = re.sub(r'\n\s*\n\s*\n', '\n\n', report_content)  # Replace multiple newlines with double newlines
+            report_content = report_content.strip()
+        
+            await llm_cache.set(cache_key, {"content": report_content})
         
         # Store the report in a temporary structure (similar to how individual reports work)
         comprehensive_report_data = {
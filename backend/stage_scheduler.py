@@ -0,0 +1,129 @@
+"""
+Stage-parallel scheduler for the transcription pipeline
+Each pipeline stage belongs to a resource class (local CPU/ffmpeg, STT API,
+LLM API) with its own bounded pool of stage slots, so one job's transcode can
+run while another job is transcribing. Call-level semaphores additionally cap
+concurrent upstream requests across all jobs in the process.
+"""
+import os
+import asyncio
+from typing import Dict, List, Set, Optional
+import logging
+
+from models import TranscriptionStage
+from job_notifier import job_notifier
+from fair_scheduler import FairSemaphore
+
+logger = logging.getLogger(__name__)
+
+class ResourceClass:
+    """Resource classes a pipeline stage can be bound by"""
+    CPU = "cpu"  # ffmpeg / local processing
+    STT = "stt"  # speech-to-text API
+    LLM = "llm"  # chat-completion API
+
+STAGE_RESOURCE_CLASSES: Dict[str, List[TranscriptionStage]] = {
+    ResourceClass.CPU: [
+        TranscriptionStage.CREATED,  # validation (ffprobe)
+        TranscriptionStage.TRANSCODING,
+        TranscriptionStage.SEGMENTING,
+        TranscriptionStage.MERGING,
+        TranscriptionStage.GENERATING_OUTPUTS,
+    ],
+    ResourceClass.STT: [
+        TranscriptionStage.DETECTING_LANGUAGE,
+        TranscriptionStage.TRANSCRIBING,
+    ],
+    ResourceClass.LLM: [
+        TranscriptionStage.DIARIZING,
+    ],
+}
+
+class ResourceLimits:
+    """Process-wide bounds per resource class"""
+
+    def __init__(self):
+        # Concurrent jobs per resource class
+        self.stage_slots = {
+            ResourceClass.CPU: int(os.getenv("PIPELINE_CPU_SLOTS", str(os.cpu_count() or 2))),
+            ResourceClass.STT: int(os.getenv("PIPELINE_STT_SLOTS", "4")),
+            ResourceClass.LLM: int(os.getenv("PIPELINE_LLM_SLOTS", "2")),
+        }
+
+        # Concurrent upstream requests, shared by every job in the process;
+        # STT permits are handed out fairly across users segment by segment
+        self.stt = FairSemaphore(int(os.getenv("PIPELINE_STT_CONCURRENCY", "8")))
+        self.llm = asyncio.Semaphore(int(os.getenv("PIPELINE_LLM_CONCURRENCY", "4")))
+
+class StageScheduler:
+    """Claims jobs per resource class and runs their current stage concurrently"""
+
+    def __init__(self, worker, limits: Optional[ResourceLimits] = None):
+        self.worker = worker
+        self.limits = limits or resource_limits
+        self.active: Dict[str, Set[asyncio.Task]] = {rc: set() for rc in STAGE_RESOURCE_CLASSES}
+        self.running = False
+
+    @property
+    def worker_id(self) -> str:
+        return self.worker.worker_id
+
+    def _has_free_slot(self, resource_class: str) -> bool:
+        return len(self.active[resource_class]) < self.limits.stage_slots[resource_class]
+
+    def _launch(self, resource_class: str, job):
+        task = asyncio.create_task(self.worker.process_claimed_job(job, admitted=True))
+        self.active[resource_class].add(task)
+
+        def _done(t: asyncio.Task):
+            self.active[resource_class].discard(t)
+            # Free slot, and the job may now be runnable in its next stage
+            job_notifier.wake_local()
+
+        task.add_done_callback(_done)
+
+    async def run(self):
+        """Dispatch loop: fill free slots of every resource class, then wait"""
+        self.running = True
+        self.worker.running = True
+        logger.info(f"🚀 Stage scheduler started (slots: {self.limits.stage_slots})")
+
+        try:
+            while self.running:
+                try:
+                    wakeup = job_notifier.listen()
+                    claimed = False
+
+                    for resource_class, stages in STAGE_RESOURCE_CLASSES.items():
+                        while self.running and self._has_free_slot(resource_class):
+                            job = await self.worker.claim_next(stages)
+                            if not job:
+                                break
+                            self._launch(resource_class, job)
+                            claimed = True
+
+                    if not claimed:
+                        # Woken by new jobs, finished stages, or the safety-net poll
+                        await job_notifier.wait(wakeup, self.worker.idle_poll_seconds)
+
+                except Exception as e:
+                    logger.error(f"Stage scheduler error: {str(e)}")
+                    await asyncio.sleep(30)
+        finally:
+            pending = [task for tasks in self.active.values() for task in tasks]
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def stop(self):
+        """Stop claiming new work; in-flight stages run to completion"""
+        self.running = False
+        self.worker.stop()
+
+    def get_status(self) -> Dict[str, Dict[str, int]]:
+        return {
+            rc: {"active": len(tasks), "slots": self.limits.stage_slots[rc]}
+            for rc, tasks in self.active.items()
+        }
+
+# Global resource limits
+resource_limits = ResourceLimits()
@@ -1,8 +1,16 @@
 import os
 import uuid
 import shutil
+import hashlib
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Iterable, Tuple
+
+import aiofiles
+
+from storage_io import run_local_io
+
+# Block size for hashing and for the copy fallback
+IO_BLOCK_SIZE = 1024 * 1024
 
 # Simple local storage for development
 STORAGE_DIR = Path("/tmp/autome_storage")
@@ -18,6 +26,103 @@ def store_file(file_data: bytes, filename: str) -> str:
     
     return file_key
 
+def store_local_file(source_path: str, filename: str) -> str:
+    """Move a local file into storage and return a key (a rename on the same filesystem)"""
+    file_key = str(uuid.uuid4()) + "_" + filename
+    shutil.move(source_path, str(STORAGE_DIR / file_key))
+    return file_key
+
+def hash_files(paths: Iterable[Path], digest=None) -> str:
+    """SHA-256 of the concatenation of files, read through one reusable buffer"""
+    digest = digest or hashlib.sha256()
+    buffer = bytearray(IO_BLOCK_SIZE)
+    view = memoryview(buffer)
+    for path in paths:
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                digest.update(view[:n])
+    return digest.hexdigest()
+
+def _append_fd(src_fd: int, dst_fd: int, size: int) -> int:
+    """Append size bytes of src to dst inside the kernel where the OS allows.
+    
+    Tries copy_file_range (which can share extents on reflink filesystems),
+    then sendfile, then a plain read/write loop. Returns bytes copied.
+    """
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while copied < size:
+                n = os.copy_file_range(src_fd, dst_fd, size - copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError:
+            pass  # e.g. unsupported by the filesystem; continue from where it stopped
+    
+    if copied < size and hasattr(os, "sendfile"):
+        try:
+            while copied < size:
+                n = os.sendfile(dst_fd, src_fd, copied, size - copied)
+                if n == 0:
+                    break
+                copied += n
+        except OSError:
+            pass  # e.g. platforms that only sendfile to sockets
+    
+    if copied < size:
+        os.lseek(src_fd, copied, os.SEEK_SET)
+        while copied < size:
+            block = os.read(src_fd, min(IO_BLOCK_SIZE, size - copied))
+            if not block:
+                break
+            os.write(dst_fd, block)
+            copied += len(block)
+    return copied
+
+def concat_files(paths: Iterable[Path], dest: Path) -> int:
+    """Concatenate files into dest without buffering them in Python; returns total bytes"""
+    total = 0
+    with open(dest, "wb", buffering=0) as out:
+        for path in paths:
+            with open(path, "rb", buffering=0) as src:
+                size = os.fstat(src.fileno()).st_size
+                if _append_fd(src.fileno(), out.fileno(), size) != size:
+                    raise IOError(f"Short copy from {path}")
+                total += size
+    return total
+
+async def store_upload_stream(upload, filename: str, block_size: int = IO_BLOCK_SIZE) -> Tuple[str, int, str]:
+    """Stream an upload (anything with an async read(n)) into storage in fixed-size blocks.
+    
+    Memory stays at one block regardless of file size. The data is written to a
+    partial file and renamed into place once complete. Returns (key, size, sha256).
+    """
+    file_key = str(uuid.uuid4()) + "_" + filename
+    file_path = STORAGE_DIR / file_key
+    partial_path = STORAGE_DIR / (file_key + ".part")
+    digest = hashlib.sha256()
+    size = 0
+    
+    try:
+        async with aiofiles.open(partial_path, "wb") as f:
+            while True:
+                block = await upload.read(block_size)
+                if not block:
+                    break
+                digest.update(block)
+                size += len(block)
+                await f.write(block)
+        os.replace(partial_path, file_path)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    
+    return file_key, size, digest.hexdigest()
+
 def get_file_path(file_key: str) -> Path:
     """Get local file path for stored file"""
     file_path = STORAGE_DIR / file_key
@@ -44,7 +149,7 @@ def store_file_content(content: bytes, filename: str) -> str:
 
 async def store_file_content_async(content: bytes, filename: str) -> str:
     """Async version of store_file_content"""
-    return store_file_content(content, filename)
+    return await run_local_io(store_file_content, content, filename)
 
 def create_presigned_get_url(file_key: str) -> str:
     """Create a presigned URL for file access (returns local path for processing)"""
@@ -0,0 +1,54 @@
+"""
+Dedicated thread pools for blocking storage I/O
+Disk reads/writes and boto3 calls are synchronous; running them inside an
+async def stalls every request and pipeline stage sharing the event loop.
+Local file operations and remote (S3) calls get separate bounded pools so a
+slow bucket cannot starve segment writes, and neither competes with the
+default executor used by asyncio.to_thread for CPU work such as hashing.
+"""
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+LOCAL_IO_THREADS = int(os.getenv("STORAGE_LOCAL_IO_THREADS", "8"))
+REMOTE_IO_THREADS = int(os.getenv("STORAGE_REMOTE_IO_THREADS", "16"))
+
+class IOPool:
+    """Bounded executor with an in-flight count"""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-io")
+        self.in_flight = 0
+        self.completed = 0
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking call in this pool and await its result"""
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"max_workers": self.max_workers, "in_flight": self.in_flight, "completed": self.completed}
+
+# Global pools
+local_io = IOPool("storage-local", LOCAL_IO_THREADS)
+remote_io = IOPool("storage-remote", REMOTE_IO_THREADS)
+
+async def run_local_io(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run blocking local filesystem work off the event loop"""
+    return await local_io.run(func, *args, **kwargs)
+
+async def run_remote_io(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking remote storage call (boto3) off the event loop"""
+    return await remote_io.run(func, *args, **kwargs)
+
+def get_io_status() -> Dict[str, Any]:
+    return {"local": local_io.get_status(), "remote": remote_io.get_status()}
@@ -0,0 +1,153 @@
+"""
+Persistent cache of speech-to-text results
+Results are keyed by a fingerprint of the audio (SHA-256) plus the model,
+language, temperature and response format of the request, so retries,
+reprocessing and the WAV re-encode fallback never pay for audio that was
+already transcribed. Small results are kept hot in cache_manager; every
+result is also written to MongoDB, which survives restarts and holds the
+large ones.
+"""
+import os
+import json
+import asyncio
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+import logging
+
+from store import database
+from cache_manager import cache_manager
+from monitoring import monitoring_service
+
+logger = logging.getLogger(__name__)
+
+def fingerprint_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of an audio file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class STTResultCache:
+    """Two-tier STT result cache: cache_manager for small entries, MongoDB for all"""
+
+    collection = database["stt_cache"]
+
+    def __init__(self):
+        self.enabled = os.getenv("STT_CACHE_ENABLED", "true").lower() == "true"
+        # Larger results skip the hot tier (memory/Redis) and are read from MongoDB
+        self.hot_max_bytes = int(os.getenv("STT_CACHE_HOT_MAX_BYTES", str(64 * 1024)))
+        self.hot_ttl = int(os.getenv("STT_CACHE_HOT_TTL_SECONDS", str(cache_manager.default_ttl * 24)))
+        self.ttl_days = int(os.getenv("STT_CACHE_TTL_DAYS", "30"))
+        self.stats = {"hits_hot": 0, "hits_store": 0, "misses": 0, "writes": 0, "errors": 0}
+
+    @staticmethod
+    def key(audio_sha256: str, model: str, language: Optional[str], temperature: Optional[str] = None,
+            response_format: str = "json") -> str:
+        return cache_manager._generate_key(
+            "stt", audio_sha256.lower(),
+            model=model, language=language or "auto", temperature=temperature, format=response_format
+        )
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("key", unique=True)
+        if self.ttl_days > 0:
+            await self.collection.create_index("last_used_at", expireAfterSeconds=self.ttl_days * 86400)
+
+    def _record(self, result: str, tier: Optional[str] = None):
+        tags = {"result": result}
+        if tier:
+            tags["tier"] = tier
+        collector = monitoring_service.metrics_collector
+        collector.increment_counter("stt_cache_lookups", tags=tags)
+        collector.set_gauge("stt_cache_hit_rate", self.hit_rate)
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.stats["hits_hot"] + self.stats["hits_store"]
+        lookups = hits + self.stats["misses"]
+        return hits / lookups if lookups else 0.0
+
+    async def get(self, audio_sha256: Optional[str], model: str, language: Optional[str],
+                  temperature: Optional[str] = None, response_format: str = "json") -> Optional[Dict[str, Any]]:
+        """Cached result for this audio and request, or None"""
+        if not self.enabled or not audio_sha256:
+            return None
+
+        key = self.key(audio_sha256, model, language, temperature, response_format)
+        try:
+            if cache_manager.enabled:
+                result = await cache_manager.backend.get(key)
+                if result is not None:
+                    self.stats["hits_hot"] += 1
+                    self._record("hit", "hot")
+                    return result
+
+            doc = await self.collection.find_one_and_update(
+                {"key": key},
+                {"$set": {"last_used_at": datetime.now(timezone.utc)}, "$inc": {"hits": 1}},
+                projection={"_id": 0, "result": 1, "size": 1}
+            )
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"STT cache lookup failed: {e}")
+            return None
+
+        if not doc:
+            self.stats["misses"] += 1
+            self._record("miss")
+            return None
+
+        self.stats["hits_store"] += 1
+        self._record("hit", "store")
+        if cache_manager.enabled and doc.get("size", 0) <= self.hot_max_bytes:
+            await cache_manager.backend.set(key, doc["result"], self.hot_ttl)
+        return doc["result"]
+
+    async def set(self, audio_sha256: Optional[str], model: str, language: Optional[str],
+                  result: Dict[str, Any], temperature: Optional[str] = None, response_format: str = "json"):
+        """Store a successful result (best effort)"""
+        if not self.enabled or not audio_sha256:
+            return
+
+        key = self.key(audio_sha256, model, language, temperature, response_format)
+        size = len(json.dumps(result, default=str))
+        now = datetime.now(timezone.utc)
+        try:
+            if cache_manager.enabled and size <= self.hot_max_bytes:
+                await cache_manager.backend.set(key, result, self.hot_ttl)
+
+            await self.collection.update_one(
+                {"key": key},
+                {
+                    "$set": {
+                        "audio_sha256": audio_sha256.lower(),
+                        "model": model,
+                        "language": language,
+                        "temperature": temperature,
+                        "response_format": response_format,
+                        "result": result,
+                        "size": size,
+                        "last_used_at": now,
+                    },
+                    "$setOnInsert": {"created_at": now, "hits": 0},
+                },
+                upsert=True
+            )
+            self.stats["writes"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"STT cache write failed: {e}")
+
+    async def fingerprint(self, path: str) -> Optional[str]:
+        """Fingerprint a file off the event loop; None when caching is off"""
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(fingerprint_file, path)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, **self.stats, "hit_rate": round(self.hit_rate, 4)}
+
+# Global STT result cache
+stt_cache = STTResultCache()
@@ -5,7 +5,9 @@ from pathlib import Path
 from store import NotesStore, db
 from storage import create_presigned_get_url
 from enhanced_providers import transcribe_audio as stt_transcribe
-from providers import ocr_read
+from providers import ocr_read, get_audio_duration
+from priority_lanes import JobLane, lane_for_duration, note_lanes, record_lane_wait
+from http_clients import http_clients, Upstream, is_transient_upstream_error
 
 import httpx
 import logging
@@ -35,7 +37,7 @@ async def send_email(to_list, subject, html):
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
+        async with http_clients.session(Upstream.SENDGRID, timeout=30) as client:
             r = await client.post(
                 "https://api.sendgrid.com/v3/mail/send",
                 headers={"Authorization": f"Bearer {key}"},
@@ -80,7 +82,16 @@ def _write_note_files(base: pathlib.Path, note_id: str, title: str, artifacts: d
     
     (d / "note.md").write_text("\n".join(md))
 
-async def enqueue_transcription(note_id: str):
+def _waiting_since(queued_at: datetime.datetime = None) -> float:
+    """Epoch time a note started waiting: when its task became due in the
+    note task queue, else now (the note was not queued)"""
+    if queued_at is None:
+        return time.time()
+    if queued_at.tzinfo is None:
+        queued_at = queued_at.replace(tzinfo=datetime.timezone.utc)
+    return queued_at.timestamp()
+
+async def enqueue_transcription(note_id: str, queued_at: datetime.datetime = None):
     note = await NotesStore.get(note_id)
     if not note:
         logger.error(f"Note not found: {note_id}")
@@ -114,7 +125,15 @@ async def enqueue_transcription(note_id: str):
                 
             logger.info(f"Using timeout of {timeout_seconds} seconds ({timeout_seconds//60} minutes) for transcription")
             
-            result = await asyncio.wait_for(stt_transcribe(signed), timeout=timeout_seconds)
+            # Short memos run in the interactive lane, long recordings cannot crowd them out
+            duration = await get_audio_duration(signed) if os.path.exists(signed) else 0.0
+            lane = lane_for_duration(duration)
+            waiting_since = _waiting_since(queued_at)
+            
+            async with note_lanes.slot(lane):
+                record_lane_wait(lane, time.time() - waiting_since, source="notes")
+                start = time.time()
+                result = await asyncio.wait_for(stt_transcribe(signed), timeout=timeout_seconds)
         except asyncio.TimeoutError:
             logger.error(f"Transcription timeout for note {note_id} after {timeout_seconds} seconds")
             await NotesStore.update_status(note_id, "failed")
@@ -137,11 +156,15 @@ async def enqueue_transcription(note_id: str):
         logger.info(f"Transcription completed for note {note_id}")
         
     except Exception as e:
+        if is_transient_upstream_error(e):
+            # Rate limits and network errors: let the note task queue retry with backoff
+            logger.warning(f"Transcription for note {note_id} hit a transient upstream error, will retry: {str(e)}")
+            raise
         logger.error(f"Transcription failed for note {note_id}: {str(e)}")
         await NotesStore.update_status(note_id, "failed")
         await NotesStore.set_artifacts(note_id, {"error": "Transcription failed"})
 
-async def enqueue_ocr(note_id: str):
+async def enqueue_ocr(note_id: str, queued_at: datetime.datetime = None):
     note = await NotesStore.get(note_id)
     if not note:
         logger.error(f"Note not found: {note_id}")
@@ -175,7 +198,12 @@ async def enqueue_ocr(note_id: str):
         
         # Add timeout for OCR to prevent hanging
         try:
-            result = await asyncio.wait_for(ocr_read(signed), timeout=180)  # 3 minute timeout
+            # OCR is always short, interactive work
+            waiting_since = _waiting_since(queued_at)
+            async with note_lanes.slot(JobLane.INTERACTIVE):
+                record_lane_wait(JobLane.INTERACTIVE, time.time() - waiting_since, source="notes")
+                start = time.time()
+                result = await asyncio.wait_for(ocr_read(signed), timeout=180)  # 3 minute timeout
             
             # If we get here, OCR was successful
             latency_ms = int((time.time() - start) * 1000)
@@ -196,12 +224,16 @@ async def enqueue_ocr(note_id: str):
             await NotesStore.set_artifacts(note_id, {"error": "OCR processing timed out after 3 minutes. Please try with a smaller or clearer image."})
             return
         except ValueError as ve:
+            if is_transient_upstream_error(ve):
+                raise
             # These are our custom validation errors
             logger.error(f"OCR validation error for note {note_id}: {str(ve)}")
             await NotesStore.update_status(note_id, "failed")
             await NotesStore.set_artifacts(note_id, {"error": str(ve)})
             return
         except Exception as e:
+            if is_transient_upstream_error(e):
+                raise
             # Unexpected errors
             logger.error(f"OCR processing error for note {note_id}: {str(e)}")
             await NotesStore.update_status(note_id, "failed")
@@ -211,6 +243,10 @@ async def enqueue_ocr(note_id: str):
         logger.info(f"OCR completed for note {note_id}")
         
     except Exception as e:
+        if is_transient_upstream_error(e):
+            # Rate limits and network errors: let the note task queue retry with backoff
+            logger.warning(f"OCR for note {note_id} hit a transient upstream error, will retry: {str(e)}")
+            raise
         logger.error(f"OCR failed for note {note_id}: {str(e)}")
         await NotesStore.update_status(note_id, "failed")
         await NotesStore.set_artifacts(note_id, {"error": "OCR processing failed"})
@@ -5,7 +5,7 @@ Provides job status tracking, downloads, and management
 from typing import Optional
 from datetime import datetime, timezone
 from fastapi import APIRouter, HTTPException, Depends, Query
-from fastapi.responses import RedirectResponse
+from fastapi.responses import StreamingResponse
 
 from models import (
     JobStatusResponse, RetryJobRequest, TranscriptionStage, TranscriptionStatus
@@ -13,6 +13,7 @@ from models import (
 from enhanced_store import TranscriptionJobStore, TranscriptionAssetStore
 from auth import get_current_user_optional, get_current_user
 from storage import create_presigned_get_url
+from cloud_storage import storage_manager
 import logging
 
 logger = logging.getLogger(__name__)
@@ -91,7 +92,7 @@ async def download_transcription(
 ):
     """
     Download transcription output in specified format
-    Returns signed URL for secure download
+    Streams the stored asset with constant memory
     """
     try:
         job = await TranscriptionJobStore.get_job(job_id)
@@ -116,11 +117,20 @@ async def download_transcription(
                 detail=f"Output format '{format}' not available for this job"
             )
         
-        # Create presigned download URL
-        download_url = await create_presigned_get_url(asset.storage_key)
-        
-        # Return redirect to signed URL
-        return RedirectResponse(url=download_url, status_code=302)
+        try:
+            reader = await storage_manager.open_read(asset.storage_key)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Output file for format '{format}' is missing")
+        
+        filename = f"transcript_{job_id}.{format}"
+        return StreamingResponse(
+            reader.iter_chunks(),
+            media_type=asset.mime_type,
+            headers={
+                "Content-Disposition": f"attachment; filename=\"{filename}\"",
+                "Content-Length": str(reader.size)
+            }
+        )
         
     except HTTPException:
         raise
@@ -197,6 +207,9 @@ async def retry_job(
             }
         )
         
+        from job_notifier import job_notifier
+        await job_notifier.notify(job_id)
+        
         logger.info(f"🔄 Job {job_id} queued for retry from stage {retry_stage.value}")
         
         return {
@@ -316,11 +329,13 @@ async def delete_job(
         
         # Delete associated files from storage
         try:
-            from cloud_storage import storage_manager
             
             # Delete transcription assets
             assets = await TranscriptionAssetStore.list_assets_by_job(job_id)
             for asset in assets:
+                # Files shared with a deduplicated upload stay until their last reference goes
+                if await TranscriptionAssetStore.is_storage_key_shared(asset.storage_key, job_id):
+                    continue
                 try:
                     await storage_manager.delete_file(asset.storage_key)
                     logger.info(f"🗑️ Deleted asset file: {asset.storage_key}")
@@ -335,7 +350,8 @@ async def delete_job(
                 from enhanced_store import UploadSessionStore
                 try:
                     session = await UploadSessionStore.get_session(job.upload_id)
-                    if session and session.storage_key:
+                    if session and session.storage_key and \
+                            not await UploadSessionStore.is_storage_key_shared(session.storage_key, session.id):
                         await storage_manager.delete_file(session.storage_key)
                         logger.info(f"🗑️ Deleted upload file: {session.storage_key}")
                     await UploadSessionStore.delete_session(job.upload_id)
@@ -2,7 +2,8 @@
 Resumable upload API endpoints for large-file transcription pipeline
 """
 import os
-import hashlib
+import shutil
+import asyncio
 from pathlib import Path
 from typing import Optional, Dict, Any
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, status, BackgroundTasks
@@ -14,8 +15,9 @@ from models import (
     TranscriptionJob, PipelineConfig
 )
 from enhanced_store import UploadSessionStore, TranscriptionJobStore, EnhancedNotesStore
+from content_index import link_duplicate_upload
 from auth import get_current_user_optional
-from storage import store_file
+from storage import store_local_file, hash_files, concat_files
 import logging
 
 logger = logging.getLogger(__name__)
@@ -213,6 +215,14 @@ async def get_upload_status(
         logger.error(f"Failed to get upload status for {upload_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get upload status")
 
+def _remove_chunks(upload_id: str):
+    """Delete a finalized session's chunk directory"""
+    try:
+        shutil.rmtree(CHUNK_STORAGE / upload_id)
+        logger.info(f"Cleaned up chunks for session {upload_id}")
+    except Exception as e:
+        logger.warning(f"Failed to clean up chunks for {upload_id}: {e}")
+
 @router.post("/sessions/{upload_id}/complete", response_model=FinalizeUploadResponse)
 async def finalize_upload(
     upload_id: str,
@@ -222,7 +232,8 @@ async def finalize_upload(
 ):
     """
     Finalize upload by combining chunks and creating transcription job
-    Validates all chunks are present and creates the final file
+    Validates all chunks are present and creates the final file.
+    An upload identical to one of the user's completed uploads reuses its results.
     """
     try:
         # Get upload session
@@ -249,39 +260,27 @@ async def finalize_upload(
                 detail=f"Missing chunks: {sorted(list(missing_chunks))}"
             )
         
-        # Combine chunks into final file
         chunk_dir = CHUNK_STORAGE / upload_id
         final_path = chunk_dir / session.filename
-        
-        logger.info(f"Combining {total_chunks} chunks for session {upload_id}")
-        
-        sha256_hash = hashlib.sha256()
-        total_bytes_written = 0
-        
-        with open(final_path, "wb") as final_file:
-            for chunk_index in range(total_chunks):
-                chunk_path = chunk_dir / f"chunk_{chunk_index:04d}"
-                if not chunk_path.exists():
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Chunk file missing: {chunk_index}"
-                    )
-                
-                with open(chunk_path, "rb") as chunk_file:
-                    chunk_data = chunk_file.read()
-                    final_file.write(chunk_data)
-                    sha256_hash.update(chunk_data)
-                    total_bytes_written += len(chunk_data)
-        
-        # Verify final file size
-        if total_bytes_written != session.total_size:
+        chunk_paths = [chunk_dir / f"chunk_{chunk_index:04d}" for chunk_index in range(total_chunks)]
+        
+        for chunk_index, chunk_path in enumerate(chunk_paths):
+            if not chunk_path.exists():
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Chunk file missing: {chunk_index}"
+                )
+        
+        # Verify final file size from chunk metadata before touching the data
+        total_bytes = sum(chunk_path.stat().st_size for chunk_path in chunk_paths)
+        if total_bytes != session.total_size:
             raise HTTPException(
                 status_code=500,
-                detail=f"File size mismatch. Expected: {session.total_size}, got: {total_bytes_written}"
+                detail=f"File size mismatch. Expected: {session.total_size}, got: {total_bytes}"
             )
         
-        # Calculate file hash
-        calculated_sha256 = sha256_hash.hexdigest()
+        # Hash the chunks in place through a fixed buffer (constant memory)
+        calculated_sha256 = await asyncio.to_thread(hash_files, chunk_paths)
         
         # Verify hash if provided
         if request.sha256 and request.sha256.lower() != calculated_sha256.lower():
@@ -290,10 +289,21 @@ async def finalize_upload(
                 detail="File integrity check failed - SHA256 mismatch"
             )
         
-        # Store final file using existing storage system
-        with open(final_path, "rb") as f:
-            file_content = f.read()
-            storage_key = store_file(file_content, session.filename)
+        # Same content as a completed upload: link its results instead of reprocessing
+        duplicate = await link_duplicate_upload(session, calculated_sha256)
+        if duplicate:
+            await UploadSessionStore.complete_session(upload_id, duplicate.storage_paths["original"], calculated_sha256)
+            _remove_chunks(upload_id)
+            return FinalizeUploadResponse(
+                job_id=duplicate.id,
+                upload_id=upload_id,
+                status="complete"
+            )
+        
+        # Combine chunks with in-kernel copies, then move the result into storage
+        logger.info(f"Combining {total_chunks} chunks for session {upload_id}")
+        await asyncio.to_thread(concat_files, chunk_paths, final_path)
+        storage_key = await asyncio.to_thread(store_local_file, str(final_path), session.filename)
         
         # Mark session as completed
         await UploadSessionStore.complete_session(upload_id, storage_key, calculated_sha256)
@@ -319,16 +329,11 @@ async def finalize_upload(
         await TranscriptionJobStore.update_job(job)
         
         # Clean up chunk files
-        try:
-            import shutil
-            shutil.rmtree(chunk_dir)
-            logger.info(f"Cleaned up chunks for session {upload_id}")
-        except Exception as e:
-            logger.warning(f"Failed to clean up chunks for {upload_id}: {e}")
+        _remove_chunks(upload_id)
         
-        # Enqueue job for pipeline processing
-        from tasks import enqueue_pipeline_job
-        background_tasks.add_task(enqueue_pipeline_job, job.id)
+        # Wake idle pipeline workers; they claim the job from the queue
+        from job_notifier import job_notifier
+        await job_notifier.notify(job.id)
         logger.info(f"Enqueued transcription job {job.id} for pipeline processing")
         
         return FinalizeUploadResponse(
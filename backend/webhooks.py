@@ -14,7 +14,7 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
 from urllib.parse import urlparse
-import httpx
+from http_clients import http_clients, Upstream
 
 logger = logging.getLogger(__name__)
 
@@ -268,7 +268,7 @@ class WebhookManager:
                 headers["X-Webhook-Signature"] = signature
             
             # Send request
-            async with httpx.AsyncClient(timeout=delivery.endpoint.timeout_seconds) as client:
+            async with http_clients.session(Upstream.WEBHOOKS, timeout=delivery.endpoint.timeout_seconds) as client:
                 response = await client.post(
                     delivery.endpoint.url,
                     content=payload_json,
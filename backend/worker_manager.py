@@ -2,71 +2,107 @@
 Worker manager for transcription pipeline
 Handles starting/stopping workers and job queue management
 """
+import os
 import asyncio
 import logging
 import signal
-from typing import Optional
+from typing import Optional, List
 from contextlib import asynccontextmanager
 
 from pipeline_worker import PipelineWorker
+from job_notifier import job_notifier
+from http_clients import http_clients
+from note_task_queue import note_task_consumer, note_task_notifier, embedded_consumer_enabled
+from stage_scheduler import StageScheduler
+from priority_lanes import pipeline_lanes
+from rate_limiting import upstream_governor
+from stt_cache import stt_cache
+from storage_io import get_io_status
+from monitoring import monitoring_service
 from enhanced_store import TranscriptionJobStore
 from models import TranscriptionStatus
 
 logger = logging.getLogger(__name__)
 
 class WorkerManager:
-    """Manages pipeline workers and job processing"""
+    """Manages a pool of pipeline workers and job processing"""
     
-    def __init__(self):
-        self.worker: Optional[PipelineWorker] = None
-        self.worker_task: Optional[asyncio.Task] = None
+    def __init__(self, worker_count: Optional[int] = None):
+        # Jobs are claimed under a lease, so any number of workers (in this
+        # process or on other machines) can drain the queue safely
+        self.worker_count = max(1, worker_count or int(os.getenv("PIPELINE_WORKER_COUNT", "1")))
+        
+        # "stage": one stage-parallel scheduler per process bounded by resource
+        # class; "pool": worker_count independent one-stage-at-a-time workers
+        self.mode = os.getenv("PIPELINE_SCHEDULER", "stage").lower()
+        self.scheduler: Optional[StageScheduler] = None
+        
+        self.workers: List[PipelineWorker] = []
+        self.worker_tasks: List[asyncio.Task] = []
         self.running = False
+    
+    @property
+    def worker(self) -> Optional[PipelineWorker]:
+        """First worker in the pool (manual processing entry point)"""
+        return self.workers[0] if self.workers else None
         
     async def start_worker(self):
-        """Start the pipeline worker"""
+        """Start the pipeline worker pool"""
         if self.running:
             logger.warning("Worker already running")
             return
             
         try:
-            self.worker = PipelineWorker()
+            if self.mode == "stage":
+                worker = PipelineWorker()
+                self.workers.append(worker)
+                self.scheduler = StageScheduler(worker)
+                self.worker_tasks.append(asyncio.create_task(self.scheduler.run()))
+                
+                logger.info("🚀 Worker manager started stage-parallel pipeline scheduler")
+            else:
+                for _ in range(self.worker_count):
+                    worker = PipelineWorker()
+                    self.workers.append(worker)
+                    
+                    # Start worker in background task
+                    self.worker_tasks.append(asyncio.create_task(worker.start()))
+                
+                logger.info(f"🚀 Worker manager started {self.worker_count} pipeline worker(s)")
             
-            # Start worker in background task
-            self.worker_task = asyncio.create_task(self.worker.start())
             self.running = True
             
-            logger.info("🚀 Worker manager started pipeline worker")
-            
         except Exception as e:
             logger.error(f"Failed to start worker: {str(e)}")
             raise
     
     async def stop_worker(self):
-        """Stop the pipeline worker gracefully"""
+        """Stop the pipeline workers gracefully"""
         if not self.running:
             return
             
         try:
-            if self.worker:
-                self.worker.stop()
+            if self.scheduler:
+                self.scheduler.stop()
+            for worker in self.workers:
+                worker.stop()
             
-            if self.worker_task and not self.worker_task.done():
-                # Give worker time to finish current job
-                try:
-                    await asyncio.wait_for(self.worker_task, timeout=30)
-                except asyncio.TimeoutError:
+            pending = [task for task in self.worker_tasks if not task.done()]
+            if pending:
+                # Give workers time to finish current job
+                done, still_running = await asyncio.wait(pending, timeout=30)
+                if still_running:
                     logger.warning("Worker didn't stop gracefully, cancelling...")
-                    self.worker_task.cancel()
-                    try:
-                        await self.worker_task
-                    except asyncio.CancelledError:
-                        pass
+                    for task in still_running:
+                        task.cancel()
+                    await asyncio.gather(*still_running, return_exceptions=True)
             
             self.running = False
-            self.worker = None
-            self.worker_task = None
+            self.scheduler = None
+            self.workers = []
+            self.worker_tasks = []
             
-            logger.info("🛑 Worker manager stopped pipeline worker")
+            logger.info("🛑 Worker manager stopped pipeline workers")
             
         except Exception as e:
             logger.error(f"Error stopping worker: {str(e)}")
@@ -75,8 +111,18 @@ class WorkerManager:
         """Get current worker status"""
         return {
             "running": self.running,
-            "worker_active": self.worker is not None,
-            "task_running": self.worker_task is not None and not self.worker_task.done()
+            "worker_active": bool(self.workers),
+            "task_running": any(not task.done() for task in self.worker_tasks),
+            "worker_count": len(self.workers),
+            "active_tasks": sum(1 for task in self.worker_tasks if not task.done()),
+            "worker_ids": [worker.worker_id for worker in self.workers],
+            "mode": self.mode,
+            "stages": self.scheduler.get_status() if self.scheduler else None,
+            "lanes": pipeline_lanes.get_status(),
+            "upstreams": upstream_governor.get_status(),
+            "stt_cache": stt_cache.get_status(),
+            "storage_io": get_io_status(),
+            "event_loop_lag": monitoring_service.loop_lag_monitor.get_status()
         }
     
     async def process_job_manually(self, job_id: str):
@@ -84,11 +130,11 @@ class WorkerManager:
         if not self.worker:
             raise Exception("Worker not running")
         
-        job = await TranscriptionJobStore.get_job(job_id)
+        job = await TranscriptionJobStore.claim_job(job_id, self.worker.worker_id, self.worker.lease_seconds)
         if not job:
-            raise Exception(f"Job {job_id} not found")
+            raise Exception(f"Job {job_id} not found or leased by another worker")
         
-        await self.worker.process_job(job)
+        await self.worker.process_claimed_job(job)
     
     async def get_queue_status(self):
         """Get job queue status"""
@@ -123,8 +169,17 @@ async def worker_lifespan(app):
     """FastAPI lifespan context manager for worker"""
     # Startup
     logger.info("Starting transcription pipeline worker...")
+    await http_clients.start()
+    await job_notifier.start()
     await worker_manager.start_worker()
     
+    # Note processing runs in note_worker.py unless embedded for local development
+    await note_task_notifier.start()
+    note_consumer_task = None
+    if embedded_consumer_enabled():
+        note_consumer_task = asyncio.create_task(note_task_consumer.run())
+        logger.info("Note task consumer running embedded in the API process")
+    
     # Initialize live transcription manager
     try:
         from live_transcription import live_transcription_manager
@@ -147,6 +202,16 @@ async def worker_lifespan(app):
     # Shutdown
     logger.info("Shutting down transcription pipeline worker...")
     await worker_manager.stop_worker()
+    await job_notifier.stop()
+    
+    if note_consumer_task:
+        note_task_consumer.stop()
+        # Unfinished tasks keep their lease and are re-claimed after restart
+        done, pending = await asyncio.wait([note_consumer_task], timeout=30)
+        for task in pending:
+            task.cancel()
+    await note_task_notifier.stop()
+    await http_clients.aclose()
 
 # Convenience functions for external use
 async def start_pipeline_worker():
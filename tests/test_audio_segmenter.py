@@ -0,0 +1,174 @@
+"""
+Test suite for the single-pass PCM WAV segmenter
+Tests segment geometry, window reads and byte-exact slicing of the normalized audio
+"""
+import pytest
+import wave
+import struct
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from audio_segmenter import (
+    read_wav_layout, plan_segments, write_wav_segments, PCMSegmentChunker, WavWindowReader, language_sample_windows
+)
+
+SAMPLE_RATE = 16000
+
+
+def make_wav(path, seconds):
+    """Write a 16kHz mono 16-bit WAV whose sample values encode their position"""
+    frames = int(seconds * SAMPLE_RATE)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(struct.pack(f"<{frames}h", *((i % 32000) for i in range(frames))))
+    return frames
+
+
+class TestSegmentPlan:
+    """Test overlapping segment geometry"""
+
+    def test_plan_geometry(self):
+        """Windows overlap backwards and are clamped to the audio"""
+        plan = plan_segments(130.0, 60, 1.0)
+
+        assert len(plan) == 3
+        assert plan[0]["start_time"] == 0 and plan[0]["end_time"] == 60
+        assert plan[1]["start_time"] == 59.0 and plan[1]["end_time"] == 120
+        assert plan[2]["start_time"] == 119.0 and plan[2]["end_time"] == 130.0
+        assert [p["original_start"] for p in plan] == [0.0, 60.0, 120.0]
+
+    def test_short_tail_skipped(self):
+        """A trailing window shorter than one second is dropped"""
+        plan = plan_segments(60.5, 60, 0.0)
+        assert len(plan) == 1
+
+
+class TestWavSegments:
+    """Test byte-offset slicing"""
+
+    def test_layout(self, tmp_path):
+        """Header parsing finds the data chunk and format"""
+        source = tmp_path / "normalized.wav"
+        frames = make_wav(source, 3)
+
+        layout = read_wav_layout(str(source))
+        assert layout.sample_rate == SAMPLE_RATE
+        assert layout.channels == 1
+        assert layout.bits_per_sample == 16
+        assert layout.data_size == frames * 2
+        assert layout.duration == pytest.approx(3.0)
+
+    def test_segments_match_source_samples(self, tmp_path):
+        """Each segment is a valid WAV containing exactly its window's samples"""
+        source = tmp_path / "normalized.wav"
+        make_wav(source, 5)
+
+        with wave.open(str(source), "rb") as w:
+            all_frames = w.readframes(w.getnframes())
+
+        plan = plan_segments(5.0, 2, 0.5)
+        written = write_wav_segments(str(source), plan, str(tmp_path), "seg")
+
+        assert [s["index"] for s in written] == [0, 1, 2]
+
+        for segment in written:
+            with wave.open(segment["path"], "rb") as w:
+                assert w.getframerate() == SAMPLE_RATE
+                data = w.readframes(w.getnframes())
+
+            start = int(segment["start_time"] * SAMPLE_RATE) * 2
+            end = int(segment["end_time"] * SAMPLE_RATE) * 2
+            assert data == all_frames[start:end]
+            assert segment["size"] == os.path.getsize(segment["path"])
+
+    def test_rejects_non_wav(self, tmp_path):
+        """Non-RIFF input is refused"""
+        source = tmp_path / "bad.wav"
+        source.write_bytes(b"not a wav file at all")
+
+        with pytest.raises(ValueError):
+            read_wav_layout(str(source))
+
+
+class TestWavWindowReader:
+    """Test time-window reads from the normalized audio"""
+
+    def test_window_matches_source_samples(self, tmp_path):
+        source = tmp_path / "normalized.wav"
+        make_wav(source, 10)
+
+        with WavWindowReader(str(source)) as reader:
+            assert reader.duration == 10.0
+            out = reader.write_wav(2.5, 4.0, str(tmp_path / "window.wav"))
+
+        with wave.open(out["path"], "rb") as w:
+            frames = w.readframes(w.getnframes())
+        samples = struct.unpack(f"<{len(frames) // 2}h", frames)
+        assert len(samples) == int(1.5 * SAMPLE_RATE)
+        assert samples[0] == int(2.5 * SAMPLE_RATE) % 32000
+        assert out["size"] == os.path.getsize(out["path"])
+
+    def test_in_memory_window_is_standalone_wav(self, tmp_path):
+        source = tmp_path / "normalized.wav"
+        make_wav(source, 3)
+        with WavWindowReader(str(source)) as reader:
+            data = reader.wav_bytes(1.0, 9.0)  # clamped to the audio
+        (tmp_path / "w.wav").write_bytes(data)
+        assert read_wav_layout(str(tmp_path / "w.wav")).duration == 2.0
+
+    def test_language_sample_windows(self):
+        assert language_sample_windows(600, 3, 20) == [(0.0, 20), (290.0, 310.0), (580.0, 600.0)]
+        assert language_sample_windows(15, 3, 20) == [(0.0, 15)]
+        assert language_sample_windows(50, 3, 20) == [(0.0, 20), (30.0, 50.0)]  # overlapping middle dropped
+        assert language_sample_windows(0, 3, 20) == []
+
+
+class TestPCMSegmentChunker:
+    """Test streaming segmentation of raw PCM"""
+
+    def test_matches_file_segmenter(self, tmp_path):
+        """Streaming chunks produce the same segments as slicing the whole file"""
+        source = tmp_path / "normalized.wav"
+        make_wav(source, 5.3)
+        layout = read_wav_layout(str(source))
+
+        with open(source, "rb") as f:
+            f.seek(layout.data_offset)
+            pcm = f.read(layout.data_size)
+
+        file_dir = tmp_path / "file"
+        stream_dir = tmp_path / "stream"
+        file_dir.mkdir()
+        stream_dir.mkdir()
+
+        expected = write_wav_segments(str(source), plan_segments(layout.duration, 2, 0.5), str(file_dir))
+
+        chunker = PCMSegmentChunker(str(stream_dir), 2, 0.5)
+        streamed = []
+        for offset in range(0, len(pcm), 7777):  # odd-sized reads split sample frames
+            streamed.extend(chunker.feed(pcm[offset:offset + 7777]))
+        streamed.extend(chunker.finish())
+
+        assert chunker.decoded_duration == pytest.approx(layout.duration)
+        assert len(streamed) == len(expected) == 3
+        for got, want in zip(streamed, expected):
+            assert got["original_start"] == want["original_start"]
+            assert got["start_time"] == want["start_time"]
+            assert got["end_time"] == pytest.approx(want["end_time"])
+            assert got["sha256"] == want["sha256"]
+
+    def test_buffer_stays_bounded(self, tmp_path):
+        """Only the current window plus overlap is held in memory"""
+        chunker = PCMSegmentChunker(str(tmp_path), 1, 0.25)
+        window_bytes = 16000 * 2
+
+        for _ in range(10):
+            chunker.feed(b"\x00" * window_bytes)
+            assert len(chunker._buffer) <= window_bytes * 1.25
+
+        assert len(chunker.finish()) == 0
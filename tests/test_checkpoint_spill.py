@@ -0,0 +1,158 @@
+"""
+Test suite for spilled stage checkpoints
+Tests gzip blobs, inline writes on top of a spill and blob cleanup
+"""
+import pytest
+import copy
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import enhanced_store
+from enhanced_store import (
+    TranscriptionJobStore, SPILLED_BLOB, checkpoint_json,
+    encode_checkpoint_blob, decode_checkpoint_blob, merge_spilled_checkpoint
+)
+from models import TranscriptionStage
+
+
+class FakeCollection:
+    """Just enough of a motor collection for $set on dotted paths"""
+
+    def __init__(self, docs):
+        self.docs = {doc["id"]: doc for doc in docs}
+
+    def _apply(self, doc, update):
+        for path, value in update.get("$set", {}).items():
+            target = doc
+            *parents, leaf = path.split(".")
+            for part in parents:
+                target = target.setdefault(part, {})
+            target[leaf] = copy.deepcopy(value)
+
+    async def find_one(self, query, projection=None):
+        doc = self.docs.get(query["id"])
+        return copy.deepcopy(doc) if doc else None
+
+    async def update_one(self, query, update):
+        self._apply(self.docs[query["id"]], update)
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        before = copy.deepcopy(self.docs[query["id"]])
+        self._apply(self.docs[query["id"]], update)
+        return before
+
+
+class FakeStorage:
+    """In-memory storage_manager"""
+
+    def __init__(self):
+        self.files = {}
+
+    async def store_file(self, data, filename, job_id=None, metadata=None):
+        key = f"{job_id}/{len(self.files)}_{filename}"
+        self.files[key] = data
+        return key
+
+    async def get_file(self, key):
+        return self.files[key]
+
+    async def delete_file(self, key):
+        self.files.pop(key, None)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    collection = FakeCollection([{"id": "job1", "stage_checkpoints": {}}])
+    storage = FakeStorage()
+    monkeypatch.setattr(TranscriptionJobStore, "collection", collection)
+    monkeypatch.setattr(enhanced_store, "storage_manager", storage)
+    monkeypatch.setattr(enhanced_store, "CHECKPOINT_SPILL_BYTES", 1024)
+    return collection, storage
+
+
+def _big_checkpoint(count=20):
+    return {
+        "transcripts": [{"index": i, "text": "word " * 50} for i in range(count)],
+        "total_segments_transcribed": count,
+    }
+
+
+class TestCheckpointBlob:
+    """Test the gzip blob encoding"""
+
+    def test_round_trip(self):
+        checkpoint = _big_checkpoint()
+        blob = encode_checkpoint_blob(checkpoint_json(checkpoint))
+
+        assert blob[:2] == b"\x1f\x8b"  # gzip magic
+        assert len(blob) < len(checkpoint_json(checkpoint))
+        assert decode_checkpoint_blob(blob) == checkpoint
+
+    def test_merge_inline_segments_over_spilled_list(self):
+        spilled = _big_checkpoint(3)
+        inline = {"total_segments_transcribed": 3, "transcripts": {"1": {"index": 1, "text": "redone"}}}
+
+        merged = merge_spilled_checkpoint(inline, spilled)
+
+        assert sorted(merged["transcripts"]) == [0, 1, 2]
+        assert merged["transcripts"][1]["text"] == "redone"
+        assert merged["transcripts"][0] == spilled["transcripts"][0]
+
+    def test_merge_int_keyed_transcripts_dict(self):
+        # An int-keyed dict comes back from JSON with string keys
+        spilled = decode_checkpoint_blob(encode_checkpoint_blob(checkpoint_json(
+            {"transcripts": {0: {"index": 0, "text": "a"}, 1: {"index": 1, "text": "b"}}}
+        )))
+        inline = {"transcripts": {2: {"index": 2, "text": "c"}}}
+
+        merged = merge_spilled_checkpoint(inline, spilled)
+
+        assert sorted(merged["transcripts"]) == [0, 1, 2]
+        assert merged["transcripts"][0]["text"] == "a"
+
+
+class TestSpilledCheckpointStore:
+    """Test spilling through TranscriptionJobStore"""
+
+    @pytest.mark.asyncio
+    async def test_large_checkpoint_is_spilled(self, store):
+        collection, storage = store
+        checkpoint = _big_checkpoint()
+        await TranscriptionJobStore.set_stage_checkpoint("job1", TranscriptionStage.TRANSCRIBING, checkpoint)
+
+        stored = collection.docs["job1"]["stage_checkpoints"]["transcribing"]
+        assert "transcripts" not in stored
+        assert stored["total_segments_transcribed"] == 20
+        assert stored[SPILLED_BLOB]["storage_key"] in storage.files
+
+        loaded = await TranscriptionJobStore.get_stage_checkpoint("job1", TranscriptionStage.TRANSCRIBING)
+        assert loaded == checkpoint
+
+    @pytest.mark.asyncio
+    async def test_segment_write_after_spill(self, store):
+        await TranscriptionJobStore.set_stage_checkpoint("job1", TranscriptionStage.TRANSCRIBING, _big_checkpoint())
+        await TranscriptionJobStore.set_segment_transcript("job1", 5, {"index": 5, "text": "redone"})
+
+        loaded = await TranscriptionJobStore.get_stage_checkpoint("job1", TranscriptionStage.TRANSCRIBING)
+        assert len(loaded["transcripts"]) == 20
+        assert loaded["transcripts"][5]["text"] == "redone"
+        assert loaded["transcripts"][4]["text"].startswith("word")
+
+    @pytest.mark.asyncio
+    async def test_replaced_checkpoint_deletes_blob(self, store):
+        collection, storage = store
+        await TranscriptionJobStore.set_stage_checkpoint("job1", TranscriptionStage.TRANSCRIBING, _big_checkpoint())
+        old_key = collection.docs["job1"]["stage_checkpoints"]["transcribing"][SPILLED_BLOB]["storage_key"]
+
+        await TranscriptionJobStore.set_stage_checkpoint("job1", TranscriptionStage.TRANSCRIBING, _big_checkpoint(25))
+        new_key = collection.docs["job1"]["stage_checkpoints"]["transcribing"][SPILLED_BLOB]["storage_key"]
+
+        assert old_key not in storage.files
+        assert list(storage.files) == [new_key]
+
+        # A small checkpoint goes back inline and drops the last blob
+        await TranscriptionJobStore.set_stage_checkpoint("job1", TranscriptionStage.TRANSCRIBING, {"transcripts": []})
+        assert storage.files == {}
@@ -0,0 +1,187 @@
+"""
+Test suite for the content-addressed result index
+Tests upload index keys, linking identical uploads and fallbacks to processing
+"""
+import pytest
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import content_index
+from content_index import (
+    upload_key, LINKED_ARTIFACTS, ContentIndexStore, remember_completed_upload, link_duplicate_upload
+)
+from models import UploadSession, TranscriptionJob, TranscriptionAsset, TranscriptionStatus
+
+
+class TestIndexKeys:
+    """Test content hash keys"""
+
+    def test_upload_keys_are_per_user(self):
+        digest = "AB" * 32
+        assert upload_key(digest, "u1") == upload_key(digest.lower(), "u1")
+        assert upload_key(digest, "u1") != upload_key(digest, "u2")
+        assert upload_key(digest, None).startswith("upload:anonymous:")
+
+    def test_only_pipeline_artifacts_are_linked(self):
+        assert "transcript" in LINKED_ARTIFACTS
+        assert "ai_conversations" not in LINKED_ARTIFACTS
+
+
+
+class FakeStores:
+    """In-memory stand-ins for the stores content_index talks to"""
+
+    def __init__(self):
+        self.index = {}
+        self.sessions = {}
+        self.jobs = {}
+        self.assets = []
+        self.notes = {}
+
+    def install(self, monkeypatch):
+        async def put(key, entry):
+            self.index[key] = dict(entry)
+
+        async def get(key):
+            return self.index.get(key)
+
+        async def remove(key):
+            self.index.pop(key, None)
+
+        async def get_session(session_id):
+            return self.sessions.get(session_id)
+
+        async def get_job(job_id, include_checkpoints=True):
+            return self.jobs.get(job_id)
+
+        async def create_job(job):
+            self.jobs[job.id] = job
+            return job
+
+        async def set_job_results(job_id, results):
+            for key, value in results.items():
+                setattr(self.jobs[job_id], key, value)
+
+        async def get_assets_for_job(job_id):
+            return [a for a in self.assets if a.job_id == job_id]
+
+        async def create_asset(asset):
+            self.assets.append(asset)
+            return asset
+
+        async def create_from_transcription_job(job):
+            note_id = f"note-{len(self.notes)}"
+            self.notes[note_id] = {"id": note_id, "status": "processing", "artifacts": {}}
+            return note_id
+
+        async def get_note(note_id):
+            return self.notes.get(note_id)
+
+        async def set_artifacts(note_id, artifacts):
+            self.notes[note_id]["artifacts"] = artifacts
+
+        async def update_status(note_id, status):
+            self.notes[note_id]["status"] = status
+
+        for name, fn in (("put", put), ("get", get), ("remove", remove)):
+            monkeypatch.setattr(ContentIndexStore, name, fn)
+        monkeypatch.setattr(content_index.UploadSessionStore, "get_session", get_session)
+        monkeypatch.setattr(content_index.TranscriptionJobStore, "get_job", get_job)
+        monkeypatch.setattr(content_index.TranscriptionJobStore, "create_job", create_job)
+        monkeypatch.setattr(content_index.TranscriptionJobStore, "set_job_results", set_job_results)
+        monkeypatch.setattr(content_index.TranscriptionAssetStore, "get_assets_for_job", get_assets_for_job)
+        monkeypatch.setattr(content_index.TranscriptionAssetStore, "create_asset", create_asset)
+        monkeypatch.setattr(content_index.EnhancedNotesStore, "create_from_transcription_job", create_from_transcription_job)
+        monkeypatch.setattr(content_index.NotesStore, "get", get_note)
+        monkeypatch.setattr(content_index.NotesStore, "set_artifacts", set_artifacts)
+        monkeypatch.setattr(content_index.NotesStore, "update_status", update_status)
+
+
+DIGEST = "ab" * 32
+
+
+@pytest.fixture
+def stores(monkeypatch):
+    fake = FakeStores()
+    fake.install(monkeypatch)
+    return fake
+
+
+def _completed_job(stores, status=TranscriptionStatus.COMPLETE):
+    """A finished pipeline job with its upload session, note and one asset"""
+    session = UploadSession(user_id="u1", filename="talk.mp3", total_size=1000, mime_type="audio/mpeg", sha256=DIGEST)
+    stores.sessions[session.id] = session
+    job = TranscriptionJob(
+        user_id="u1", upload_id=session.id, filename="talk.mp3", total_size=1000, mime_type="audio/mpeg",
+        status=status, note_id="note-src", storage_paths={"original": "orig/talk.mp3"}
+    )
+    stores.jobs[job.id] = job
+    stores.notes["note-src"] = {"id": "note-src", "status": "ready", "artifacts": {
+        "transcript": "hello world", "word_count": 2, "ai_conversations": ["mine"], "job_id": job.id
+    }}
+    stores.assets.append(TranscriptionAsset(job_id=job.id, kind="txt", storage_key="assets/talk.txt", file_size=11, mime_type="text/plain"))
+    return job
+
+
+def _reupload():
+    return UploadSession(user_id="u1", filename="talk (1).mp3", total_size=1000, mime_type="audio/mpeg")
+
+
+class TestUploadDedup:
+    """Test linking an identical upload to completed results"""
+
+    @pytest.mark.asyncio
+    async def test_identical_upload_is_linked(self, stores):
+        source = _completed_job(stores)
+        assert await remember_completed_upload(source)
+
+        job = await link_duplicate_upload(_reupload(), DIGEST.upper())
+
+        assert job is not None
+        assert job.deduplicated_from == source.id
+        assert job.status == TranscriptionStatus.COMPLETE
+        note = stores.notes[job.note_id]
+        assert note["status"] == "ready"
+        assert note["artifacts"]["transcript"] == "hello world"
+        assert note["artifacts"]["deduplicated_from"] == source.id
+        assert "ai_conversations" not in note["artifacts"]
+        assert [a.storage_key for a in stores.assets if a.job_id == job.id] == ["assets/talk.txt"]
+
+    @pytest.mark.asyncio
+    async def test_hash_miss_changes_nothing(self, stores):
+        source = _completed_job(stores)
+        await remember_completed_upload(source)
+        jobs, notes, assets = len(stores.jobs), len(stores.notes), len(stores.assets)
+
+        assert await link_duplicate_upload(_reupload(), "cd" * 32) is None
+        assert (len(stores.jobs), len(stores.notes), len(stores.assets)) == (jobs, notes, assets)
+        assert len(stores.index) == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_source_falls_back(self, stores):
+        source = _completed_job(stores)
+        await remember_completed_upload(source)
+        del stores.jobs[source.id]
+
+        assert await link_duplicate_upload(_reupload(), DIGEST) is None
+        assert stores.index == {}  # the stale entry is no longer matched
+
+    @pytest.mark.asyncio
+    async def test_incomplete_source_falls_back(self, stores):
+        source = _completed_job(stores, status=TranscriptionStatus.PROCESSING)
+        await remember_completed_upload(source)
+        jobs = len(stores.jobs)
+
+        assert await link_duplicate_upload(_reupload(), DIGEST) is None
+        assert len(stores.jobs) == jobs
+
+    @pytest.mark.asyncio
+    async def test_linked_jobs_are_not_indexed(self, stores):
+        source = _completed_job(stores)
+        await remember_completed_upload(source)
+        job = await link_duplicate_upload(_reupload(), DIGEST)
+
+        assert not await remember_completed_upload(job)
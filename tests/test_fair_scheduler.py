@@ -0,0 +1,129 @@
+"""
+Test suite for fair-share scheduling across users
+Tests weighted ordering of job dispatch and fair STT permit hand-out
+"""
+import pytest
+import asyncio
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fair_scheduler import FairShareScheduler, FairSemaphore, tier_weight
+
+
+class TestFairShareScheduler:
+    """Test weighted virtual-time ordering"""
+
+    def test_heavy_user_does_not_starve_others(self):
+        """After being served, a user drops behind users who have waited"""
+        scheduler = FairShareScheduler()
+        candidates = {"heavy": 1, "light": 2}
+
+        first = scheduler.order_users(candidates)[0]
+        assert first == "heavy"  # oldest job wins the tie
+
+        scheduler.charge("heavy", 60.0)
+        assert scheduler.order_users(candidates)[0] == "light"
+
+    def test_tier_weights(self):
+        """Premium users accrue virtual time more slowly than free users"""
+        scheduler = FairShareScheduler()
+        scheduler.set_tier("free_user", "free")
+        scheduler.set_tier("premium_user", "premium")
+        scheduler.order_users({"free_user": 1, "premium_user": 1})
+
+        scheduler.charge("free_user", 40.0)
+        scheduler.charge("premium_user", 40.0)
+
+        assert scheduler.virtual_time["premium_user"] < scheduler.virtual_time["free_user"]
+        assert tier_weight("enterprise") > tier_weight("premium") > tier_weight("free")
+        assert tier_weight("unknown") == tier_weight("free")
+
+    def test_new_user_starts_at_floor(self):
+        """A newcomer gets no credit for time it was not waiting"""
+        scheduler = FairShareScheduler()
+        scheduler.order_users({"a": 1})
+        scheduler.charge("a", 10.0)
+
+        scheduler.order_users({"a": 1, "b": 2})
+        assert scheduler.virtual_time["b"] == scheduler.virtual_time["a"]
+
+    def test_floor_tracks_waiting_users(self):
+        """An idle user's old clock does not hand newcomers a burst of priority"""
+        scheduler = FairShareScheduler()
+        scheduler.order_users({"idle": 1, "heavy": 2})
+        scheduler.charge("heavy", 100.0)
+
+        # "idle" stopped submitting; only "heavy" is waiting when "new" arrives
+        scheduler.order_users({"heavy": 2, "new": 3})
+        assert scheduler.virtual_time["new"] == scheduler.virtual_time["heavy"]
+
+    def test_returning_user_after_idle(self):
+        """A user back after going idle restarts at the waiting users' floor"""
+        scheduler = FairShareScheduler(idle_seconds=60)
+        scheduler.order_users({"old": 1, "heavy": 2})
+        scheduler.charge("heavy", 100.0)
+
+        # Time passes: "heavy" keeps being served, "old" goes idle
+        scheduler.last_active["old"] -= 120
+        scheduler.order_users({"heavy": 2})
+        assert "old" not in scheduler.virtual_time
+
+        scheduler.order_users({"heavy": 2, "old": 1})
+        assert scheduler.virtual_time["old"] == scheduler.virtual_time["heavy"]
+
+    def test_anonymous_jobs(self):
+        """Jobs without a user are scheduled as one anonymous user"""
+        scheduler = FairShareScheduler()
+        assert scheduler.order_users({None: 1, "u": 2}) == [None, "u"]
+        scheduler.charge(None, 5.0)
+        assert scheduler.order_users({None: 1, "u": 2}) == ["u", None]
+
+
+class TestFairSemaphore:
+    """Test fair permit hand-out across users"""
+
+    @pytest.mark.asyncio
+    async def test_interleaves_users(self):
+        """A user with a long queue does not block a later user's requests"""
+        semaphore = FairSemaphore(1)
+        order = []
+
+        async def call(user):
+            async with semaphore.slot(user):
+                order.append(user)
+                await asyncio.sleep(0)
+
+        # Hold the only permit until every request is queued
+        await semaphore.acquire("holder")
+        tasks = [asyncio.create_task(call("big")) for _ in range(6)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(call("small")) for _ in range(2)]
+        await asyncio.sleep(0)
+        semaphore.release()
+        await asyncio.gather(*tasks)
+
+        # "small" is served within the first few grants, not after all of "big"
+        assert order.index("small") <= 2
+        assert order.count("small") == 2 and order.count("big") == 6
+
+    @pytest.mark.asyncio
+    async def test_bounds_concurrency(self):
+        """Never more holders than permits"""
+        semaphore = FairSemaphore(2)
+        active = 0
+        peak = 0
+
+        async def call(user):
+            nonlocal active, peak
+            async with semaphore.slot(user):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(call(f"u{i % 3}") for i in range(9)))
+        assert peak == 2
+        assert semaphore.in_use == 0
@@ -0,0 +1,105 @@
+"""
+Test suite for ffmpeg progress monitoring
+Tests -progress parsing, real-time factor and stall detection
+"""
+import pytest
+import asyncio
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from ffmpeg_progress import (
+    FFmpegProgressParser, FFmpegProgressMonitor, FFmpegStalledError, parse_out_time
+)
+
+
+class FakeProcess:
+    """Stands in for an asyncio subprocess"""
+
+    def __init__(self):
+        self.returncode = None
+        self.killed = False
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+
+def progress_block(out_time_us: int, state: str = "continue") -> bytes:
+    return (
+        f"out_time_us={out_time_us}\n"
+        f"out_time_ms={out_time_us}\n"
+        f"out_time=00:00:{out_time_us / 1_000_000:09.6f}\n"
+        f"speed=42.5x\n"
+        f"progress={state}\n"
+    ).encode()
+
+
+class TestProgressParser:
+    """Test parsing of -progress output"""
+
+    def test_parse_out_time(self):
+        assert parse_out_time({"out_time_us": "2500000"}) == 2.5
+        assert parse_out_time({"out_time_ms": "2500000"}) == 2.5  # microseconds too
+        assert parse_out_time({"out_time": "01:02:03.500000"}) == 3723.5
+        assert parse_out_time({"out_time_us": "N/A"}) is None
+
+    def test_blocks_and_log_lines(self):
+        parser = FFmpegProgressParser()
+        reports = []
+        text = "[mp3 @ 0x55] Estimating duration from bitrate\n" + progress_block(5_000_000).decode() \
+            + progress_block(9_000_000, "end").decode()
+
+        for line in text.splitlines():
+            report = parser.feed_line(line)
+            if report:
+                reports.append(report)
+
+        assert [r.out_time for r in reports] == [5.0, 9.0]
+        assert reports[0].speed == 42.5
+        assert reports[-1].done
+        assert "Estimating duration" in parser.log_text
+
+
+class TestProgressMonitor:
+    """Test progress reporting and stall detection"""
+
+    @pytest.mark.asyncio
+    async def test_reports_fraction_and_rtf(self):
+        stream = asyncio.StreamReader()
+        stream.feed_data(progress_block(30_000_000))
+        stream.feed_data(progress_block(60_000_000, "end"))
+        stream.feed_eof()
+
+        fractions = []
+
+        async def on_progress(fraction, report):
+            fractions.append(fraction)
+
+        monitor = FFmpegProgressMonitor(FakeProcess(), stream, total_duration=120.0, on_progress=on_progress)
+        await monitor.run()
+
+        assert fractions == [0.25, 0.5]
+        assert monitor.realtime_factor > 1.0
+        monitor.check()  # not stalled
+        assert monitor.record("transcoding")["media_seconds"] == 60.0
+
+    @pytest.mark.asyncio
+    async def test_stall_kills_process(self):
+        stream = asyncio.StreamReader()
+        stream.feed_data(progress_block(1_000_000))
+        process = FakeProcess()
+
+        monitor = FFmpegProgressMonitor(process, stream, total_duration=60.0, stall_seconds=0.6)
+        run = asyncio.create_task(monitor.run())
+
+        # Nothing more arrives; the watchdog kills ffmpeg, which closes the pipe
+        while not process.killed:
+            await asyncio.sleep(0.1)
+        stream.feed_eof()
+        await run
+
+        with pytest.raises(FFmpegStalledError):
+            monitor.check()
@@ -0,0 +1,87 @@
+"""
+Test suite for shared HTTP clients
+Tests client reuse, per-call timeouts, lifecycle and transient error detection
+"""
+import pytest
+import asyncio
+import httpx
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from http_clients import HTTPClientRegistry, Upstream, TransientUpstreamError, is_transient_upstream_error
+
+
+class TestHTTPClientRegistry:
+    """Test pooled client registry"""
+
+    @pytest.mark.asyncio
+    async def test_client_reused_per_upstream(self):
+        registry = HTTPClientRegistry()
+        openai = registry.get(Upstream.OPENAI)
+
+        assert registry.get(Upstream.OPENAI) is openai
+        assert registry.get(Upstream.GOOGLE) is not openai
+        await registry.aclose()
+
+    @pytest.mark.asyncio
+    async def test_session_applies_timeout(self):
+        registry = HTTPClientRegistry()
+        seen = {}
+
+        def handler(request: httpx.Request):
+            seen["timeout"] = request.extensions["timeout"]
+            return httpx.Response(200, json={"ok": True})
+
+        # Route the shared client through a mock transport
+        registry._clients[Upstream.OPENAI] = (
+            httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            asyncio.get_running_loop(),
+        )
+
+        async with registry.session(Upstream.OPENAI, timeout=45) as client:
+            response = await client.post("https://api.example.test/v1")
+
+        assert response.json() == {"ok": True}
+        assert seen["timeout"]["read"] == 45
+        assert seen["timeout"]["connect"] == registry.connect_timeout
+        await registry.aclose()
+
+    @pytest.mark.asyncio
+    async def test_closed_client_is_replaced(self):
+        registry = HTTPClientRegistry()
+        client = registry.get(Upstream.WEBHOOKS)
+        await registry.aclose()
+
+        assert client.is_closed
+        assert registry.get(Upstream.WEBHOOKS) is not client
+        await registry.aclose()
+
+
+class TestTransientUpstreamError:
+    """Test classification of retryable upstream failures"""
+
+    def _status_error(self, status: int) -> httpx.HTTPStatusError:
+        request = httpx.Request("POST", "https://api.example.test/v1")
+        return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, request=request))
+
+    def test_status_codes(self):
+        assert is_transient_upstream_error(self._status_error(429))
+        assert is_transient_upstream_error(self._status_error(503))
+        assert not is_transient_upstream_error(self._status_error(400))
+
+    def test_wrapped_network_error(self):
+        # Providers re-raise network failures as user-facing ValueErrors
+        try:
+            try:
+                raise httpx.ConnectError("connection refused")
+            except Exception:
+                raise ValueError("OCR processing failed due to network error. Please try again.")
+        except ValueError as e:
+            assert is_transient_upstream_error(e)
+
+    def test_validation_error_is_permanent(self):
+        assert is_transient_upstream_error(TransientUpstreamError("busy"))
+        assert not is_transient_upstream_error(ValueError("Invalid image file"))
@@ -0,0 +1,69 @@
+"""
+Test suite for the LLM response cache
+Tests cache keys, note-stored results and invalidation on transcript edits
+"""
+import pytest
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from llm_cache import (
+    LLMResponseCache, NOTE_CACHE_FIELD, PROMPT_VERSIONS, content_hash, invalidate_on_content_change
+)
+
+
+class TestCacheKeys:
+    """Test the inputs that separate cached responses"""
+
+    def test_keys_follow_prompt_inputs(self):
+        digest = content_hash("transcript text")
+        base = LLMResponseCache.key("meeting_minutes", "gpt-4o-mini", digest, {"industry": "logistics"})
+        assert base == LLMResponseCache.key("meeting_minutes", "gpt-4o-mini", digest, {"industry": "logistics"})
+        assert base != LLMResponseCache.key("meeting_minutes", "gpt-4o", digest, {"industry": "logistics"})
+        assert base != LLMResponseCache.key("meeting_minutes", "gpt-4o-mini", content_hash("edited"), {"industry": "logistics"})
+        assert base != LLMResponseCache.key("meeting_minutes", "gpt-4o-mini", digest, {"industry": "finance"})
+
+    def test_template_version_retires_keys(self, monkeypatch):
+        digest = content_hash("transcript text")
+        before = LLMResponseCache.key("action_items", "gpt-4o-mini", digest)
+        monkeypatch.setitem(PROMPT_VERSIONS, "action_items", PROMPT_VERSIONS["action_items"] + 1)
+        assert LLMResponseCache.key("action_items", "gpt-4o-mini", digest) != before
+
+
+class TestNoteResults:
+    """Test results stored with the note artifacts"""
+
+    def test_stored_result_is_served_for_same_key(self):
+        cache = LLMResponseCache()
+        key = cache.key("action_items", "gpt-4o-mini", content_hash("t"))
+        artifacts = cache.note_artifacts({"transcript": "t"}, "action_items", key, "1. Do the thing")
+
+        assert cache.from_note(artifacts, "action_items", key)["content"] == "1. Do the thing"
+        assert cache.from_note(artifacts, "action_items", key + "x") is None
+        assert cache.from_note(artifacts, "meeting_minutes", key) is None
+
+    def test_transcript_edit_drops_markers(self):
+        cache = LLMResponseCache()
+        old = cache.note_artifacts({"transcript": "t"}, "action_items", "k", "items")
+
+        unchanged = invalidate_on_content_change(old, {**old, "action_items": "edited items"})
+        assert NOTE_CACHE_FIELD in unchanged
+
+        edited = invalidate_on_content_change(old, {**old, "transcript": "t, corrected"})
+        assert NOTE_CACHE_FIELD not in edited
+        assert edited["action_items"] == "items"
+
+
+class TestBatchResults:
+    """Test batch results kept in cache_manager"""
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self):
+        cache = LLMResponseCache()
+        key = cache.key("batch_action_items", "gpt-4o-mini", content_hash("SESSION: a", "SESSION: b"))
+        assert await cache.get("batch_action_items", key) is None
+
+        await cache.set(key, {"content": "CONSOLIDATED ACTION ITEMS"})
+        assert await cache.get("batch_action_items", key) == {"content": "CONSOLIDATED ACTION ITEMS"}
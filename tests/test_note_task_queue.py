@@ -0,0 +1,85 @@
+"""
+Test suite for the note task queue consumer
+Tests lease loss and the enqueue time handed to note task handlers
+"""
+import pytest
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from note_task_queue import NoteTaskConsumer, NoteTaskStore, NoteTaskKind
+from tasks import _waiting_since
+
+
+class TestNoteTaskLeaseLoss:
+    """Test the heartbeat's reaction to a lost lease"""
+
+    @pytest.mark.asyncio
+    async def test_handler_is_cancelled(self, monkeypatch):
+        consumer = NoteTaskConsumer(worker_id="c1")
+        consumer.lease_seconds = 3  # heartbeat every second
+        state = {"finished": False, "completed": False, "failed": False}
+
+        async def renew_lease(task_id, worker_id, lease_seconds):
+            return False  # another consumer claimed the task
+
+        async def complete(task_id, worker_id):
+            state["completed"] = True
+
+        async def fail(task, worker_id, error):
+            state["failed"] = True
+            return True
+
+        async def handler(note_id, queued_at=None):
+            await asyncio.sleep(30)
+            state["finished"] = True
+
+        monkeypatch.setattr(NoteTaskStore, "renew_lease", renew_lease)
+        monkeypatch.setattr(NoteTaskStore, "complete", complete)
+        monkeypatch.setattr(NoteTaskStore, "fail", fail)
+        consumer._handlers = {NoteTaskKind.TRANSCRIPTION: handler}
+
+        task = {"id": "t1", "note_id": "n1", "kind": NoteTaskKind.TRANSCRIPTION, "attempts": 1}
+        await asyncio.wait_for(consumer.run_task(task), timeout=5)
+
+        assert not state["finished"]
+        # The task now belongs to another consumer
+        assert not state["completed"]
+        assert not state["failed"]
+
+
+class TestNoteTaskQueueWait:
+    """Test that lane wait includes time spent in the durable queue"""
+
+    @pytest.mark.asyncio
+    async def test_handler_gets_due_time(self, monkeypatch):
+        consumer = NoteTaskConsumer(worker_id="c1")
+        seen = {}
+
+        async def complete(task_id, worker_id):
+            seen["completed"] = True
+
+        async def handler(note_id, queued_at=None):
+            seen["queued_at"] = queued_at
+
+        monkeypatch.setattr(NoteTaskStore, "complete", complete)
+        consumer._handlers = {NoteTaskKind.OCR: handler}
+
+        created = datetime(2026, 1, 1, 12, 0)
+        due = created + timedelta(seconds=30)  # requeued after a failed attempt
+        task = {"id": "t1", "note_id": "n1", "kind": NoteTaskKind.OCR, "attempts": 2,
+                "created_at": created, "available_at": due}
+        await consumer.run_task(task)
+
+        assert seen == {"queued_at": due, "completed": True}
+
+    def test_waiting_since(self):
+        # MongoDB hands back naive UTC datetimes
+        queued = datetime.now(timezone.utc) - timedelta(seconds=90)
+        assert abs(time.time() - _waiting_since(queued.replace(tzinfo=None)) - 90) < 1
+        assert abs(time.time() - _waiting_since(None)) < 1
@@ -0,0 +1,50 @@
+"""
+Test suite for pipeline job leases
+Tests that a worker stops processing a job once its lease is lost
+"""
+import pytest
+import asyncio
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from pipeline_worker import PipelineWorker
+from enhanced_store import TranscriptionJobStore
+from models import TranscriptionJob
+
+
+class TestLeaseLoss:
+    """Test the heartbeat's reaction to a lost lease"""
+
+    @pytest.mark.asyncio
+    async def test_processing_is_cancelled(self, monkeypatch):
+        worker = PipelineWorker(worker_id="w1")
+        worker.lease_seconds = 3  # heartbeat every second
+        state = {"finished": False, "errors": [], "released": False}
+
+        async def renew_lease(job_id, worker_id, lease_seconds):
+            return False  # another worker claimed the job
+
+        async def release_lease(job_id, worker_id):
+            state["released"] = True
+
+        async def process_job(job):
+            await asyncio.sleep(30)
+            state["finished"] = True
+
+        async def handle_job_error(job_id, code, message):
+            state["errors"].append(code)
+
+        monkeypatch.setattr(TranscriptionJobStore, "renew_lease", renew_lease)
+        monkeypatch.setattr(TranscriptionJobStore, "release_lease", release_lease)
+        monkeypatch.setattr(worker, "process_job", process_job)
+        monkeypatch.setattr(worker, "handle_job_error", handle_job_error)
+
+        job = TranscriptionJob(user_id="u1", upload_id="up1", filename="a.mp3", total_size=1, mime_type="audio/mpeg")
+        await asyncio.wait_for(worker.process_claimed_job(job), timeout=5)
+
+        assert not state["finished"]
+        assert state["errors"] == []  # the job is not failed on the new owner's behalf
+        assert state["released"]
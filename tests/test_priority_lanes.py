@@ -0,0 +1,79 @@
+"""
+Test suite for priority lanes
+Tests lane classification, per-lane budgets and SLO accounting
+"""
+import pytest
+import asyncio
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from priority_lanes import JobLane, LaneBudgets, lane_for_duration, record_lane_wait
+from monitoring import monitoring_service
+
+
+class TestLaneClassification:
+    """Test duration to lane mapping"""
+
+    def test_lanes_by_duration(self):
+        assert lane_for_duration(90) == JobLane.INTERACTIVE
+        assert lane_for_duration(20 * 60) == JobLane.STANDARD
+        assert lane_for_duration(3 * 3600) == JobLane.BULK
+
+    def test_unknown_duration_is_standard(self):
+        assert lane_for_duration(None) == JobLane.STANDARD
+        assert lane_for_duration(0) == JobLane.STANDARD
+
+
+class TestLaneBudgets:
+    """Test per-lane concurrency budgets"""
+
+    def test_admit_and_leave(self):
+        budgets = LaneBudgets()
+        budgets.budgets[JobLane.BULK] = 1
+
+        assert budgets.has_capacity(JobLane.BULK)
+        budgets.admit(JobLane.BULK)
+        assert not budgets.has_capacity(JobLane.BULK)
+        assert budgets.has_capacity(JobLane.INTERACTIVE)  # other lanes unaffected
+
+        budgets.leave(JobLane.BULK)
+        assert budgets.has_capacity(JobLane.BULK)
+
+    @pytest.mark.asyncio
+    async def test_bulk_backlog_does_not_block_interactive(self):
+        """A full bulk lane leaves interactive work free to run"""
+        budgets = LaneBudgets()
+        budgets.budgets[JobLane.BULK] = 1
+        release = asyncio.Event()
+
+        async def bulk_job():
+            async with budgets.slot(JobLane.BULK):
+                await release.wait()
+
+        bulk = [asyncio.create_task(bulk_job()) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        async with budgets.slot(JobLane.INTERACTIVE):
+            assert budgets.active[JobLane.BULK] == 1
+
+        release.set()
+        await asyncio.gather(*bulk)
+        assert budgets.active[JobLane.BULK] == 0
+
+
+class TestLaneSLO:
+    """Test queue-wait SLO accounting"""
+
+    def test_breach_counted(self):
+        counters = monitoring_service.metrics_collector.counters
+        key = "lane_slo_breaches#lane=interactive,source=test"
+        before = counters.get(key, 0)
+
+        record_lane_wait(JobLane.INTERACTIVE, 1.0, source="test")
+        record_lane_wait(JobLane.INTERACTIVE, 3600.0, source="test")
+        record_lane_wait(JobLane.BULK, 36000.0, source="test")  # best effort, no SLO
+
+        assert counters.get(key, 0) == before + 1
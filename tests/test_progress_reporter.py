@@ -0,0 +1,79 @@
+"""
+Test suite for coalesced job progress writes
+Tests write coalescing, the trailing flush and forgetting released jobs
+"""
+import pytest
+import asyncio
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from enhanced_store import ProgressReporter, TranscriptionJobStore
+from models import TranscriptionStage
+
+
+class FakeCollection:
+    """Records the progress written by each update_one"""
+
+    def __init__(self):
+        self.writes = []
+
+    async def update_one(self, query, update):
+        self.writes.append(update["$set"]["progress"])
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    fake = FakeCollection()
+    monkeypatch.setattr(TranscriptionJobStore, "collection", fake)
+    return fake
+
+
+class TestProgressReporter:
+    """Test progress coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_small_steps_are_coalesced(self, collection):
+        reporter = ProgressReporter(min_interval=60, min_delta=5, max_interval=60)
+        await reporter.set_stage("job1", TranscriptionStage.TRANSCRIBING, 0.0)
+
+        for progress in (1.0, 2.0, 30.0):
+            await reporter.update("job1", TranscriptionStage.TRANSCRIBING, progress)
+
+        # Moved far enough but too soon: still held
+        assert collection.writes == [0.0]
+        assert reporter.stats["coalesced"] == 3
+
+        # Completion and stage changes are never held
+        await reporter.update("job1", TranscriptionStage.TRANSCRIBING, 100.0)
+        await reporter.set_stage("job1", TranscriptionStage.MERGING, 0.0)
+        assert collection.writes == [0.0, 100.0, 0.0]
+        reporter.forget("job1")
+
+    @pytest.mark.asyncio
+    async def test_trailing_flush(self, collection):
+        reporter = ProgressReporter(min_interval=60, min_delta=5, max_interval=0.05)
+        await reporter.set_stage("job1", TranscriptionStage.TRANSCRIBING, 0.0)
+        await reporter.update("job1", TranscriptionStage.TRANSCRIBING, 1.0)
+        await reporter.update("job1", TranscriptionStage.TRANSCRIBING, 2.0)
+
+        await asyncio.sleep(0.1)
+
+        # Only the latest held value is written
+        assert collection.writes == [0.0, 2.0]
+        assert not reporter._timers
+
+    @pytest.mark.asyncio
+    async def test_forget_drops_held_progress(self, collection):
+        reporter = ProgressReporter(min_interval=60, min_delta=5, max_interval=0.05)
+        await reporter.set_stage("job1", TranscriptionStage.TRANSCRIBING, 0.0)
+        await reporter.update("job1", TranscriptionStage.TRANSCRIBING, 1.0)
+
+        reporter.forget("job1")
+        await asyncio.sleep(0.1)
+
+        assert collection.writes == [0.0]
+        assert "job1" not in reporter._last
+        assert not reporter._timers
@@ -16,7 +16,8 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 from rate_limiting import (
     RateLimiter, QuotaManager, TokenBucket, SlidingWindowCounter,
     rate_limiter, quota_manager, check_rate_limit, check_user_quota,
-    RateLimit, RateLimitType, UserQuota
+    RateLimit, RateLimitType, UserQuota,
+    AdaptiveRateGovernor, UpstreamRateGovernor, parse_rate_limit_duration
 )
 
 class TestTokenBucket:
@@ -388,6 +389,96 @@ class TestIntegratedRateLimitingSystem:
         assert "storage_quota_exceeded" in violations
         assert len(violations) >= 2
 
+class TestAdaptiveRateGovernor:
+    """Test AIMD pacing of upstream calls"""
+    
+    def test_parse_durations(self):
+        """Test retry-after and x-ratelimit-reset formats"""
+        assert parse_rate_limit_duration("20") == 20.0
+        assert parse_rate_limit_duration("1s") == 1.0
+        assert parse_rate_limit_duration("6m0s") == 360.0
+        assert parse_rate_limit_duration("20ms") == pytest.approx(0.02)
+        assert parse_rate_limit_duration(None) is None
+        assert parse_rate_limit_duration("soon") is None
+    
+    def test_throttle_halves_rate_and_blocks(self):
+        """A 429 cuts the rate and pauses callers for retry-after"""
+        governor = AdaptiveRateGovernor("test", rpm=120)
+        governor.observe(429, {"retry-after": "3"})
+        
+        assert governor.rpm == 60
+        assert 2.5 < governor.blocked_until - time.monotonic() <= 3.0
+        assert governor.throttled == 1
+        
+        # Never below the floor
+        for _ in range(10):
+            governor.observe(429, {})
+        assert governor.rpm == governor.min_rpm
+    
+    def test_success_recovers_to_learned_ceiling(self):
+        """Successes add rate back up to the advertised limit"""
+        governor = AdaptiveRateGovernor("test", rpm=1000, increase_rpm=50)
+        governor.rpm = 100
+        
+        headers = {"x-ratelimit-limit-requests": "200", "x-ratelimit-remaining-requests": "150"}
+        for _ in range(10):
+            governor.observe(200, headers)
+        
+        assert governor.max_rpm == 180  # limit with safety margin
+        assert governor.rpm == 180
+    
+    def test_low_remaining_budget_slows_down(self):
+        """A nearly spent window is spread over its reset time"""
+        governor = AdaptiveRateGovernor("test", rpm=500)
+        governor.observe(200, {
+            "x-ratelimit-limit-requests": "500",
+            "x-ratelimit-remaining-requests": "10",
+            "x-ratelimit-reset-requests": "30s",
+        })
+        assert governor.rpm == 20  # 10 requests over 30 seconds
+        
+        governor.observe(200, {
+            "x-ratelimit-limit-tokens": "40000",
+            "x-ratelimit-remaining-tokens": "0",
+            "x-ratelimit-reset-tokens": "2s",
+        })
+        assert governor.blocked_until > time.monotonic()
+    
+    @pytest.mark.asyncio
+    async def test_callers_are_spaced(self):
+        """Concurrent callers get consecutive send slots"""
+        governor = AdaptiveRateGovernor("test", rpm=1200)  # 50ms apart
+        start = time.monotonic()
+        await asyncio.gather(*(governor.acquire() for _ in range(4)))
+        assert time.monotonic() - start >= 0.14
+    
+    @pytest.mark.asyncio
+    async def test_registry_keys_by_model(self):
+        """Each upstream model gets its own governor"""
+        registry = UpstreamRateGovernor()
+        registry.observe("openai:whisper-1", 429, {"retry-after": "0"})
+        
+        assert registry.get("openai:whisper-1").throttled == 1
+        assert registry.get("openai:gpt-4o-mini").throttled == 0
+    
+    @pytest.mark.asyncio
+    async def test_backoff_only_when_disabled(self):
+        """Without the governor, a 429 retry still waits for retry-after"""
+        registry = UpstreamRateGovernor()
+        registry.enabled = True
+        start = time.monotonic()
+        await registry.backoff({"retry-after": "1"}, fallback_seconds=1)
+        assert time.monotonic() - start < 0.1
+        
+        registry.enabled = False
+        start = time.monotonic()
+        await registry.backoff({"retry-after-ms": "100"}, fallback_seconds=5)
+        assert 0.09 <= time.monotonic() - start < 1
+        
+        start = time.monotonic()
+        await registry.backoff({}, fallback_seconds=0.1)
+        assert time.monotonic() - start >= 0.09
+
 # Integration tests with mocked FastAPI request
 class TestServerIntegration:
     """Test integration with server middleware"""
@@ -0,0 +1,146 @@
+"""
+Test suite for non-blocking storage I/O
+Tests the storage thread pools, the local backend, streaming, ranged reads and event loop lag tracking
+"""
+import pytest
+import time
+import asyncio
+import hashlib
+import threading
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from storage_io import IOPool, local_io
+from cloud_storage import LocalStorageBackend, StorageManager
+from monitoring import EventLoopLagMonitor, MetricsCollector
+
+
+class TestIOPool:
+    """Test the bounded I/O pools"""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_the_event_loop(self):
+        pool = IOPool("test", 2)
+        name = await pool.run(lambda: threading.current_thread().name)
+        assert name.startswith("test-io")
+        assert pool.get_status() == {"max_workers": 2, "in_flight": 0, "completed": 1}
+
+    @pytest.mark.asyncio
+    async def test_loop_keeps_running_during_blocking_io(self):
+        pool = IOPool("test", 1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await pool.run(time.sleep, 0.2)
+        task.cancel()
+        assert ticks >= 5
+
+
+class TestLocalStorageBackend:
+    """Test local backend operations through the I/O pool"""
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, tmp_path):
+        backend = LocalStorageBackend(str(tmp_path))
+        completed = local_io.completed
+
+        await backend.store_file(b"segment", "jobs/j1/seg.wav", {"job_id": "j1"})
+        assert await backend.file_exists("jobs/j1/seg.wav")
+        assert await backend.get_file("jobs/j1/seg.wav") == b"segment"
+
+        metadata = await backend.get_file_metadata("jobs/j1/seg.wav")
+        assert metadata["job_id"] == "j1" and metadata["size"] == 7
+
+        assert await backend.delete_file("jobs/j1/seg.wav")
+        assert not await backend.file_exists("jobs/j1/seg.wav")
+        assert local_io.completed - completed == 6
+
+        with pytest.raises(FileNotFoundError):
+            await backend.get_file("jobs/j1/seg.wav")
+
+
+class TestEventLoopLag:
+    """Test event loop lag measurement"""
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_shows_as_lag(self):
+        collector = MetricsCollector()
+        monitor = EventLoopLagMonitor(collector)
+        monitor.interval = 0.01
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)  # blocks the loop
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        assert monitor.max_lag_ms >= 100
+        assert monitor.get_status()["count"] >= 2
+
+
+class TestStreamingAPI:
+    """Test streamed reads and writes on the local backend"""
+
+    @pytest.mark.asyncio
+    async def test_write_then_iterate(self, tmp_path):
+        backend = LocalStorageBackend(str(tmp_path))
+        data = os.urandom(3 * 1024 * 1024 + 11)
+
+        async with await backend.open_write("jobs/j1/seg.wav", {"job_id": "j1"}) as writer:
+            for start in range(0, len(data), 512 * 1024):
+                await writer.write(data[start:start + 512 * 1024])
+            assert not await backend.file_exists("jobs/j1/seg.wav")  # not visible until closed
+
+        assert writer.size == len(data)
+        assert writer.sha256 == hashlib.sha256(data).hexdigest()
+        assert (await backend.get_file_metadata("jobs/j1/seg.wav"))["sha256"] == writer.sha256
+
+        chunks = [chunk async for chunk in backend.iter_bytes("jobs/j1/seg.wav", chunk_size=1024 * 1024)]
+        assert max(len(c) for c in chunks) == 1024 * 1024
+        assert b"".join(chunks) == data
+
+    @pytest.mark.asyncio
+    async def test_failed_write_leaves_nothing(self, tmp_path):
+        backend = LocalStorageBackend(str(tmp_path))
+        with pytest.raises(RuntimeError):
+            async with await backend.open_write("out.bin") as writer:
+                await writer.write(b"partial")
+                raise RuntimeError("encoder crashed")
+
+        assert not list(tmp_path.iterdir())
+
+    @pytest.mark.asyncio
+    async def test_reader_reports_size(self, tmp_path):
+        backend = LocalStorageBackend(str(tmp_path))
+        await backend.store_file(b"0123456789", "a.txt")
+        async with await backend.open_read("a.txt") as reader:
+            assert reader.size == 10
+            assert await reader.read(4) == b"0123"
+            assert await reader.read() == b"456789"
+
+        with pytest.raises(FileNotFoundError):
+            await backend.open_read("missing.txt")
+
+
+class TestRangedAccess:
+    """Test byte-range and memory-mapped reads through the manager"""
+
+    @pytest.mark.asyncio
+    async def test_read_range_and_mmap(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("STORAGE_TYPE", "local")
+        monkeypatch.setenv("LOCAL_STORAGE_DIR", str(tmp_path))
+        manager = StorageManager()
+        await manager.backend.store_file(b"0123456789", "a.bin")
+
+        assert await manager.read_range("a.bin", 3, 7) == b"3456"
+        assert manager.usage_stats["bytes_retrieved"] == 4
+        with manager.mmap("a.bin") as mapped:
+            assert mapped[8:] == b"89"
@@ -0,0 +1,55 @@
+"""
+Test suite for the STT result cache
+Tests cache keys, audio fingerprints and hot-tier hits
+"""
+import pytest
+import hashlib
+
+# Import the modules to test
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from stt_cache import STTResultCache, fingerprint_file
+from cache_manager import cache_manager
+
+
+class TestCacheKeys:
+    """Test the request parameters that separate results"""
+
+    def test_keys_differ_by_request(self):
+        digest = "ab" * 32
+        base = STTResultCache.key(digest, "whisper-1", "en", "0")
+        assert base == STTResultCache.key(digest.upper(), "whisper-1", "en", "0")
+        assert base != STTResultCache.key(digest, "gpt-4o-mini-transcribe", "en", "0")
+        assert base != STTResultCache.key(digest, "whisper-1", "de", "0")
+        assert base != STTResultCache.key(digest, "whisper-1", "en", "0.2")
+        assert base != STTResultCache.key(digest, "whisper-1", "en", "0", response_format="verbose_json")
+
+    def test_fingerprint_is_content_hash(self, tmp_path):
+        audio = tmp_path / "segment.wav"
+        audio.write_bytes(b"RIFF" + os.urandom(3 * 1024 * 1024))
+        assert fingerprint_file(str(audio), chunk_size=1024 * 1024) == hashlib.sha256(audio.read_bytes()).hexdigest()
+
+
+class TestCacheLookup:
+    """Test lookups that do not need the persistent tier"""
+
+    @pytest.mark.asyncio
+    async def test_hot_tier_hit_counts(self):
+        cache = STTResultCache()
+        digest = hashlib.sha256(b"hot tier").hexdigest()
+        await cache_manager.backend.set(cache.key(digest, "whisper-1", "en"), {"text": "hello"}, 60)
+
+        assert await cache.get(digest, "whisper-1", "en") == {"text": "hello"}
+        assert cache.stats["hits_hot"] == 1
+        assert cache.hit_rate == 1.0
+
+    @pytest.mark.asyncio
+    async def test_disabled_or_unhashed_is_a_miss(self):
+        cache = STTResultCache()
+        assert await cache.get(None, "whisper-1", "en") is None
+
+        cache.enabled = False
+        assert await cache.fingerprint(__file__) is None
+        assert cache.stats["misses"] == 0  # no lookup was made